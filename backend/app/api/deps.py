@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from fastapi import Depends, FastAPI, Query
+from fastapi.requests import HTTPConnection
+
+from app.core import deadline
+from app.core.config import get_settings
+from app.services.anthropic_service import AnthropicService
+from app.services.batch_service import BatchService
+from app.services.dashboard_service import DashboardService
+from app.services.insights_service import InsightsService
+from app.services.live_updates import LiveHub
+from app.services.metrics_service import MetricsService
+from app.services.slack_service import SlackService
+
+
+# Process-wide service instances, built once at startup and injected into route handlers
+# (HTTP and WebSocket alike, hence `HTTPConnection`).
+# Tests can swap any of them through `app.dependency_overrides`; overriding the Slack or
+# Anthropic dependency also flows into the dashboard/metrics/insights/batch services.
+
+
+@dataclass
+class Services:
+    slack: SlackService
+    anthropic: AnthropicService
+    dashboard: DashboardService
+    metrics: MetricsService
+    insights: InsightsService
+    batch: BatchService
+    live: LiveHub
+
+    async def aclose(self) -> None:
+        """Close the Slack and Anthropic HTTP clients (on shutdown)."""
+        await self.slack.aclose()
+        await self.anthropic.aclose()
+
+
+def build_services() -> Services:
+    settings = get_settings()
+    slack = SlackService()
+    anthropic = AnthropicService()
+    dashboard = DashboardService(slack, anthropic)
+    return Services(
+        slack=slack,
+        anthropic=anthropic,
+        dashboard=dashboard,
+        metrics=MetricsService(slack, anthropic),
+        insights=InsightsService(slack, anthropic),
+        batch=BatchService(slack, anthropic),
+        live=LiveHub(dashboard, interval=settings.live_update_interval_seconds or settings.message_cache_ttl_seconds),
+    )
+
+
+def _services(app: FastAPI) -> Services:
+    # Built in the lifespan; created lazily when it did not run (e.g. TestClient without `with`)
+    services = getattr(app.state, "services", None)
+    if services is None:
+        services = app.state.services = build_services()
+    return services
+
+
+def get_slack_service(request: HTTPConnection) -> SlackService:
+    return _services(request.app).slack
+
+
+def get_anthropic_service(request: HTTPConnection) -> AnthropicService:
+    return _services(request.app).anthropic
+
+
+def get_dashboard_service(
+    request: HTTPConnection,
+    slack: SlackService = Depends(get_slack_service),
+    anthropic: AnthropicService = Depends(get_anthropic_service),
+) -> DashboardService:
+    svc = _services(request.app).dashboard
+    if svc.slack is slack and svc.anthropic is anthropic:
+        return svc
+    return DashboardService(slack, anthropic)
+
+
+def get_metrics_service(
+    request: HTTPConnection,
+    slack: SlackService = Depends(get_slack_service),
+    anthropic: AnthropicService = Depends(get_anthropic_service),
+) -> MetricsService:
+    svc = _services(request.app).metrics
+    if svc.slack is slack and svc.anthropic is anthropic:
+        return svc
+    return MetricsService(slack, anthropic)
+
+
+def get_insights_service(
+    request: HTTPConnection,
+    slack: SlackService = Depends(get_slack_service),
+    anthropic: AnthropicService = Depends(get_anthropic_service),
+) -> InsightsService:
+    svc = _services(request.app).insights
+    if svc.slack is slack and svc.anthropic is anthropic:
+        return svc
+    return InsightsService(slack, anthropic)
+
+
+def get_batch_service(
+    request: HTTPConnection,
+    slack: SlackService = Depends(get_slack_service),
+    anthropic: AnthropicService = Depends(get_anthropic_service),
+) -> BatchService:
+    svc = _services(request.app).batch
+    if svc.slack is slack and svc.anthropic is anthropic:
+        return svc
+    return BatchService(slack, anthropic)
+
+
+def get_live_hub(request: HTTPConnection) -> LiveHub:
+    return _services(request.app).live
+
+
+async def request_deadline(
+    timeout_ms: Optional[int] = Query(
+        None, ge=1, le=600_000, description="Time budget in ms; entries finished after it are marked partial"
+    ),
+) -> AsyncIterator[None]:
+    # Router-level dependency: services read the budget through app/core/deadline.py
+    token = deadline.set_deadline(timeout_ms if timeout_ms is not None else get_settings().request_timeout_ms)
+    try:
+        yield
+    finally:
+        deadline.reset_deadline(token)
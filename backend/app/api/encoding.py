@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from typing import Any, Literal, Optional
+
+from fastapi import Query, Request
+
+from app.core.serialization import COMPACT_MEDIA_TYPE, CompactJSONResponse, FastJSONResponse
+
+
+# Response encoding negotiation for endpoints offering the compact format
+# (see app/core/serialization.py).
+
+
+def wants_compact(request: Request, encoding: Optional[Literal["json", "compact"]] = Query(None)) -> bool:
+    if encoding is not None:
+        return encoding == "compact"
+    return COMPACT_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def negotiated_response(content: Any, *, compact: bool) -> FastJSONResponse:
+    # The body depends on Accept, so shared caches must key on it
+    response_class = CompactJSONResponse if compact else FastJSONResponse
+    return response_class(content, headers={"Vary": "Accept"})
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any, Optional, Sequence, TypeVar
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+
+# Opaque cursors and `fields=` projection for list endpoints. A cursor is base64url JSON
+# of the service's continuation position; clients must pass it back unchanged. Every list
+# endpoint returns the next page's cursor in the X-Next-Cursor header.
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+T = TypeVar("T")
+
+
+def encode_cursor(position: Any) -> Optional[str]:
+    if position is None:
+        return None
+    raw = json.dumps({"p": position}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str], kind: type[T]) -> Optional[T]:
+    """The position in `cursor`, which must be a `kind` (float positions also accept ints)."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)["p"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="invalid_cursor")
+    if kind is float and isinstance(position, int) and not isinstance(position, bool):
+        return float(position)  # type: ignore[return-value]
+    if type(position) is not kind:
+        raise HTTPException(status_code=400, detail="invalid_cursor")
+    return position
+
+
+def next_cursor_headers(position: Any) -> Optional[dict[str, str]]:
+    """Response headers carrying the cursor of the next page (none on the last page)."""
+    cursor = encode_cursor(position)
+    return {NEXT_CURSOR_HEADER: cursor} if cursor else None
+
+
+def parse_fields(fields: Optional[str], model: type[BaseModel]) -> Optional[set[str]]:
+    """`fields=id,ts,text` -> {"id", "ts", "text"}; unknown names are a 400."""
+    if not fields:
+        return None
+    names = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = names - set(model.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"unknown_fields: {', '.join(sorted(unknown))}")
+    return names
+
+
+def project(items: Sequence[BaseModel], fields: Optional[set[str]]) -> list[Any]:
+    if fields is None:
+        return list(items)
+    return [item.model_dump(include=fields) for item in items]
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import contextlib
+import logging
+from typing import AsyncIterator, Optional
+
+from fastapi.responses import StreamingResponse
+
+from app.core import deadline
+from app.core.serialization import dumps
+
+
+# Server-Sent Events framing for `(event, data)` async generators from the services.
+# FastAPI closes yield dependencies before a StreamingResponse body runs, so the request
+# deadline set by `request_deadline` is captured when the route returns the response and
+# re-entered around the generator.
+
+
+async def _frames(events: AsyncIterator[tuple[str, object]], budget: Optional[float]) -> AsyncIterator[bytes]:
+    token = deadline.enter_deadline(budget)
+    try:
+        async for event, data in events:
+            yield b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+    except Exception as exc:
+        # Headers are already sent; report the failure in-band and end the stream
+        logging.getLogger(__name__).exception("sse: stream failed: %s", exc)
+        yield b"event: error\ndata: " + dumps({"detail": "stream_failed"}) + b"\n\n"
+    finally:
+        # A generator finalized by the loop (client gone) runs this in another context
+        with contextlib.suppress(ValueError):
+            deadline.reset_deadline(token)
+
+
+def sse_response(events: AsyncIterator[tuple[str, object]]) -> StreamingResponse:
+    return StreamingResponse(
+        _frames(events, deadline.current()),
+        media_type="text/event-stream",
+        # Disable proxy buffering (nginx) so events reach the browser as they are produced
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.core import telemetry
+
+# Prometheus scrape target, mounted at the root (GET /metrics) rather than under /api/v1
+router = APIRouter(tags=["telemetry"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(telemetry.REGISTRY.render(), media_type=telemetry.CONTENT_TYPE)
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+
+from app.models.pydantic_types import BatchRequest, BatchResponse
+from app.api.deps import get_batch_service, request_deadline
+from app.core.serialization import FastJSONResponse
+from app.services.batch_service import BatchService
+
+
+router = APIRouter(prefix="/batch", tags=["batch"], dependencies=[Depends(request_deadline)])
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(payload: BatchRequest, service: BatchService = Depends(get_batch_service)) -> FastJSONResponse:
+    """Run several dashboard/metrics queries over one fetch per channel.
+
+    Results come back in request order; a failing query reports `ok: false` without
+    failing the others.
+    """
+    return FastJSONResponse(await service.run(payload.queries))
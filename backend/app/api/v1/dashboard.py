@@ -1,4 +1,7 @@
-from fastapi import APIRouter, Query
+import asyncio
+
+from fastapi import APIRouter, Depends, Query, WebSocket
+from fastapi.responses import StreamingResponse
 from typing import Optional
 from typing import Literal
 from datetime import datetime, timedelta
@@ -9,31 +12,39 @@ from app.models.pydantic_types import (
     ChannelMetric,
     KPI,
     HeatmapMatrix,
+    BurnoutPoint,
 )
+from app.api.deps import get_dashboard_service, get_live_hub, request_deadline
+from app.api.encoding import negotiated_response, wants_compact
+from app.api.sse import sse_response
+from app.core.serialization import FastJSONResponse, compact_columns, compact_matrix, dumps
 from app.services.dashboard_service import DashboardService
+from app.services.live_updates import LiveHub
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"], dependencies=[Depends(request_deadline)])
+
 
-router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+# /trend, /burnout-series and /heatmap also answer in the compact encoding when asked
+# (`Accept: application/vnd.pulse.compact+json` or `?encoding=compact`).
 
 
 @router.get("/trend", response_model=list[SentimentPoint])
-async def get_trend(time_range: TimeRange = Query("week", alias="range"), channel_ids: Optional[str] = Query(None)) -> list[SentimentPoint]:
-    svc = DashboardService()
+async def get_trend(time_range: TimeRange = Query("week", alias="range"), channel_ids: Optional[str] = Query(None), svc: DashboardService = Depends(get_dashboard_service), compact: bool = Depends(wants_compact)) -> FastJSONResponse:
     channel_list = [c.strip() for c in channel_ids.split(",") if c.strip()] if channel_ids else None
-    return await svc.compute_trend(time_range=time_range, channel_ids=channel_list)
+    points = await svc.compute_trend(time_range=time_range, channel_ids=channel_list)
+    return negotiated_response(compact_columns(SentimentPoint, points) if compact else points, compact=compact)
 
 
 @router.get("/channels", response_model=list[ChannelMetric])
-async def get_channel_metrics(time_range: TimeRange = Query("week", alias="range"), channel_ids: Optional[str] = Query(None)) -> list[ChannelMetric]:
-    svc = DashboardService()
+async def get_channel_metrics(time_range: TimeRange = Query("week", alias="range"), channel_ids: Optional[str] = Query(None), svc: DashboardService = Depends(get_dashboard_service)) -> FastJSONResponse:
     channel_list = [c.strip() for c in channel_ids.split(",") if c.strip()] if channel_ids else None
-    return await svc.compute_channel_metrics(time_range=time_range, channel_ids=channel_list)
+    return FastJSONResponse(await svc.compute_channel_metrics(time_range=time_range, channel_ids=channel_list))
 
 
 @router.get("/kpi", response_model=KPI)
-async def get_dashboard_kpi(time_range: TimeRange = Query("week", alias="range"), channel_ids: Optional[str] = Query(None)) -> KPI:
-    svc = DashboardService()
+async def get_dashboard_kpi(time_range: TimeRange = Query("week", alias="range"), channel_ids: Optional[str] = Query(None), svc: DashboardService = Depends(get_dashboard_service)) -> FastJSONResponse:
     channel_list = [c.strip() for c in channel_ids.split(",") if c.strip()] if channel_ids else None
-    return await svc.compute_kpi(time_range=time_range, channel_ids=channel_list)
+    return FastJSONResponse(await svc.compute_kpi(time_range=time_range, channel_ids=channel_list))
 
 
 @router.get("/burnout-series")
@@ -41,10 +52,14 @@ async def get_burnout_series(
     time_range: TimeRange = Query("week", alias="range"),
     group: Literal["channels", "team", "person"] = Query("channels"),
     channel_ids: Optional[str] = Query(None),
-) -> dict[str, object]:
-    svc = DashboardService()
+    svc: DashboardService = Depends(get_dashboard_service),
+    compact: bool = Depends(wants_compact),
+) -> FastJSONResponse:
     channel_list = [c.strip() for c in channel_ids.split(",") if c.strip()] if channel_ids else None
-    return await svc.compute_burnout_series(time_range=time_range, group=group, channel_ids=channel_list)
+    result = await svc.compute_burnout_series(time_range=time_range, group=group, channel_ids=channel_list)
+    if compact:
+        result = {**result, "series": {name: compact_columns(BurnoutPoint, points) for name, points in result["series"].items()}}
+    return negotiated_response(result, compact=compact)
 
 
 @router.get("/heatmap", response_model=HeatmapMatrix)
@@ -53,7 +68,95 @@ async def get_heatmap(
     metric: Literal["sentiment", "messages", "threads"] = Query("sentiment"),
     time_range: TimeRange = Query("week", alias="range"),
     channel_ids: Optional[str] = Query(None),
-) -> HeatmapMatrix:
-    svc = DashboardService()
+    svc: DashboardService = Depends(get_dashboard_service),
+    compact: bool = Depends(wants_compact),
+) -> FastJSONResponse:
+    channel_list = [c.strip() for c in channel_ids.split(",") if c.strip()] if channel_ids else None
+    matrix = await svc.compute_heatmap(grouping=grouping, metric=metric, time_range=time_range, channel_ids=channel_list)
+    if compact:
+        return negotiated_response(compact_matrix(matrix.rows, matrix.cols, matrix.values, matrix.partialRows), compact=True)
+    return negotiated_response(matrix, compact=False)
+
+
+# ===== Server-Sent Events variants =====
+# Same parameters as the endpoints above; results stream as `text/event-stream` events
+# (`meta`, then `row`/`point`/`series` and `progress` as each channel completes, then `done`).
+
+
+@router.get("/stream/trend", response_class=StreamingResponse)
+async def stream_trend(
+    time_range: TimeRange = Query("week", alias="range"),
+    channel_ids: Optional[str] = Query(None),
+    svc: DashboardService = Depends(get_dashboard_service),
+) -> StreamingResponse:
+    channel_list = [c.strip() for c in channel_ids.split(",") if c.strip()] if channel_ids else None
+    return sse_response(svc.stream_trend(time_range=time_range, channel_ids=channel_list))
+
+
+@router.get("/stream/channels", response_class=StreamingResponse)
+async def stream_channel_metrics(
+    time_range: TimeRange = Query("week", alias="range"),
+    channel_ids: Optional[str] = Query(None),
+    svc: DashboardService = Depends(get_dashboard_service),
+) -> StreamingResponse:
+    channel_list = [c.strip() for c in channel_ids.split(",") if c.strip()] if channel_ids else None
+    return sse_response(svc.stream_channel_metrics(time_range=time_range, channel_ids=channel_list))
+
+
+@router.get("/stream/burnout-series", response_class=StreamingResponse)
+async def stream_burnout_series(
+    time_range: TimeRange = Query("week", alias="range"),
+    group: Literal["channels", "team", "person"] = Query("channels"),
+    channel_ids: Optional[str] = Query(None),
+    svc: DashboardService = Depends(get_dashboard_service),
+) -> StreamingResponse:
+    channel_list = [c.strip() for c in channel_ids.split(",") if c.strip()] if channel_ids else None
+    return sse_response(svc.stream_burnout_series(time_range=time_range, group=group, channel_ids=channel_list))
+
+
+@router.get("/stream/heatmap", response_class=StreamingResponse)
+async def stream_heatmap(
+    grouping: Literal["channels", "teams", "people"] = Query("channels"),
+    metric: Literal["sentiment", "messages", "threads"] = Query("sentiment"),
+    time_range: TimeRange = Query("week", alias="range"),
+    channel_ids: Optional[str] = Query(None),
+    svc: DashboardService = Depends(get_dashboard_service),
+) -> StreamingResponse:
+    channel_list = [c.strip() for c in channel_ids.split(",") if c.strip()] if channel_ids else None
+    return sse_response(svc.stream_heatmap(grouping=grouping, metric=metric, time_range=time_range, channel_ids=channel_list))
+
+
+# ===== Live updates =====
+
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+@router.websocket("/live")
+async def live_updates(
+    websocket: WebSocket,
+    time_range: TimeRange = Query("week", alias="range"),
+    channel_ids: Optional[str] = Query(None),
+    hub: LiveHub = Depends(get_live_hub),
+) -> None:
+    """Push `{"type", "data"}` messages: a `snapshot`, then `kpi`/`channels`/`trend` deltas.
+
+    Connections with the same team, range and channels share one computation.
+    """
+    await websocket.accept()
     channel_list = [c.strip() for c in channel_ids.split(",") if c.strip()] if channel_ids else None
-    return await svc.compute_heatmap(grouping=grouping, metric=metric, time_range=time_range, channel_ids=channel_list)
+    async with hub.subscribe(time_range, channel_list) as queue:
+        disconnected = asyncio.ensure_future(_wait_for_disconnect(websocket))
+        try:
+            while True:
+                next_message = asyncio.ensure_future(queue.get())
+                await asyncio.wait({next_message, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                if disconnected.done():
+                    next_message.cancel()
+                    return
+                kind, data = next_message.result()
+                await websocket.send_text(dumps({"type": kind, "data": data}).decode("utf-8"))
+        finally:
+            disconnected.cancel()
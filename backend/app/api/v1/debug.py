@@ -0,0 +1,32 @@
+from fastapi import APIRouter, HTTPException
+
+from app.core import tracing
+from app.core.config import get_settings
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+def _require_dev_tracing() -> None:
+    settings = get_settings()
+    if settings.environment != "development" or not settings.tracing_enabled:
+        raise HTTPException(status_code=404, detail="tracing_disabled")
+
+
+@router.get("/traces")
+async def list_traces(limit: int = 50) -> list[dict[str, object]]:
+    _require_dev_tracing()
+    out: list[dict[str, object]] = []
+    for trace in tracing.recent_traces()[: max(1, limit)]:
+        root = trace.spans[0]
+        out.append({"requestId": trace.request_id, "name": root.name, "durationMs": round(root.duration_ms, 3), "spans": len(trace.spans)})
+    return out
+
+
+@router.get("/traces/{request_id}")
+async def get_trace(request_id: str) -> dict[str, object]:
+    # Span tree for one request (id from the X-Request-ID response header)
+    _require_dev_tracing()
+    trace = tracing.get_trace(request_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="trace_not_found")
+    return trace.tree()
@@ -1,8 +1,16 @@
 from fastapi import APIRouter
 
+from app.core.admission import get_admission
+
 router = APIRouter(tags=["health"]) 
 
 
 @router.get("/health")
 async def health() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@router.get("/health/admission")
+async def admission() -> dict[str, object]:
+    # Current degradation mode and the signals behind it (see app/core/admission.py)
+    return get_admission().stats()
@@ -1,21 +1,20 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query
 
 from app.models.pydantic_types import Insight, TimeRange, LLMAnalyzeMessagesRequest, LLMAnalysisSummary
 from app.services.anthropic_service import AnthropicService
 from app.services.insights_service import InsightsService
+from app.api.deps import get_anthropic_service, get_insights_service, request_deadline
 
-router = APIRouter(prefix="/insights", tags=["insights"])
+router = APIRouter(prefix="/insights", tags=["insights"], dependencies=[Depends(request_deadline)])
 
 
 @router.get("/teams", response_model=list[Insight])
-async def get_team_insights(time_range: TimeRange = Query("week", alias="range"), limit: int = Query(5, ge=1, le=10)) -> list[Insight]:
-    svc = InsightsService()
+async def get_team_insights(time_range: TimeRange = Query("week", alias="range"), limit: int = Query(5, ge=1, le=10), svc: InsightsService = Depends(get_insights_service)) -> list[Insight]:
     insights = await svc.generate_team_insights(time_range=time_range, limit=limit)
     # Ensure we never return more than requested
     return insights[:limit]
 
 
 @router.post("/analyze", response_model=LLMAnalysisSummary)
-async def analyze_messages(payload: LLMAnalyzeMessagesRequest) -> LLMAnalysisSummary:
-    service = AnthropicService()
+async def analyze_messages(payload: LLMAnalyzeMessagesRequest, service: AnthropicService = Depends(get_anthropic_service)) -> LLMAnalysisSummary:
     return await service.analyze_slack_messages(payload.messages)
@@ -1,5 +1,5 @@
 from typing import Optional
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query
 
 from app.models.pydantic_types import (
     EntityTotalMetric,
@@ -7,10 +7,12 @@ from app.models.pydantic_types import (
     TimeRange,
     Perspective,
 )
+from app.api.deps import get_metrics_service, request_deadline
+from app.core.serialization import FastJSONResponse
 from app.services.metrics_service import MetricsService
 
 
-router = APIRouter(prefix="/metrics", tags=["metrics"])
+router = APIRouter(prefix="/metrics", tags=["metrics"], dependencies=[Depends(request_deadline)])
 
 
 @router.get("/entity-totals", response_model=list[EntityTotalMetric])
@@ -18,12 +20,12 @@ async def entity_totals(
     perspective: Perspective = Query("channel"),
     time_range: TimeRange = Query("week", alias="range"),
     channel_ids: Optional[str] = Query(None, description="Comma-separated channel IDs to include"),
-) -> list[EntityTotalMetric]:
-    service = MetricsService()
+    service: MetricsService = Depends(get_metrics_service),
+) -> FastJSONResponse:
     selected_channels = None
     if channel_ids:
         selected_channels = [c.strip() for c in channel_ids.split(",") if c.strip()]
-    return await service.compute_entity_totals(time_range=time_range, perspective=perspective, channel_ids=selected_channels)
+    return FastJSONResponse(await service.compute_entity_totals(time_range=time_range, perspective=perspective, channel_ids=selected_channels))
 
 
 @router.get("/top-emojis", response_model=list[EmojiStat])
@@ -31,11 +33,11 @@ async def top_emojis(
     time_range: TimeRange = Query("week", alias="range"),
     limit: int = Query(10, ge=1, le=50),
     channel_ids: Optional[str] = Query(None),
-) -> list[EmojiStat]:
-    service = MetricsService()
+    service: MetricsService = Depends(get_metrics_service),
+) -> FastJSONResponse:
     selected_channels = None
     if channel_ids:
         selected_channels = [c.strip() for c in channel_ids.split(",") if c.strip()]
-    return await service.compute_top_emojis(time_range=time_range, limit=limit, channel_ids=selected_channels)
+    return FastJSONResponse(await service.compute_top_emojis(time_range=time_range, limit=limit, channel_ids=selected_channels))
 
 
@@ -1,10 +1,12 @@
+import time
 from typing import Optional
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import JSONResponse, RedirectResponse
 
 from app.models.pydantic_types import (
     SlackChannel,
     SlackConnection,
+    SlackMessage,
     SlackMessagesResponse,
     SlackOAuthUrl,
     SlackOAuthExchangeRequest,
@@ -13,26 +15,28 @@ from app.models.pydantic_types import (
     SlackUser,
     SlackDevRehydrateRequest,
 )
+from app.api.deps import get_slack_service
+from app.api.pagination import decode_cursor, next_cursor_headers, parse_fields, project
+from app.core.serialization import FastJSONResponse
+from app.services import message_store, user_store
 from app.services.slack_service import SlackService
+from app.services.state_store import StateStoreError
 
 router = APIRouter(prefix="/slack", tags=["slack"])
 
 
 @router.get("/connection", response_model=SlackConnection)
-async def get_connection() -> SlackConnection:
-    service = SlackService()
+async def get_connection(service: SlackService = Depends(get_slack_service)) -> SlackConnection:
     return await service.get_connection()
 
 
 @router.get("/oauth/url", response_model=SlackOAuthUrl)
-async def get_oauth_url(return_to: Optional[str] = Query(None), redirect_uri: Optional[str] = Query(None)) -> SlackOAuthUrl:
-    service = SlackService()
+async def get_oauth_url(return_to: Optional[str] = Query(None), redirect_uri: Optional[str] = Query(None), service: SlackService = Depends(get_slack_service)) -> SlackOAuthUrl:
     return await service.get_oauth_url(return_to=return_to, override_redirect_uri=redirect_uri)
 
 
 @router.get("/oauth/callback")
-async def oauth_callback(code: str = Query(...), state: str = Query(...), redirect_uri: Optional[str] = Query(None)):
-    service = SlackService()
+async def oauth_callback(code: str = Query(...), state: str = Query(...), redirect_uri: Optional[str] = Query(None), service: SlackService = Depends(get_slack_service)):
     result = await service.handle_oauth_callback(code=code, state=state, override_redirect_uri=redirect_uri)
     # If we have a return URL and success, redirect user back to frontend
     if result.ok and result.returnTo:
@@ -45,48 +49,81 @@ async def oauth_callback(code: str = Query(...), state: str = Query(...), redire
 
 
 @router.post("/oauth/exchange")
-async def oauth_exchange(payload: SlackOAuthExchangeRequest):
-    service = SlackService()
+async def oauth_exchange(payload: SlackOAuthExchangeRequest, service: SlackService = Depends(get_slack_service)):
     result = await service.handle_oauth_callback(code=payload.code, state=payload.state, override_redirect_uri=payload.redirectUri)
     return JSONResponse(content=result.model_dump())
 
 
 @router.post("/dev/rehydrate", response_model=SlackConnection)
-async def dev_rehydrate(payload: SlackDevRehydrateRequest) -> SlackConnection:
-    service = SlackService()
+async def dev_rehydrate(payload: SlackDevRehydrateRequest, service: SlackService = Depends(get_slack_service)) -> SlackConnection:
     return await service.dev_rehydrate_installation(payload)
 
 
 @router.get("/channels", response_model=list[SlackChannel])
-async def list_channels() -> list[SlackChannel]:
-    service = SlackService()
-    return await service.list_channels()
+async def list_channels(service: SlackService = Depends(get_slack_service)) -> FastJSONResponse:
+    return FastJSONResponse(await service.list_channels())
 
 
 @router.post("/channels/select", response_model=SlackSelectedChannels)
-async def select_channels(payload: SlackSelectChannelsRequest) -> SlackSelectedChannels:
-    service = SlackService()
-    return await service.select_channels(payload)
+async def select_channels(payload: SlackSelectChannelsRequest, service: SlackService = Depends(get_slack_service)) -> SlackSelectedChannels:
+    try:
+        return await service.select_channels(payload)
+    except StateStoreError:
+        raise HTTPException(status_code=503, detail="selection_not_persisted")
 
 
 @router.get("/channels/selected", response_model=SlackSelectedChannels)
-async def get_selected_channels() -> SlackSelectedChannels:
-    service = SlackService()
+async def get_selected_channels(service: SlackService = Depends(get_slack_service)) -> SlackSelectedChannels:
     return await service.get_selected_channels()
 
 
+# Served from the local message/user stores. Pages are newest-first for messages and by user ID
+# for users; pass `cursor` from the previous page's X-Next-Cursor header to continue.
+# `fields=` keeps only the listed fields per item.
+
+_DEFAULT_HISTORY_DAYS = 30
+
+
 @router.get("/channels/{channel_id}/messages", response_model=SlackMessagesResponse)
 async def get_channel_messages(
     channel_id: str,
-    oldest: Optional[str] = None,
-    latest: Optional[str] = None,
-    limit: int = 200,
-) -> SlackMessagesResponse:
-    service = SlackService()
-    return await service.get_channel_messages(channel_id=channel_id, oldest=oldest, latest=latest, limit=limit)
+    oldest: Optional[float] = Query(None, description="Unix ts; defaults to 30 days ago"),
+    latest: Optional[float] = None,
+    limit: int = Query(200, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    user: Optional[str] = Query(None, description="Only messages from this user ID"),
+    has_reactions: Optional[bool] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated SlackMessage fields"),
+    service: SlackService = Depends(get_slack_service),
+) -> FastJSONResponse:
+    selected = parse_fields(fields, SlackMessage)
+    window, rows, next_before = await message_store.find_messages(
+        service,
+        channel_id,
+        oldest=oldest if oldest is not None else time.time() - _DEFAULT_HISTORY_DAYS * 86400,
+        latest=latest,
+        before=decode_cursor(cursor, float),
+        user_id=user,
+        has_reactions=has_reactions,
+        limit=limit,
+    )
+    return FastJSONResponse(
+        {"channelId": channel_id, "messages": project(window.to_messages(rows), selected)},
+        headers=next_cursor_headers(next_before),
+    )
 
 
 @router.get("/users", response_model=list[SlackUser])
-async def list_users() -> list[SlackUser]:
-    service = SlackService()
-    return await service.list_users()
+async def list_users(
+    limit: int = Query(200, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    q: Optional[str] = Query(None, description="Substring of username or display name"),
+    is_bot: Optional[bool] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated SlackUser fields"),
+    service: SlackService = Depends(get_slack_service),
+) -> FastJSONResponse:
+    selected = parse_fields(fields, SlackUser)
+    users, next_after = await user_store.find_users(
+        service, after=decode_cursor(cursor, str), query=q, is_bot=is_bot, limit=limit
+    )
+    return FastJSONResponse(project(users, selected), headers=next_cursor_headers(next_after))
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import AsyncIterator, Literal, Optional
+
+from app.core import telemetry
+from app.core.config import get_settings
+
+
+# Admission control under load. The controller tracks in-flight Anthropic calls and
+# event-loop lag (sampled by a background task started in the app lifespan) and derives a mode:
+#   normal     full service
+#   degraded   new requests score heuristically and serve cached Slack windows even if stale
+#   saturated  as degraded, and low-priority routes are refused with 503 + Retry-After
+# The mode is sampled once when a request arrives (`AdmissionMiddleware`), pinned to the
+# request's context and reported in the X-Degradation-Mode response header.
+
+Mode = Literal["normal", "degraded", "saturated"]
+MODE_HEADER = "X-Degradation-Mode"
+
+_REQUEST_MODE: ContextVar[Mode] = ContextVar("admission_mode", default="normal")
+
+
+def request_mode() -> Mode:
+    return _REQUEST_MODE.get()
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        *,
+        degrade_in_flight: int,
+        shed_in_flight: int,
+        degrade_lag_ms: float,
+        shed_lag_ms: float,
+        sample_interval: float = 0.25,
+    ) -> None:
+        self.degrade_in_flight = degrade_in_flight
+        self.shed_in_flight = shed_in_flight
+        self.degrade_lag_ms = degrade_lag_ms
+        self.shed_lag_ms = shed_lag_ms
+        self.sample_interval = sample_interval
+        self.llm_in_flight = 0
+        self.loop_lag_ms = 0.0
+        # Requests admitted per mode, and refused
+        self.admitted: dict[str, int] = {"normal": 0, "degraded": 0, "saturated": 0}
+        self.shed = 0
+        self._monitor: Optional[asyncio.Task] = None
+
+    def mode(self) -> Mode:
+        if self.llm_in_flight >= self.shed_in_flight or self.loop_lag_ms >= self.shed_lag_ms:
+            return "saturated"
+        if self.llm_in_flight >= self.degrade_in_flight or self.loop_lag_ms >= self.degrade_lag_ms:
+            return "degraded"
+        return "normal"
+
+    @contextlib.asynccontextmanager
+    async def llm_call(self) -> AsyncIterator[None]:
+        self.llm_in_flight += 1
+        try:
+            yield
+        finally:
+            self.llm_in_flight -= 1
+
+    def record_lag(self, lag_ms: float) -> None:
+        # Rise immediately, decay gradually, so one quiet sample does not end a degraded period
+        self.loop_lag_ms = lag_ms if lag_ms >= self.loop_lag_ms else 0.7 * self.loop_lag_ms + 0.3 * lag_ms
+
+    async def _sample_loop_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.sample_interval)
+            self.record_lag(max(0.0, (loop.time() - started - self.sample_interval) * 1000.0))
+
+    def start(self) -> None:
+        if self._monitor is None or self._monitor.done():
+            self._monitor = asyncio.get_running_loop().create_task(self._sample_loop_lag())
+
+    async def stop(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._monitor
+            self._monitor = None
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "mode": self.mode(),
+            "llmInFlight": self.llm_in_flight,
+            "loopLagMs": round(self.loop_lag_ms, 1),
+            "admitted": dict(self.admitted),
+            "shed": self.shed,
+        }
+
+
+@lru_cache
+def get_admission() -> AdmissionController:
+    settings = get_settings()
+    return AdmissionController(
+        degrade_in_flight=settings.admission_llm_degrade_in_flight,
+        shed_in_flight=settings.admission_llm_shed_in_flight,
+        degrade_lag_ms=settings.admission_loop_lag_degrade_ms,
+        shed_lag_ms=settings.admission_loop_lag_shed_ms,
+    )
+
+
+_MODE_GAUGE = telemetry.REGISTRY.gauge("pulse_admission_mode", "1 for the current degradation mode, else 0", ("mode",))
+_LOOP_LAG = telemetry.REGISTRY.gauge("pulse_event_loop_lag_seconds", "Smoothed event-loop scheduling lag")
+_LLM_IN_FLIGHT = telemetry.REGISTRY.gauge("pulse_anthropic_in_flight", "Anthropic calls currently in flight")
+_ADMITTED = telemetry.REGISTRY.counter("pulse_admission_requests_total", "Requests admitted, by mode", ("mode",))
+_SHED = telemetry.REGISTRY.counter("pulse_admission_shed_total", "Requests refused with 503 while saturated")
+
+
+@telemetry.REGISTRY.collector
+def _collect() -> None:
+    controller = get_admission()
+    current = controller.mode()
+    for mode, admitted in controller.admitted.items():
+        _MODE_GAUGE.set(1.0 if mode == current else 0.0, mode)
+        _ADMITTED.set_total(admitted, mode)
+    _SHED.set_total(controller.shed)
+    _LOOP_LAG.set(controller.loop_lag_ms / 1000.0)
+    _LLM_IN_FLIGHT.set(controller.llm_in_flight)
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware: pins the admission mode to each HTTP request and sheds low-priority routes."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        settings = get_settings()
+        controller = get_admission()
+        mode = controller.mode()
+        header = (MODE_HEADER.lower().encode(), mode.encode())
+
+        if mode == "saturated" and scope["path"].startswith(tuple(settings.admission_low_priority_paths)):
+            controller.shed += 1
+            logging.getLogger(__name__).warning("admission: shedding %s (%s)", scope["path"], controller.stats())
+            body = b'{"detail":"overloaded"}'
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 503,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode()),
+                        (b"retry-after", str(settings.admission_retry_after_seconds).encode()),
+                        header,
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        controller.admitted[mode] += 1
+
+        async def send_with_mode(message) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), header]}
+            await send(message)
+
+        token = _REQUEST_MODE.set(mode)
+        try:
+            await self.app(scope, receive, send_with_mode)
+        finally:
+            _REQUEST_MODE.reset(token)
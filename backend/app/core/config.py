@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import Optional
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -8,7 +8,41 @@ class Settings(BaseSettings):
 
     environment: str = "development"
     database_url: Optional[str] = None
+    # Prisma query-engine pool (see app/core/db.py); shared by all requests in a worker
+    database_pool_size: int = 10
+    database_pool_timeout: int = 10
     cors_allow_origins: list[str] = ["*"]
+    # Default time budget for dashboard/metrics/insights requests (`?timeout_ms=` overrides).
+    # Entries not finished in time come from cached data or heuristic scores and are marked
+    # `partial`; 0 disables the deadline.
+    request_timeout_ms: int = 20_000
+    # Admission control (see app/core/admission.py): in-flight LLM calls / event-loop lag at
+    # which new requests degrade to heuristic scoring and cached data, and at which
+    # low-priority routes are refused with 503 + Retry-After
+    admission_llm_degrade_in_flight: int = 8
+    admission_llm_shed_in_flight: int = 16
+    admission_loop_lag_degrade_ms: float = 100.0
+    admission_loop_lag_shed_ms: float = 500.0
+    admission_low_priority_paths: list[str] = ["/api/v1/insights"]
+    admission_retry_after_seconds: int = 5
+    # Per-request span tracing (see app/core/tracing.py); traces are served by
+    # /api/v1/debug/traces in development only, and exported to an OTLP/HTTP collector
+    # (e.g. http://localhost:4318) when `otlp_endpoint` is set
+    tracing_enabled: bool = False
+    tracing_max_traces: int = 200
+    otlp_endpoint: Optional[str] = None
+    # Per-request profiler (`?profile=1`, see app/core/profiling.py): allowed when ENVIRONMENT
+    # is explicitly development, or with an `X-Profile-Token` header matching `profiling_token`
+    profiling_token: Optional[str] = None
+    profile_interval_ms: float = 1.0
+    profile_dir: str = "profiles"
+    # Responses smaller than this many bytes are sent uncompressed (see app/core/compression.py)
+    compression_minimum_size: int = 1024
+
+    # OAuth states and Slack installations (see app/services/state_backend.py).
+    # "memory" is per process; use "sqlite" when running more than one uvicorn worker.
+    state_backend: Literal["memory", "sqlite"] = "memory"
+    state_sqlite_path: str = "./.pulse_state.sqlite3"
 
     # Slack OAuth / API configuration
     slack_client_id: Optional[str] = None
@@ -18,10 +52,47 @@ class Settings(BaseSettings):
     # Comma-separated scopes for the bot token; Slack expects a comma-delimited string
     slack_bot_scopes: str = (
         "channels:read,groups:read,chat:write,users:read,emoji:read,"
-        "channels:history,groups:history"
+        "channels:history,groups:history,usergroups:read"
     )
     # Optional user scopes if needed in the future
     slack_user_scopes: Optional[str] = None
+    # Web API base URL; point at scripts/fake_slack.py (http://127.0.0.1:8765/api) to run offline
+    slack_api_base: str = "https://slack.com/api"
+
+    # Max `conversations.history` pages (of 200) fetched when loading one channel window
+    slack_history_max_pages: int = 20
+    # `conversations.replies` is Tier 3; keep concurrent thread fetches modest
+    slack_replies_concurrency: int = 4
+    # Retries on HTTP 429 (honouring Retry-After) before giving up on a call
+    slack_max_retries: int = 3
+    # Concurrent Slack Web API calls per process, shared round-robin across workspaces,
+    # and the most any single workspace may hold (see app/services/tenant_limits.py)
+    slack_global_concurrency: int = 16
+    slack_tenant_concurrency: int = 4
+
+    # In-process channel window cache (see app/services/message_store.py)
+    # Windows younger than the TTL are served as-is; older ones fetch only the new tail,
+    # and are fully refetched (to pick up edits/reactions) after the max age. The tail does
+    # not include older thread roots, so their reply_count/latest_reply (and thus which
+    # threads get their replies refetched) can lag by up to the max age.
+    message_cache_ttl_seconds: int = 60
+    message_cache_max_age_seconds: int = 900
+    message_cache_max_windows: int = 512
+    # Cap per workspace so one large tenant cannot evict everyone else's windows
+    message_cache_max_windows_per_team: int = 128
+
+    # How often live dashboard topics (WebSocket) pull new messages and push deltas. Defaults
+    # to the message cache TTL: windows are only tail-fetched once past it, so polling more
+    # often finds nothing new
+    live_update_interval_seconds: Optional[float] = None
+
+    # Workspace member list cache (see app/services/user_store.py)
+    slack_users_ttl_seconds: int = 900
+
+    # Team membership directory for the "team" metrics perspective (see app/services/team_directory.py).
+    # A JSON or CSV file takes precedence over Slack user groups.
+    team_directory_file: Optional[str] = None
+    team_directory_ttl_seconds: int = 3600
 
     # Anthropic configuration
     anthropic_api_key: Optional[str] = None
@@ -30,6 +101,8 @@ class Settings(BaseSettings):
     anthropic_default_temperature: float = 0.2
     anthropic_disable_fallback: bool = False
     anthropic_api_base: Optional[str] = None
+    # LLM analyses per workspace per minute; over quota falls back to the heuristic (0 = unlimited)
+    llm_calls_per_minute_per_tenant: int = 30
 
 
 @lru_cache
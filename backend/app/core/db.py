@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from app.core.config import get_settings
+
+
+# Process-wide Prisma client. Connected once at startup; the query engine keeps a pool
+# of `database_pool_size` connections that every request shares.
+_client: Any = None
+
+
+def _pooled_url(url: str, pool_size: int, pool_timeout: int) -> str:
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query.setdefault("connection_limit", str(pool_size))
+    query.setdefault("pool_timeout", str(pool_timeout))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def get_db() -> Any:
+    """Return the connected Prisma client, or None when persistence is not configured."""
+    return _client
+
+
+async def connect_db() -> Any:
+    global _client
+    settings = get_settings()
+    if _client is not None or not settings.database_url:
+        return _client
+    try:
+        from prisma import Prisma  # type: ignore
+    except ImportError:
+        logging.getLogger(__name__).warning("db: DATABASE_URL is set but prisma is not installed; persistence disabled")
+        return None
+    client = Prisma(
+        datasource={"url": _pooled_url(settings.database_url, settings.database_pool_size, settings.database_pool_timeout)},
+    )
+    try:
+        await client.connect()
+    except Exception as exc:
+        logging.getLogger(__name__).error("db: connect failed, persistence disabled: %s", exc)
+        return None
+    _client = client
+    logging.getLogger(__name__).info("db: connected (pool_size=%d)", settings.database_pool_size)
+    return _client
+
+
+async def disconnect_db() -> None:
+    global _client
+    client: Optional[Any] = _client
+    _client = None
+    if client is not None:
+        await client.disconnect()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+# Per-request time budget. Set by the `request_deadline` dependency (app/api/deps.py) from
+# `?timeout_ms=` or the `request_timeout_ms` setting; services await Slack and Anthropic
+# through `bounded()`, which returns a fallback (cached window, heuristic score) once the
+# budget is spent and reports that the value is partial.
+
+_DEADLINE: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+# Shielded work left running past its budget; the loop only holds tasks weakly
+_BACKGROUND: set[asyncio.Task] = set()
+
+
+def set_deadline(timeout_ms: Optional[int]):
+    """Start a budget of `timeout_ms` (None or <= 0: unbounded); returns a token for `reset_deadline`."""
+    return _DEADLINE.set(time.monotonic() + timeout_ms / 1000.0 if timeout_ms and timeout_ms > 0 else None)
+
+
+def reset_deadline(token) -> None:
+    _DEADLINE.reset(token)
+
+
+def current() -> Optional[float]:
+    """The current budget's absolute deadline (`time.monotonic()` clock), for `enter_deadline`."""
+    return _DEADLINE.get()
+
+
+def enter_deadline(at: Optional[float]):
+    """Re-enter a deadline captured with `current()`, e.g. in a response body that outlives
+    the request dependencies; returns a token for `reset_deadline`."""
+    return _DEADLINE.set(at)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current budget, or None when unbounded."""
+    deadline = _DEADLINE.get()
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def _finished(task: asyncio.Task) -> None:
+    _BACKGROUND.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logging.getLogger(__name__).warning("deadline: background work failed: %r", task.exception())
+
+
+def _keep_running(task: asyncio.Task) -> None:
+    _BACKGROUND.add(task)
+    task.add_done_callback(_finished)
+
+
+async def bounded(aw: Awaitable[T], fallback: Callable[[], T], *, shield: bool = False) -> tuple[T, bool]:
+    """Await `aw` within the remaining budget; `(fallback(), True)` when it runs out.
+
+    With `shield=True` the work keeps running in the background after the budget is spent,
+    so e.g. a Slack fetch still lands in the cache for the next request.
+    """
+    left = remaining()
+    if left is None:
+        return await aw, False
+    task = asyncio.ensure_future(aw)
+    # Even with no budget left the task gets one step, so work that needs no I/O (a cache
+    # hit) still completes instead of being reported as partial
+    try:
+        done, _ = await asyncio.wait({task}, timeout=left)
+    except asyncio.CancelledError:
+        if shield:
+            _keep_running(task)
+        else:
+            task.cancel()
+        raise
+    if task in done:
+        return task.result(), False
+    if shield:
+        _keep_running(task)
+    else:
+        task.cancel()
+    return fallback(), True
@@ -1,35 +1,161 @@
-import os
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
 from logging.config import dictConfig
+from typing import Optional
+
+from app.core import telemetry
+from app.core.serialization import dumps
+from app.core.tenancy import requested_team
+from app.core.tracing import current_request
+
+# Records go through a bounded queue on the calling thread, and a QueueListener thread
+# writes them to stdout, so a slow stdout never blocks the event loop. When the queue is
+# full, records are counted and dropped instead of waiting. LOG_FORMAT=json writes one
+# object per line with request id, team and elapsed request time. LOG_DEBUG_SAMPLE_RATE
+# keeps that fraction of DEBUG records per call site. LOG_QUEUE=0 logs synchronously,
+# e.g. when chasing a crash. Dropped records are exported as pulse_log_records_dropped_total.
+
+TEXT_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
+_dropped_before = 0  # drops counted by handlers replaced on reconfiguration
+
+_DROPPED = telemetry.REGISTRY.counter(
+	"pulse_log_records_dropped_total", "Log records dropped because the log queue was full"
+)
+
+
+class RequestContextFilter(logging.Filter):
+	"""Stamp records with request id, team and elapsed request time (on the calling thread)."""
+
+	def filter(self, record: logging.LogRecord) -> bool:
+		request = current_request()
+		record.request_id = request[0] if request else None
+		record.latency_ms = round((time.perf_counter() - request[1]) * 1000.0, 1) if request else None
+		record.team = requested_team()
+		return True
+
+
+class DebugSampler(logging.Filter):
+	"""Keep every Nth DEBUG record per call site (N = 1 / rate); other levels always pass."""
+
+	def __init__(self, rate: float) -> None:
+		super().__init__()
+		self.every = max(1, round(1.0 / rate)) if rate > 0 else 0
+		self._seen: dict[tuple[str, int], int] = {}
+
+	def filter(self, record: logging.LogRecord) -> bool:
+		if record.levelno > logging.DEBUG or self.every == 1:
+			return True
+		if self.every == 0:
+			return False
+		key = (record.pathname, record.lineno)
+		seen = self._seen.get(key, 0)
+		self._seen[key] = seen + 1
+		return seen % self.every == 0
+
+
+class JsonFormatter(logging.Formatter):
+	def format(self, record: logging.LogRecord) -> str:
+		entry = {
+			"ts": f"{self.formatTime(record, '%Y-%m-%dT%H:%M:%S')}.{int(record.msecs):03d}",
+			"level": record.levelname,
+			"logger": record.name,
+			"msg": record.getMessage(),
+		}
+		for field in ("request_id", "team", "latency_ms"):
+			value = getattr(record, field, None)
+			if value is not None:
+				entry[field] = value
+		if record.exc_info and not record.exc_text:
+			record.exc_text = self.formatException(record.exc_info)
+		if record.exc_text:
+			entry["exc"] = record.exc_text
+		return dumps(entry).decode()
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+	"""QueueHandler that never blocks: records that do not fit are counted and dropped."""
+
+	def __init__(self, maxsize: int) -> None:
+		# SimpleQueue (C, lock-free put) with an approximate bound; queue.Queue(maxsize) takes a
+		# Python-level lock and condition per record and roughly doubles the per-call cost
+		super().__init__(queue.SimpleQueue())
+		self.maxsize = maxsize
+		self.dropped = 0
+
+	def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+		# Render the message now (args may change after the call); formatting and timestamps
+		# happen on the listener thread
+		record.msg = record.getMessage()
+		record.args = None
+		if record.exc_info:
+			record.exc_text = logging.Formatter().formatException(record.exc_info)
+			record.exc_info = None
+		return record
+
+	def enqueue(self, record: logging.LogRecord) -> None:
+		if self.queue.qsize() >= self.maxsize:
+			self.dropped += 1
+			return
+		self.queue.put_nowait(record)
+
+
+def stop_logging() -> None:
+	"""Write out queued records and stop the listener thread."""
+	global _listener, _queue_handler, _dropped_before
+	if _listener is not None:
+		_listener.stop()
+		_listener = None
+	if _queue_handler is not None:
+		_dropped_before += _queue_handler.dropped
+		_queue_handler = None
+
+
+@telemetry.REGISTRY.collector
+def _collect() -> None:
+	_DROPPED.set_total(_dropped_before + (_queue_handler.dropped if _queue_handler is not None else 0))
+
 
 def configure_logging() -> None:
+	global _listener, _queue_handler
+	stop_logging()
 	level = os.getenv("LOG_LEVEL", "INFO").upper()
+	console = logging.StreamHandler(sys.stdout)
+	if os.getenv("LOG_FORMAT", "text").lower() == "json":
+		console.setFormatter(JsonFormatter())
+	else:
+		console.setFormatter(logging.Formatter(TEXT_FORMAT, DATE_FORMAT))
+	if os.getenv("LOG_QUEUE", "1").lower() in ("1", "true", "yes"):
+		_queue_handler = DroppingQueueHandler(int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+		handler: logging.Handler = _queue_handler
+		_listener = logging.handlers.QueueListener(_queue_handler.queue, console, respect_handler_level=True)
+	else:
+		handler = console
+	handler.addFilter(DebugSampler(float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1") or 1)))
+	handler.addFilter(RequestContextFilter())
 	dictConfig(
 		{
 			"version": 1,
 			"disable_existing_loggers": False,
-			"formatters": {
-				"default": {
-					"format": "%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-					"datefmt": "%Y-%m-%d %H:%M:%S",
-				}
-			},
-			"handlers": {
-				"console": {
-					"class": "logging.StreamHandler",
-					"formatter": "default",
-					"stream": "ext://sys.stdout",
-				}
-			},
+			"handlers": {"main": {"()": lambda: handler}},
 			"loggers": {
-				"uvicorn": {"handlers": ["console"], "level": level},
-				"uvicorn.error": {"handlers": ["console"], "level": level, "propagate": True},
-				"uvicorn.access": {"handlers": ["console"], "level": level, "propagate": False},
-				"app": {"handlers": ["console"], "level": level, "propagate": False},
+				"uvicorn": {"handlers": ["main"], "level": level},
+				"uvicorn.error": {"handlers": ["main"], "level": level, "propagate": True},
+				"uvicorn.access": {"handlers": ["main"], "level": level, "propagate": False},
+				"app": {"handlers": ["main"], "level": level, "propagate": False},
 			},
-			"root": {"handlers": ["console"], "level": level},
+			"root": {"handlers": ["main"], "level": level},
 		}
 	)
+	if _listener is not None:
+		_listener.start()
 
 	# Optional per-module debug overrides via env flags
 	if os.getenv("DEBUG_METRICS", "").lower() in ("1", "true", "yes"):  # pragma: no cover
@@ -40,3 +166,6 @@ def configure_logging() -> None:
 	if os.getenv("DEBUG_DASHBOARD", "").lower() in ("1", "true", "yes"):  # pragma: no cover
 		logging.getLogger("app.services.dashboard_service").setLevel("DEBUG")
 		logging.getLogger("app.api.v1.dashboard").setLevel("DEBUG")
+
+
+atexit.register(stop_logging)
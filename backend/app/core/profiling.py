@@ -0,0 +1,366 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import gc
+import logging
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from pathlib import Path
+from types import FrameType
+from typing import Any, Optional
+from urllib.parse import parse_qs
+
+from app.core.config import get_settings
+from app.core.serialization import dumps
+
+
+# Opt-in per-request profiler: `?profile=1` (or `X-Profile: 1`) answers with the request's
+# call tree instead of its payload; `profile=disk` returns the normal response and writes the
+# tree to `profile_dir` (path in X-Profile-File). Allowed when ENVIRONMENT is explicitly set
+# to development, or otherwise with `X-Profile-Token` matching the `profiling_token` setting;
+# else the flag is ignored. The "development" default alone does not enable it.
+#
+# A sampling thread records the request's stacks every `profile_interval_ms`. Await time is
+# included: a suspended task is sampled by walking its await chain (through async generators
+# too), and from there into the tasks it waits on: awaited tasks, gather() children and task
+# lists held in locals (asyncio.wait(), as_completed(), the dashboard's channel fan-out). So
+# the tree shows which channel fetch `compute_heatmap` is waiting on. Concurrent branches are
+# each counted for the full sample, so sibling times can add up to more than wall time.
+#
+# Following awaits into other tasks reads CPython/asyncio internals that are not public API:
+# `Task._fut_waiter` (what a task is parked on), `_GatheringFuture._children` (gather()'s
+# tasks) and gc.get_referents() on `async_generator_asend` (the generator behind `async for`).
+# `missing_internals()` checks them on the first profiled request (tests/test_profiling.py
+# pins them too). Whatever is missing is logged and listed in the report as `unsupported`, and
+# the tree then stops at the awaiting frame instead of following into the awaited task.
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+PROFILE_FILE_HEADER = "X-Profile-File"
+
+_Key = tuple[str, str, int]
+
+
+def _frame_key(frame: FrameType) -> _Key:
+    code = frame.f_code
+    return (code.co_name, code.co_filename, code.co_firstlineno)
+
+
+def _step(obj: Any) -> tuple[Optional[FrameType], Any]:
+    """(frame, awaited object) of a suspended coroutine, async generator or generator."""
+    if type(obj).__name__ == "async_generator_asend":
+        # `async for` awaits an asend wrapper; its generator is only reachable through gc
+        obj = next((r for r in gc.get_referents(obj) if hasattr(r, "ag_frame")), None)
+    for frame_attr, await_attr in (("cr_frame", "cr_await"), ("ag_frame", "ag_await"), ("gi_frame", "gi_yieldfrom")):
+        frame = getattr(obj, frame_attr, None)
+        if frame is not None:
+            return frame, getattr(obj, await_attr, None)
+    return None, obj
+
+
+def _coro_chain(coro: Any) -> tuple[list[FrameType], Any]:
+    """Frames of a suspended coroutine's await chain and the object the innermost one awaits."""
+    frames: list[FrameType] = []
+    frame, awaited = _step(coro)
+    while frame is not None:
+        frames.append(frame)
+        frame, awaited = _step(awaited)
+    return frames, awaited
+
+
+def _waiter(task: asyncio.Task) -> Optional[asyncio.Future]:
+    """The future a suspended task is parked on (internal `Task._fut_waiter`)."""
+    return getattr(task, "_fut_waiter", None)
+
+
+def _gather_children(future: asyncio.Future) -> list[asyncio.Future]:
+    """The futures a gather() is waiting on (internal `_GatheringFuture._children`)."""
+    return list(getattr(future, "_children", None) or ())
+
+
+async def _probe() -> tuple[str, ...]:
+    gate = asyncio.get_running_loop().create_future()
+
+    async def stream():
+        await gate
+        yield None
+
+    async def consume() -> None:
+        async for _ in stream():
+            pass
+
+    async def parked() -> None:
+        await gate
+
+    child = asyncio.ensure_future(parked())
+    gathering = asyncio.gather(child)
+    streaming = asyncio.ensure_future(consume())
+
+    async def wait_gather() -> None:
+        await gathering
+
+    waiting = asyncio.ensure_future(wait_gather())
+    await asyncio.sleep(0)
+    missing = []
+    if _waiter(waiting) is not gathering:
+        missing.append("Task._fut_waiter")
+    if child not in _gather_children(gathering):
+        missing.append("_GatheringFuture._children")
+    frames, _ = _coro_chain(streaming.get_coro())
+    if not any(f.f_code is stream.__code__ for f in frames):
+        missing.append("async_generator_asend referents")
+    gate.set_result(None)
+    await asyncio.gather(streaming, waiting)
+    return tuple(missing)
+
+
+@functools.lru_cache(maxsize=None)
+def missing_internals() -> tuple[str, ...]:
+    """The internals listed above that this interpreter does not expose as the sampler expects.
+    Runs its own event loop, so call it off the serving loop's thread."""
+    loop = asyncio.new_event_loop()
+    try:
+        missing = loop.run_until_complete(_probe())
+    finally:
+        loop.close()
+    if missing:
+        logging.getLogger(__name__).warning("profiling: asyncio internals changed (%s); call trees stop at awaits", ", ".join(missing))
+    return missing
+
+
+def _pending_tasks(frames: list[FrameType]) -> list[asyncio.Task]:
+    """Unfinished tasks held in locals of the innermost frame that has any (asyncio.wait,
+    as_completed and hand-rolled fan-outs keep theirs in a list or set)."""
+    for frame in reversed(frames):
+        found: list[asyncio.Task] = []
+        for value in frame.f_locals.values():
+            items = value if isinstance(value, (list, set, tuple)) else (value,)
+            found.extend(t for t in items if isinstance(t, asyncio.Task) and not t.done())
+        if found:
+            return list(dict.fromkeys(found))
+    return []
+
+
+class _Sampler:
+    def __init__(self, task: asyncio.Task, interval: float, unsupported: tuple[str, ...] = ()) -> None:
+        self.task = task
+        self.loop = task.get_loop()
+        self.interval = interval
+        self.unsupported = unsupported
+        self.thread_id = threading.get_ident()
+        self.counts: dict[tuple[_Key, ...], int] = {}
+        self.samples = 0
+        self.failed = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> float:
+        if not self._stop.is_set():
+            self._stop.set()
+            self._thread.join()
+            self.elapsed = time.perf_counter() - self.started
+        return self.elapsed
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self._sample()
+            except Exception:
+                # The loop keeps running while we look (e.g. a frame's locals change size);
+                # occasional misses are expected, so count them and log only the first
+                self.failed += 1
+                if self.failed == 1:
+                    logging.getLogger(__name__).warning("profiling: sample failed", exc_info=True)
+
+    def _sample(self) -> None:
+        running = asyncio.current_task(self.loop)
+        thread_frame = sys._current_frames().get(self.thread_id)
+        stacks: list[list[_Key]] = []
+        self._task_stacks(self.task, [], stacks, running, thread_frame, depth=0)
+        self.samples += 1
+        for stack in stacks:
+            # Drop the server and middleware frames up to and including this profiler
+            cut = next((i for i, k in enumerate(stack) if k[1] == __file__), -1)
+            key = tuple(stack[cut + 1 :])
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def _task_stacks(self, task, prefix, out, running, thread_frame, depth: int) -> None:
+        if depth > 32 or task.done():
+            return
+        coro = task.get_coro()
+        if task is running and thread_frame is not None:
+            # Executing right now: the thread's stack above the task's outermost frame
+            frames: list[_Key] = []
+            f: Optional[FrameType] = thread_frame
+            root = getattr(coro, "cr_frame", None)
+            while f is not None:
+                frames.append(_frame_key(f))
+                if f is root:
+                    break
+                f = f.f_back
+            out.append(prefix + frames[::-1])
+            return
+        frames, awaited = _coro_chain(coro)
+        stack = prefix + [_frame_key(f) for f in frames]
+        waiter = _waiter(task)
+        if isinstance(waiter, asyncio.Task):
+            children = [waiter]
+        elif waiter is not None and _gather_children(waiter):
+            children = [c for c in _gather_children(waiter) if isinstance(c, asyncio.Task) and not c.done()]
+        else:
+            children = [t for t in _pending_tasks(frames) if t is not task]
+        if children:
+            for child in children:
+                self._task_stacks(child, stack, out, running, thread_frame, depth + 1)
+            return
+        what = type(awaited).__name__ if awaited is not None else None
+        if what == "FutureIter" and waiter is not None:
+            what = type(waiter).__name__
+        out.append(stack + ([(f"[await {what}]", "", 0)] if what else []))
+
+
+def _label(key: _Key) -> str:
+    name, filename, line = key
+    if not filename:
+        return name
+    parts = Path(filename).parts
+    short = "/".join(parts[parts.index("app"):]) if "app" in parts else "/".join(parts[-2:])
+    return f"{name} ({short}:{line})"
+
+
+def call_tree(counts: dict[tuple[_Key, ...], int], samples: int, ms_per_sample: float) -> dict[str, Any]:
+    root: dict[str, Any] = {"name": "request", "samples": samples, "children": {}}
+    for stack, n in counts.items():
+        node = root
+        for key in stack:
+            child = node["children"].get(key)
+            if child is None:
+                child = node["children"][key] = {"name": _label(key), "samples": 0, "children": {}}
+            child["samples"] += n
+            node = child
+
+    def finish(node: dict[str, Any]) -> dict[str, Any]:
+        kids = sorted(node["children"].values(), key=lambda c: c["samples"], reverse=True)
+        out = {"name": node["name"], "samples": node["samples"], "ms": round(node["samples"] * ms_per_sample, 1)}
+        if kids:
+            out["children"] = [finish(c) for c in kids]
+        return out
+
+    return finish(root)
+
+
+def _requested_mode(scope) -> Optional[str]:
+    headers = dict(scope.get("headers") or [])
+    value = headers.get(PROFILE_HEADER.lower().encode(), b"").decode("latin-1")
+    if not value and b"profile=" in scope.get("query_string", b""):
+        value = parse_qs(scope["query_string"].decode("latin-1")).get("profile", [""])[0]
+    value = value.lower()
+    if value in ("1", "true", "yes", "tree"):
+        return "tree"
+    return "disk" if value == "disk" else None
+
+
+def _allowed(scope) -> bool:
+    settings = get_settings()
+    # Only an explicit ENVIRONMENT=development opens it up; the field's default does not
+    if settings.environment == "development" and "environment" in settings.model_fields_set:
+        return True
+    token = dict(scope.get("headers") or []).get(PROFILE_TOKEN_HEADER.lower().encode(), b"")
+    return bool(settings.profiling_token) and secrets.compare_digest(token, settings.profiling_token.encode())
+
+
+class ProfilerMiddleware:
+    """Pure ASGI middleware running flagged requests under the sampling profiler."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        mode = _requested_mode(scope) if scope["type"] == "http" else None
+        task = asyncio.current_task() if mode is not None and _allowed(scope) else None
+        if task is None:
+            await self.app(scope, receive, send)
+            return
+
+        settings = get_settings()
+        unsupported = await asyncio.to_thread(missing_internals)
+        sampler = _Sampler(task, max(0.0005, settings.profile_interval_ms / 1000.0), unsupported)
+        sampler.start()
+        try:
+            if mode == "disk":
+                await self._run_to_disk(scope, receive, send, sampler)
+                return
+            status = 500
+
+            async def discard(message) -> None:
+                # The payload is replaced by the call tree
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+
+            await self.app(scope, receive, discard)
+        finally:
+            elapsed = sampler.stop()
+        body = dumps(self._report(sampler, elapsed, status, scope))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    async def _run_to_disk(self, scope, receive, send, sampler: _Sampler) -> None:
+        # The response is held until the file exists so X-Profile-File can name it
+        held: list[dict] = []
+        start: dict = {}
+
+        async def hold(message) -> None:
+            if message["type"] == "http.response.start":
+                start.update(message)
+            else:
+                held.append(message)
+
+        await self.app(scope, receive, hold)
+        report = self._report(sampler, sampler.stop(), start.get("status", 500), scope)
+        path = await asyncio.to_thread(self._write, report, scope)
+        headers = [*start.get("headers", []), (PROFILE_FILE_HEADER.lower().encode(), str(path).encode())]
+        await send({**start, "headers": headers})
+        for message in held:
+            await send(message)
+
+    @staticmethod
+    def _report(sampler: _Sampler, elapsed: float, status: int, scope) -> dict[str, Any]:
+        ms_per_sample = elapsed * 1000.0 / sampler.samples if sampler.samples else 0.0
+        return {
+            "profile": {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                "durationMs": round(elapsed * 1000.0, 1),
+                "samples": sampler.samples,
+                "intervalMs": round(sampler.interval * 1000.0, 3),
+                "failedSamples": sampler.failed,
+                "unsupported": list(sampler.unsupported),
+            },
+            "tree": call_tree(sampler.counts, sampler.samples, ms_per_sample),
+        }
+
+    @staticmethod
+    def _write(report: dict[str, Any], scope) -> Path:
+        directory = Path(get_settings().profile_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", scope["path"]).strip("-") or "root"
+        path = directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{slug}-{secrets.token_hex(3)}.json"
+        path.write_bytes(dumps(report))
+        return path
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import base64
+import json
+import sys
+from array import array
+from typing import Any, Optional, Sequence, Union
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:  # optional accelerator: `poetry install -E fast`
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+
+# JSON encode/decode used for API responses and Slack payloads. orjson when installed,
+# the stdlib otherwise; output is compact UTF-8 either way.
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if isinstance(content, BaseModel):
+        # pydantic-core serializes straight to bytes, no intermediate dict
+        return content.__pydantic_serializer__.to_json(content)
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class; also accepts Pydantic models (and lists of them) directly.
+
+    Handlers whose services already return validated models wrap them in this response,
+    which makes FastAPI skip the `response_model` re-validation and `jsonable_encoder` pass.
+    The decorator's `response_model` still documents the schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# ===== Compact encoding =====
+# Opt-in wire format for large numeric views (`Accept: application/vnd.pulse.compact+json`
+# or `?encoding=compact`). Float columns become base64 little-endian float32 and int columns
+# int32, e.g. `{"dtype": "float32", "shape": [rows, cols], "data": "..."}`; lists of models
+# become one list per field (columnar) instead of one object per item.
+
+COMPACT_MEDIA_TYPE = "application/vnd.pulse.compact+json"
+
+_TYPECODES = {"float32": "f", "int32": "i"}
+
+
+def pack_array(values: Sequence[float], *, dtype: str = "float32", shape: Optional[Sequence[int]] = None) -> dict[str, Any]:
+    packed = array(_TYPECODES[dtype], values)
+    if sys.byteorder == "big":  # pragma: no cover
+        packed.byteswap()
+    return {
+        "dtype": dtype,
+        "shape": list(shape) if shape is not None else [len(packed)],
+        "data": base64.b64encode(packed.tobytes()).decode("ascii"),
+    }
+
+
+def unpack_array(packed: dict[str, Any]) -> list:
+    """Inverse of `pack_array`, flattened (row-major)."""
+    values = array(_TYPECODES[packed["dtype"]])
+    values.frombytes(base64.b64decode(packed["data"]))
+    if sys.byteorder == "big":  # pragma: no cover
+        values.byteswap()
+    return values.tolist()
+
+
+def compact_matrix(
+    rows: list[str], cols: list[str], values: list[list[float]], partial_rows: Optional[list[str]] = None
+) -> dict[str, Any]:
+    flat = [v for row in values for v in row]
+    return {
+        "rows": rows,
+        "cols": cols,
+        "values": pack_array(flat, shape=(len(rows), len(cols))),
+        "partialRows": partial_rows or [],
+    }
+
+
+def compact_columns(model: type[BaseModel], items: Sequence[BaseModel]) -> dict[str, Any]:
+    columns: dict[str, Any] = {}
+    for name, info in model.model_fields.items():
+        column = [getattr(item, name) for item in items]
+        if info.annotation is float:
+            columns[name] = pack_array(column)
+        elif info.annotation is int:
+            columns[name] = pack_array(column, dtype="int32")
+        else:
+            columns[name] = column
+    return columns
+
+
+class CompactJSONResponse(FastJSONResponse):
+    media_type = COMPACT_MEDIA_TYPE
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import contextlib
+import importlib.abc
+import logging
+import os
+import sys
+import time
+from typing import Iterator, Optional
+
+
+# Opt-in cold start profiler (PROFILE_STARTUP=1). `app.main` imports this module first and
+# importing it starts the profiler, so every later import is timed; lifespan phases are
+# timed with `phase()` and the report is logged once startup completes. Times per module
+# are cumulative (they include the modules that module imported), like `-X importtime`.
+
+
+def enabled() -> bool:
+    return os.getenv("PROFILE_STARTUP", "").lower() in ("1", "true", "yes")
+
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(self, loader, profiler: "StartupProfiler") -> None:
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name: str):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler.imports[module.__name__] = (time.perf_counter() - started) * 1000.0
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    def __init__(self, profiler: "StartupProfiler") -> None:
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self._profiler)
+                return spec
+        return None
+
+
+class StartupProfiler:
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.imports: dict[str, float] = {}
+        self.phases: dict[str, float] = {}
+        self._finder: Optional[_TimingFinder] = None
+
+    def install(self) -> None:
+        self._finder = _TimingFinder(self)
+        sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self) -> None:
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = (time.perf_counter() - started) * 1000.0
+
+    def report(self, top: int = 15, prefix: str = "app.") -> str:
+        """Phases, the `top` slowest imports overall, then every import under `prefix`."""
+        total = (time.perf_counter() - self.started) * 1000.0
+        by_time = sorted(self.imports.items(), key=lambda kv: kv[1], reverse=True)
+        lines = [f"startup: {total:.1f} ms since app import began", "  phases:"]
+        lines += [f"    {ms:8.1f} ms  {name}" for name, ms in self.phases.items()]
+        lines.append(f"  slowest imports (top {top}):")
+        lines += [f"    {ms:8.1f} ms  {name}" for name, ms in by_time[:top]]
+        lines.append(f"  {prefix}* imports:")
+        lines += [f"    {ms:8.1f} ms  {name}" for name, ms in by_time if name.startswith(prefix)]
+        return "\n".join(lines)
+
+
+_profiler: Optional[StartupProfiler] = None
+
+
+def begin() -> None:
+    """Start timing imports when PROFILE_STARTUP is set (no-op otherwise)."""
+    global _profiler
+    if enabled() and _profiler is None:
+        _profiler = StartupProfiler()
+        _profiler.install()
+
+
+@contextlib.contextmanager
+def phase(name: str) -> Iterator[None]:
+    if _profiler is None:
+        yield
+        return
+    with _profiler.phase(name):
+        yield
+
+
+def finish() -> None:
+    """Stop timing and log the report (no-op unless profiling)."""
+    global _profiler
+    if _profiler is None:
+        return
+    _profiler.uninstall()
+    logging.getLogger(__name__).info("%s", _profiler.report())
+    _profiler = None
+
+
+begin()
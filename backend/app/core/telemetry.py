@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+
+
+# In-process metrics in the Prometheus text exposition format, served at GET /metrics.
+# Recording is a dict lookup and a few additions on the event loop thread (no locks, no
+# background export), so instrumenting hot paths stays cheap; anything derived from
+# other state (loop lag, admission mode) is refreshed by collectors at scrape time.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+
+    def samples(self) -> Iterable[str]:  # pragma: no cover - overridden
+        return ()
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def set_total(self, value: float, *labels: str) -> None:
+        """For totals counted elsewhere and copied in by a collector."""
+        self._values[labels] = value
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def snapshot(self) -> dict[tuple[str, ...], float]:
+        return dict(self._values)
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket..., count above the last bucket, sum]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        slots = self._values.get(labels)
+        if slots is None:
+            slots = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+        slots[bisect_left(self.buckets, value)] += 1
+        slots[-1] += value
+
+    def count(self, *labels: str) -> int:
+        slots = self._values.get(labels)
+        return int(sum(slots[:-1])) if slots else 0
+
+    def samples(self) -> Iterable[str]:
+        for labels, slots in sorted(self._values.items()):
+            cumulative = 0.0
+            for bound, n in zip((*self.buckets, math.inf), slots):
+                cumulative += n
+                le = 'le="' + _number(bound) + '"'
+                yield f"{self.name}_bucket{_labels(self.label_names, labels, le)} {_number(cumulative)}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {_number(slots[-1])}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {_number(cumulative)}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], None]] = []
+
+    def counter(self, name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Iterable[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Iterable[str] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn: Callable[[], None]) -> Callable[[], None]:
+        """Register `fn` to refresh derived gauges right before each scrape."""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        for fn in self._collectors:
+            fn()
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_LATENCY = REGISTRY.histogram(
+    "pulse_http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status")
+)
+SLACK_CALLS = REGISTRY.counter("pulse_slack_api_calls_total", "Slack Web API requests by method and HTTP status", ("method", "status"))
+SLACK_LATENCY = REGISTRY.histogram("pulse_slack_api_duration_seconds", "Slack Web API request latency", ("method",))
+SLACK_RATE_LIMITED = REGISTRY.counter("pulse_slack_api_rate_limited_total", "Slack Web API HTTP 429 responses", ("method",))
+LLM_CALLS = REGISTRY.counter("pulse_anthropic_calls_total", "Anthropic Messages API calls by outcome", ("model", "outcome"))
+LLM_LATENCY = REGISTRY.histogram("pulse_anthropic_call_duration_seconds", "Anthropic Messages API call latency", ("model",))
+LLM_TOKENS = REGISTRY.counter("pulse_anthropic_tokens_total", "Anthropic tokens by direction (input/output)", ("model", "direction"))
+LLM_FALLBACKS = REGISTRY.counter(
+    "pulse_heuristic_fallbacks_total", "Results produced by the heuristic instead of the LLM", ("operation", "reason")
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "pulse_cache_requests_total", "Cache lookups by cache and result (hit, refresh, miss)", ("cache", "result")
+)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording HTTP latency per route template (not per raw path)."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status: Optional[int] = None
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # FastAPI puts the matched route in the scope; unmatched paths share one series
+            route = scope.get("route")
+            HTTP_LATENCY.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status or 500),
+            )
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+from urllib.parse import parse_qs
+
+
+# Slack team a request is for. Set per request by `TenantMiddleware` from the `X-Slack-Team`
+# header (or `?team_id=`); when absent, services fall back to the default active installation.
+# The header is not authenticated: any caller can pick any installed workspace, so it is for
+# development, or for deployments behind a proxy that authenticates users and sets the header
+# itself. Team IDs without an installation are refused.
+TEAM_HEADER = "x-slack-team"
+
+_REQUESTED_TEAM: ContextVar[Optional[str]] = ContextVar("requested_team", default=None)
+# Per-HTTP-request memo for tenant lookups (e.g. the resolved installation), shared with the
+# tasks a request spawns; None outside requests
+_REQUEST_CACHE: ContextVar[Optional[dict[str, Any]]] = ContextVar("tenant_request_cache", default=None)
+
+
+def requested_team() -> Optional[str]:
+    return _REQUESTED_TEAM.get()
+
+
+def set_requested_team(team_id: Optional[str]):
+    """Set the team for the current context; returns a token for `reset_requested_team`."""
+    return _REQUESTED_TEAM.set(team_id or None)
+
+
+def reset_requested_team(token) -> None:
+    _REQUESTED_TEAM.reset(token)
+
+
+def request_cache() -> Optional[dict[str, Any]]:
+    return _REQUEST_CACHE.get()
+
+
+class TenantMiddleware:
+    """Pure ASGI middleware binding the requested Slack team to the request's context.
+
+    Teams for which `is_known_team` is false get 403 `unknown_team` (websockets: close 1008).
+    """
+
+    def __init__(self, app, is_known_team: Optional[Callable[[str], bool]] = None) -> None:
+        self.app = app
+        self.is_known_team = is_known_team
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        team_id: Optional[str] = None
+        for name, value in scope.get("headers") or ():
+            if name == TEAM_HEADER.encode():
+                team_id = value.decode("latin-1").strip()
+                break
+        if not team_id and scope.get("query_string"):
+            team_id = (parse_qs(scope["query_string"].decode("latin-1")).get("team_id") or [None])[0]
+        if team_id and self.is_known_team is not None and not self.is_known_team(team_id):
+            await _refuse(scope, send)
+            return
+        token = set_requested_team(team_id)
+        # Websockets live for hours, so only HTTP requests memoize lookups
+        cache_token = _REQUEST_CACHE.set({}) if scope["type"] == "http" else None
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if cache_token is not None:
+                _REQUEST_CACHE.reset(cache_token)
+            reset_requested_team(token)
+
+
+async def _refuse(scope, send) -> None:
+    if scope["type"] == "websocket":
+        await send({"type": "websocket.close", "code": 1008})
+        return
+    body = b'{"detail":"unknown_team"}'
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 403,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
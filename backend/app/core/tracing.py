@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+
+from app.core.config import get_settings
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+# Lightweight in-process tracing (TRACING_ENABLED=1, dev only). `TracingMiddleware` opens a
+# root span per HTTP request; `span()` / `@traced` open children under whatever span is
+# current. The current span lives in a ContextVar, so tasks started with gather/ensure_future
+# inherit it and their spans nest where they were scheduled. Finished traces are kept in
+# a small LRU and served by /api/v1/debug/traces/{request_id}; the response also carries
+# X-Request-ID and a Server-Timing summary. With OTLP_ENDPOINT set, each trace is also
+# posted to an OpenTelemetry collector (OTLP/HTTP JSON) in the background.
+# The request id and start time are tracked even with tracing off, for log records.
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+
+class Span:
+    __slots__ = ("trace", "name", "span_id", "parent_id", "attrs", "start_ns", "end_ns", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attrs: dict[str, Any]) -> None:
+        self.trace = trace
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attrs = attrs
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+
+class Trace:
+    def __init__(self, request_id: str) -> None:
+        self.request_id = request_id
+        self.trace_id = os.urandom(16).hex()
+        self.spans: list[Span] = []
+
+    def tree(self) -> dict[str, Any]:
+        """Spans nested under their parents, with each span's time not covered by children."""
+        children: dict[Optional[str], list[Span]] = {}
+        for s in self.spans:
+            children.setdefault(s.parent_id, []).append(s)
+
+        def node(s: Span) -> dict[str, Any]:
+            kids = sorted(children.get(s.span_id, []), key=lambda c: c.start_ns)
+            covered = _union_ms([(c.start_ns, c.end_ns or time.time_ns()) for c in kids])
+            out: dict[str, Any] = {
+                "name": s.name,
+                "startMs": round((s.start_ns - root.start_ns) / 1e6, 3),
+                "durationMs": round(s.duration_ms, 3),
+                "selfMs": round(max(0.0, s.duration_ms - covered), 3),
+            }
+            if s.attrs:
+                out["attrs"] = s.attrs
+            if s.error:
+                out["error"] = s.error
+            if kids:
+                out["children"] = [node(c) for c in kids]
+            return out
+
+        root = children[None][0]
+        return {"requestId": self.request_id, "traceId": self.trace_id, "root": node(root)}
+
+    def server_timing(self) -> str:
+        """Total time per span name (excluding the root), as a Server-Timing header value."""
+        totals: dict[str, float] = {}
+        for s in self.spans:
+            if s.parent_id is not None and s.end_ns is not None:
+                totals[s.name] = totals.get(s.name, 0.0) + s.duration_ms
+        return ", ".join(f"{name.replace('.', '-')};dur={ms:.1f}" for name, ms in totals.items())
+
+
+def _union_ms(intervals: list[tuple[int, int]]) -> float:
+    # Concurrent children overlap; count wall time once
+    total = 0
+    cur_start = cur_end = None
+    for start, end in sorted(intervals):
+        if cur_end is None or start > cur_end:
+            if cur_end is not None:
+                total += cur_end - cur_start
+            cur_start, cur_end = start, end
+        else:
+            cur_end = max(cur_end, end)
+    if cur_end is not None:
+        total += cur_end - cur_start
+    return total / 1e6
+
+
+_CURRENT: ContextVar[Optional[Span]] = ContextVar("tracing_span", default=None)
+_REQUEST: ContextVar[Optional[tuple[str, float]]] = ContextVar("tracing_request", default=None)
+_TRACES: "OrderedDict[str, Trace]" = OrderedDict()
+_EXPORTS: set[asyncio.Task] = set()
+
+
+def current_span() -> Optional[Span]:
+    return _CURRENT.get()
+
+
+def current_request() -> Optional[tuple[str, float]]:
+    """(request id, perf_counter at arrival) of the HTTP request being handled, if any."""
+    return _REQUEST.get()
+
+
+def get_trace(request_id: str) -> Optional[Trace]:
+    return _TRACES.get(request_id)
+
+
+def recent_traces() -> list[Trace]:
+    return list(reversed(_TRACES.values()))
+
+
+@contextlib.contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Optional[Span]]:
+    """Child of the current span; a no-op (yields None) outside a traced request."""
+    parent = _CURRENT.get()
+    if parent is None:
+        yield None
+        return
+    s = Span(parent.trace, name, parent.span_id, attrs)
+    parent.trace.spans.append(s)
+    token = _CURRENT.set(s)
+    try:
+        yield s
+    except BaseException as exc:
+        s.error = type(exc).__name__
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _CURRENT.reset(token)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator running an async function inside `span(name)`."""
+
+    def decorate(fn: F) -> F:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _CURRENT.get() is None:
+                return await fn(*args, **kwargs)
+            with span(name):
+                return await fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def _store(trace: Trace) -> None:
+    _TRACES[trace.request_id] = trace
+    _TRACES.move_to_end(trace.request_id)
+    while len(_TRACES) > max(1, get_settings().tracing_max_traces):
+        _TRACES.popitem(last=False)
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_payload(trace: Trace) -> dict[str, Any]:
+    """The trace as an OTLP/HTTP JSON ExportTraceServiceRequest."""
+    spans = [
+        {
+            "traceId": trace.trace_id,
+            "spanId": s.span_id,
+            **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+            "name": s.name,
+            "kind": 2 if s.parent_id is None else 1,  # SERVER for the root, INTERNAL below
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns or s.start_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attrs.items()],
+            "status": {"code": 2, "message": s.error} if s.error else {},
+        }
+        for s in trace.spans
+    ]
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "employee-pulse-api"}}]},
+                "scopeSpans": [{"scope": {"name": "app.core.tracing"}, "spans": spans}],
+            }
+        ]
+    }
+
+
+async def _export(endpoint: str, trace: Trace) -> None:
+    import httpx  # on first use, like the Slack and Anthropic clients
+
+    try:
+        async with httpx.AsyncClient(timeout=5) as http:
+            await http.post(endpoint.rstrip("/") + "/v1/traces", json=otlp_payload(trace))
+    except Exception as exc:
+        logging.getLogger(__name__).debug("tracing: OTLP export failed: %s", exc)
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware assigning a request id and, when tracing is enabled, a root span."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        incoming = dict(scope.get("headers") or []).get(REQUEST_ID_HEADER.lower().encode())
+        request_id = incoming.decode("latin-1")[:64] if incoming else os.urandom(8).hex()
+        request_token = _REQUEST.set((request_id, time.perf_counter()))
+        try:
+            await self._traced(scope, receive, send, request_id)
+        finally:
+            _REQUEST.reset(request_token)
+
+    async def _traced(self, scope, receive, send, request_id: str) -> None:
+        settings = get_settings()
+        if not settings.tracing_enabled:
+            await self.app(scope, receive, send)
+            return
+        trace = Trace(request_id)
+        root = Span(trace, f"{scope['method']} {scope['path']}", None, {"http.method": scope["method"]})
+        trace.spans.append(root)
+
+        async def send_with_trace(message) -> None:
+            if message["type"] == "http.response.start":
+                root.set(**{"http.status_code": message["status"]})
+                headers = [*message.get("headers", []), (REQUEST_ID_HEADER.lower().encode(), request_id.encode())]
+                timing = trace.server_timing()
+                if timing:
+                    headers.append((b"server-timing", timing.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _CURRENT.set(root)
+        try:
+            await self.app(scope, receive, send_with_trace)
+        except BaseException as exc:
+            root.error = type(exc).__name__
+            raise
+        finally:
+            _CURRENT.reset(token)
+            root.end_ns = time.time_ns()
+            route = scope.get("route")
+            if route is not None:
+                root.name = f"{scope['method']} {route.path}"
+            _store(trace)
+            if settings.otlp_endpoint:
+                task = asyncio.get_running_loop().create_task(_export(settings.otlp_endpoint, trace))
+                _EXPORTS.add(task)
+                task.add_done_callback(_EXPORTS.discard)
@@ -1,17 +1,70 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+# First: with PROFILE_STARTUP=1 this times every import below (see app/core/startup.py)
+from app.core import startup
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.admission import MODE_HEADER, AdmissionMiddleware, get_admission
+from app.core.compression import CompressionMiddleware
+from app.core.config import get_settings
+from app.core.db import connect_db, disconnect_db
 from app.core.logging import configure_logging
+from app.core.profiling import ProfilerMiddleware
+from app.core.serialization import FastJSONResponse
+from app.core.telemetry import MetricsMiddleware
+from app.core.tracing import REQUEST_ID_HEADER, TracingMiddleware
+from app.core.tenancy import TenantMiddleware
+from app.api.v1.batch import router as batch_router
 from app.api.v1.health import router as health_router
 from app.api.v1.dashboard import router as dashboard_router
+from app.api.v1.debug import router as debug_router
 from app.api.v1.insights import router as insights_router
 from app.api.v1.slack import router as slack_router
 from app.api.v1.metrics import router as metrics_router
+from app.api.deps import build_services
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.api.telemetry import router as telemetry_router
+from app.services import persistence
+from app.services.slack_service import restore_installations
+from app.services.state_backend import is_known_team
 
 # Initialize logger
 configure_logging()
 
-app = FastAPI(title="Employee Pulse API", version="0.1.0")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Services are built once per process and injected into routes (see app/api/deps.py)
+    with startup.phase("build_services"):
+        app.state.services = build_services()
+    # Connect once; without DATABASE_URL everything stays in process memory
+    with startup.phase("connect_db"):
+        app.state.db = await connect_db()
+    if app.state.db is not None:
+        with startup.phase("restore_installations"):
+            await restore_installations()
+    # Event-loop lag sampling for admission control
+    get_admission().start()
+    startup.finish()
+    try:
+        yield
+    finally:
+        await get_admission().stop()
+        await persistence.drain()
+        await app.state.services.aclose()
+        await disconnect_db()
+
+
+app = FastAPI(
+    title="Employee Pulse API",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
 
 # Allow frontend dev origin
 app.add_middleware(
@@ -20,25 +73,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, MODE_HEADER, REQUEST_ID_HEADER, "Server-Timing"],
 )
-
-
-@app.on_event("startup")
-async def on_startup() -> None:
-    # Placeholder: initialize Prisma client when DB is used
-    # from prisma import Prisma
-    # app.state.db = Prisma()
-    # await app.state.db.connect()
-    return None
-
-
-@app.on_event("shutdown")
-async def on_shutdown() -> None:
-    # Placeholder: close Prisma client
-    # db = getattr(app.state, "db", None)
-    # if db is not None:
-    #     await db.disconnect()
-    return None
+# `?profile=1` / X-Profile: call tree of the request instead of its payload (explicit dev or token)
+app.add_middleware(ProfilerMiddleware)
+# Resolve the Slack workspace per request (X-Slack-Team header or ?team_id=; unauthenticated,
+# see app/core/tenancy.py); teams without an installation get 403
+app.add_middleware(TenantMiddleware, is_known_team=is_known_team)
+# Root span per request when TRACING_ENABLED (X-Request-ID, Server-Timing)
+app.add_middleware(TracingMiddleware)
+# Degrade or shed load when LLM calls pile up or the event loop lags (X-Degradation-Mode)
+app.add_middleware(AdmissionMiddleware)
+# gzip/br for large bodies (heatmaps, message history); SSE streams pass through
+app.add_middleware(CompressionMiddleware, minimum_size=get_settings().compression_minimum_size)
+# Outermost: per-route latency histograms for GET /metrics
+app.add_middleware(MetricsMiddleware)
 
 
 # Mount API routers
@@ -47,3 +96,6 @@ app.include_router(dashboard_router, prefix="/api/v1")
 app.include_router(insights_router, prefix="/api/v1")
 app.include_router(slack_router, prefix="/api/v1")
 app.include_router(metrics_router, prefix="/api/v1")
+app.include_router(batch_router, prefix="/api/v1")
+app.include_router(debug_router, prefix="/api/v1")
+app.include_router(telemetry_router)
@@ -1,16 +1,21 @@
 from pydantic import BaseModel, Field
-from typing import Literal, Optional
+from pydantic.json_schema import SkipJsonSchema
+from typing import Any, Literal, Optional
 
 
 RiskLevel = Literal["Low", "Medium", "High"]
 TimeRange = Literal["week", "month", "quarter", "year"]
 
+# `partial` on result entries: the request's deadline ran out before the entry was complete,
+# so it was computed from cached messages and/or heuristic scores (see app/core/deadline.py).
+
 
 class SentimentPoint(BaseModel):
     date: str
     label: str
     avgSentiment: float
     messageCount: int
+    partial: bool = False
 
 
 class ChannelMetric(BaseModel):
@@ -21,17 +26,22 @@ class ChannelMetric(BaseModel):
     threads: int
     lastActivity: str
     risk: RiskLevel
+    responses: Optional[int] = None
+    avgFirstResponseMinutes: Optional[float] = None
+    partial: bool = False
 
 
 class KPI(BaseModel):
     avgSentiment: float
     burnoutRiskCount: int
     monitoredChannels: int
+    partial: bool = False
 
 
 class BurnoutPoint(BaseModel):
     label: str
     value: int
+    partial: bool = False
 
 
 InsightScope = Literal["team", "channel", "company"]
@@ -65,6 +75,7 @@ class Insight(BaseModel):
     createdAt: str
     metricContext: Optional[InsightMetricContext] = None
     range: TimeRange
+    partial: bool = False
 
 
 class InsightFilters(BaseModel):
@@ -112,6 +123,13 @@ class SlackUser(BaseModel):
     isBot: Optional[bool] = None
 
 
+class SlackUserGroup(BaseModel):
+    id: str
+    name: str
+    handle: Optional[str] = None
+    userIds: list[str] = Field(default_factory=list)
+
+
 class SlackConnection(BaseModel):
     teamId: str
     teamName: str
@@ -177,11 +195,15 @@ class EntityTotalMetric(BaseModel):
     threads: int
     responses: int
     emojis: int
+    uniqueRepliers: Optional[int] = None
+    avgFirstResponseMinutes: Optional[float] = None
+    partial: bool = False
 
 
 class EmojiStat(BaseModel):
     emoji: str
     count: int
+    partial: bool = False
 
 
 # ===== LLM / Anthropic structured outputs =====
@@ -198,6 +220,9 @@ class LLMAnalysisSummary(BaseModel):
     overallSentiment: float
     burnoutRiskLevel: RiskLevel
     items: list[LLMMessageAnalysisItem] = Field(default_factory=list)
+    # Which scorer produced it: the Anthropic model id, or "heuristic". Set by the service,
+    # never by the LLM, so it is left out of the schema the LLM is given
+    model: SkipJsonSchema[Optional[str]] = None
 
 
 class LLMAnalyzeMessagesRequest(BaseModel):
@@ -210,6 +235,50 @@ class HeatmapMatrix(BaseModel):
     rows: list[str]
     cols: list[str]
     values: list[list[float]]
+    # Names of rows computed after the deadline ran out
+    partialRows: list[str] = Field(default_factory=list)
+
+
+# ===== Batch queries =====
+
+BatchQueryKind = Literal[
+    "dashboard.kpi",
+    "dashboard.channels",
+    "dashboard.trend",
+    "dashboard.burnout-series",
+    "dashboard.heatmap",
+    "metrics.entity-totals",
+    "metrics.top-emojis",
+]
+
+
+class BatchQuery(BaseModel):
+    """One dashboard/metrics query; fields mirror the corresponding GET endpoint's parameters."""
+
+    id: Optional[str] = None
+    kind: BatchQueryKind
+    range: TimeRange = "week"
+    channelIds: Optional[list[str]] = None
+    perspective: Perspective = "channel"
+    group: Literal["channels", "team", "person"] = "channels"
+    grouping: Literal["channels", "teams", "people"] = "channels"
+    metric: Literal["sentiment", "messages", "threads"] = "sentiment"
+    limit: int = Field(default=10, ge=1, le=50)
+
+
+class BatchRequest(BaseModel):
+    queries: list[BatchQuery] = Field(min_length=1, max_length=20)
+
+
+class BatchResult(BaseModel):
+    id: str
+    ok: bool
+    result: Any = None
+    error: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    results: list[BatchResult]
 
 
 # ===== Insights structured outputs =====
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 import json
-from typing import Any, Optional, Type, TypeVar
+import time
+from typing import Any, Optional, Type, TypeVar, Union
 import logging
 
-import httpx
-from anthropic import AsyncAnthropic  # type: ignore
-
+from app.core import telemetry, tracing
+from app.core.admission import get_admission, request_mode
 from app.core.config import get_settings
 from app.models.pydantic_types import (
     LLMAnalysisSummary,
@@ -14,10 +15,31 @@ from app.models.pydantic_types import (
     RiskLevel,
     SlackMessage,
 )
+from app.services.message_batch import MessageBatch
+from app.services.state_backend import active_team_key
+from app.services.tenant_limits import LlmQuotaExceeded, get_llm_quota
+
+# httpx and the anthropic SDK are imported on first use: together they are most of the
+# app's import time, and demo mode (no API key) never needs them
 
 
 TModel = TypeVar("TModel")
 
+# `LLMAnalysisSummary.model` of keyword-based scores
+HEURISTIC_MODEL = "heuristic"
+
+# (id, userId, text, ts)
+_Row = tuple[str, str, str, str]
+# Pydantic messages (API payloads), a columnar batch (internal fetch paths) or pre-built rows
+MessagesInput = Union[list[SlackMessage], MessageBatch, list[_Row]]
+
+
+def _message_rows(messages: MessagesInput) -> list[_Row]:
+    """Normalize input into `(id, userId, text, ts)` tuples without building models."""
+    if isinstance(messages, MessageBatch):
+        return messages.rows()
+    return [m if isinstance(m, tuple) else (m.id, m.userId, m.text, m.ts) for m in messages]
+
 
 class AnthropicService:
     """Lightweight client wrapper around Anthropic Messages API.
@@ -32,17 +54,29 @@ class AnthropicService:
 
     def __init__(self) -> None:
         self.settings = get_settings()
-
-    async def _http(self) -> httpx.AsyncClient:
-        # Allow overriding base URL for testing; default to official endpoint
-        base_url = self.settings.anthropic_api_base or "https://api.anthropic.com"
-        headers = {
-            "anthropic-version": "2023-06-01",
-            "content-type": "application/json",
-        }
-        if self.settings.anthropic_api_key:
-            headers["x-api-key"] = self.settings.anthropic_api_key
-        return httpx.AsyncClient(base_url=base_url, timeout=60, headers=headers)
+        self._client: Any = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _sdk(self) -> Any:
+        """The service's shared SDK client: one connection pool for every call, closed by `aclose()`."""
+        loop = asyncio.get_running_loop()
+        # Pooled connections belong to the loop that opened them (scripts and tests may run several)
+        if self._client is None or self._client_loop is not loop:
+            # Prefer official SDK to avoid wire/compat issues
+            from anthropic import AsyncAnthropic  # type: ignore
+
+            client_kwargs: dict[str, object] = {"api_key": self.settings.anthropic_api_key or ""}
+            # Allow overriding base URL for testing; default to official endpoint
+            if self.settings.anthropic_api_base:
+                client_kwargs["base_url"] = self.settings.anthropic_api_base
+            self._client = AsyncAnthropic(**client_kwargs)  # type: ignore[arg-type]
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.close()
 
     @staticmethod
     def _extract_text_from_response(data: dict[str, Any]) -> str:
@@ -79,6 +113,7 @@ class AnthropicService:
                 return json.loads(candidate)
             raise
 
+    @tracing.traced("anthropic.generate_structured")
     async def generate_structured(
         self,
         *,
@@ -128,11 +163,12 @@ class AnthropicService:
                 "Anthropic API key is not configured. Set ANTHROPIC_API_KEY in the backend environment."
             )
 
-        # Prefer official SDK to avoid wire/compat issues
-        client_kwargs: dict[str, object] = {"api_key": self.settings.anthropic_api_key or ""}
-        if self.settings.anthropic_api_base:
-            client_kwargs["base_url"] = self.settings.anthropic_api_base
-        client = AsyncAnthropic(**client_kwargs)  # type: ignore[arg-type]
+        # Every LLM call counts against the workspace's quota
+        tenant = active_team_key()
+        if not get_llm_quota().try_acquire(tenant):
+            raise LlmQuotaExceeded(f"LLM quota exhausted for team={tenant}")
+
+        client = self._sdk()
 
         logging.getLogger(__name__).debug(
             "anthropic: request(model=%s, temp=%s, max_tokens=%s)",
@@ -140,13 +176,31 @@ class AnthropicService:
             selected_temp,
             selected_max_tokens,
         )
-        resp = await client.messages.create(
-            model=selected_model,
-            max_tokens=int(selected_max_tokens),
-            temperature=float(selected_temp),
-            system=system_text,
-            messages=[{"role": "user", "content": user_text}],
-        )
+        started = time.perf_counter()
+        with tracing.span("anthropic.messages", model=selected_model) as span:
+            async with get_admission().llm_call():
+                try:
+                    resp = await client.messages.create(
+                        model=selected_model,
+                        max_tokens=int(selected_max_tokens),
+                        temperature=float(selected_temp),
+                        system=system_text,
+                        messages=[{"role": "user", "content": user_text}],
+                    )
+                except Exception:
+                    telemetry.LLM_CALLS.inc(selected_model, "error")
+                    raise
+                finally:
+                    telemetry.LLM_LATENCY.observe(time.perf_counter() - started, selected_model)
+        telemetry.LLM_CALLS.inc(selected_model, "ok")
+        usage = getattr(resp, "usage", None)
+        if usage is not None:
+            input_tokens = getattr(usage, "input_tokens", 0) or 0
+            output_tokens = getattr(usage, "output_tokens", 0) or 0
+            telemetry.LLM_TOKENS.inc(selected_model, "input", amount=input_tokens)
+            telemetry.LLM_TOKENS.inc(selected_model, "output", amount=output_tokens)
+            if span is not None:
+                span.set(input_tokens=input_tokens, output_tokens=output_tokens)
         # Extract concatenated text blocks
         blocks = getattr(resp, "content", []) or []
         texts: list[str] = []
@@ -162,25 +216,30 @@ class AnthropicService:
     # ===== Convenience domain method for Slack messages =====
     async def analyze_slack_messages(
         self,
-        messages: list[SlackMessage],
+        messages: MessagesInput,
         *,
         model: Optional[str] = None,
         temperature: Optional[float] = None,
     ) -> LLMAnalysisSummary:
         """Analyze Slack messages for sentiment and burnout risk using the LLM.
 
+        Accepts either Pydantic messages or a `MessageBatch` built with text.
         Falls back to a simple heuristic if Anthropic is not configured.
         """
 
         logging.getLogger(__name__).info("anthropic: analyzing %d messages", len(messages))
+        rows = _message_rows(messages)
         if not self.settings.anthropic_api_key:
             logging.getLogger(__name__).warning("anthropic: API key not configured; using heuristic analysis")
-            return self._heuristic_analyze(messages)
-
+            telemetry.LLM_FALLBACKS.inc("analyze", "no_api_key")
+            return self._heuristic_analyze(rows)
+        if request_mode() != "normal":
+            logging.getLogger(__name__).info("anthropic: admission mode is %s; using heuristic analysis", request_mode())
+            telemetry.LLM_FALLBACKS.inc("analyze", "admission")
+            return self._heuristic_analyze(rows)
         # Trim the number of messages to keep prompts short
-        trimmed: list[SlackMessage] = messages[-100:]
         serializable: list[dict[str, Any]] = [
-            {"id": m.id, "userId": m.userId, "text": m.text, "ts": m.ts} for m in trimmed
+            {"id": mid, "userId": uid, "text": text, "ts": ts} for mid, uid, text, ts in rows[-100:]
         ]
 
         # High-level guidance embedded in system prompt. The concrete task is in the user message.
@@ -201,24 +260,34 @@ class AnthropicService:
                 temperature=temperature,
                 system=system,
             )
+        except LlmQuotaExceeded as exc:
+            logging.getLogger(__name__).warning("anthropic: %s; using heuristic analysis", exc)
+            telemetry.LLM_FALLBACKS.inc("analyze", "quota")
+            return self._heuristic_analyze(rows)
         except Exception as exc:
             # If explicitly disabled fallback, bubble error to caller for visibility
             if self.settings.anthropic_disable_fallback:
                 logging.getLogger(__name__).exception("anthropic: structured call failed (no fallback): %s", exc)
                 raise
             logging.getLogger(__name__).exception("anthropic: structured call failed, using heuristic: %s", exc)
-            return self._heuristic_analyze(messages)
+            telemetry.LLM_FALLBACKS.inc("analyze", "error")
+            return self._heuristic_analyze(rows)
         logging.getLogger(__name__).info(
             "anthropic: analysis overall_sentiment=%.3f burnout=%s items=%d",
             result.overallSentiment,
             result.burnoutRiskLevel,
             len(result.items),
         )
+        result.model = model or self.settings.anthropic_default_model
         return result
 
     # ===== Heuristic fallback =====
+    def heuristic_analysis(self, messages: MessagesInput) -> LLMAnalysisSummary:
+        """Keyword-based analysis with no LLM call (e.g. when a request is out of time)."""
+        return self._heuristic_analyze(messages)
+
     @staticmethod
-    def _heuristic_analyze(messages: list[SlackMessage]) -> LLMAnalysisSummary:
+    def _heuristic_analyze(messages: MessagesInput) -> LLMAnalysisSummary:
         positive_words = {
             "great",
             "good",
@@ -277,14 +346,14 @@ class AnthropicService:
 
         items: list[LLMMessageAnalysisItem] = []
         sentiments: list[float] = []
-        for m in messages[-100:]:
-            s = score_sentiment(m.text or "")
+        for mid, _, text, _ in _message_rows(messages)[-100:]:
+            s = score_sentiment(text or "")
             sentiments.append(s)
             items.append(
                 LLMMessageAnalysisItem(
-                    messageId=m.id,
+                    messageId=mid,
                     sentiment=s,
-                    burnoutRisk=burnout_level(m.text or ""),
+                    burnoutRisk=burnout_level(text or ""),
                     categories=None,
                     summary=None,
                 )
@@ -301,6 +370,7 @@ class AnthropicService:
             overallSentiment=overall,
             burnoutRiskLevel=overall_level,
             items=items,
+            model=HEURISTIC_MODEL,
         )
 
 
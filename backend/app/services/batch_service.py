@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+from app.core import deadline
+from app.models.pydantic_types import BatchQuery, BatchResponse, BatchResult, LLMAnalysisSummary
+from app.services import message_store
+from app.services.anthropic_service import AnthropicService, _message_rows
+from app.services.dashboard_service import DashboardService
+from app.services.metrics_service import MetricsService
+from app.services.slack_service import SlackService
+
+
+# Batch execution of dashboard and metrics queries. The planner resolves every query's
+# channels and the oldest timestamp it needs, loads each channel window once reaching back
+# far enough for all of them, then runs the queries concurrently against the warm cache.
+# Within one batch, channel/user/selection listings and LLM scoring of an identical set of
+# messages are shared too (a KPI and a channel-metrics query score the same windows).
+
+
+class _SharedSlack:
+    """Per-batch view of a SlackService that lists channels, users and the selection once."""
+
+    def __init__(self, slack: SlackService) -> None:
+        self._slack = slack
+        self._memo: dict[str, asyncio.Future] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._slack, name)
+
+    def _once(self, name: str, fn: Callable[[], Awaitable[Any]]) -> Awaitable[Any]:
+        if name not in self._memo:
+            self._memo[name] = asyncio.ensure_future(fn())
+        return self._memo[name]
+
+    async def list_channels(self):
+        return await self._once("channels", self._slack.list_channels)
+
+    async def list_users(self):
+        return await self._once("users", self._slack.list_users)
+
+    async def get_selected_channels(self):
+        return await self._once("selected", self._slack.get_selected_channels)
+
+
+class _SharedScores:
+    """Per-batch view of an AnthropicService that scores each distinct message set once."""
+
+    def __init__(self, anthropic: AnthropicService) -> None:
+        self._anthropic = anthropic
+        self._memo: dict[tuple, asyncio.Future] = {}
+        self.calls = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._anthropic, name)
+
+    async def analyze_slack_messages(self, messages, **kwargs) -> LLMAnalysisSummary:
+        key = (tuple((mid, uid, ts) for mid, uid, _, ts in _message_rows(messages)), tuple(sorted(kwargs.items())))
+        if key not in self._memo:
+            self.calls += 1
+            self._memo[key] = asyncio.ensure_future(self._anthropic.analyze_slack_messages(messages, **kwargs))
+        return await self._memo[key]
+
+
+class BatchService:
+    def __init__(self, slack: Optional[SlackService] = None, anthropic: Optional[AnthropicService] = None) -> None:
+        self.slack = slack or SlackService()
+        self.anthropic = anthropic or AnthropicService()
+
+    @staticmethod
+    def _oldest_for_range(dashboard: DashboardService, time_range) -> float:
+        # Widest start any query kind uses for the range (trend/heatmap buckets start at midnight)
+        return min(float(dashboard._oldest_ts_for_range(time_range)), dashboard._buckets(time_range)[0][1].timestamp())
+
+    @staticmethod
+    async def _query_channel_ids(dashboard: DashboardService, metrics: MetricsService, q: BatchQuery) -> list[str]:
+        # The channels each query kind will read, resolved the way that kind resolves them
+        if q.kind == "dashboard.burnout-series":
+            return [c.id for c in await dashboard._burnout_channels(q.channelIds)]
+        if q.kind == "dashboard.heatmap":
+            return [c.id for c in await dashboard._heatmap_channels(q.channelIds)]
+        if q.kind.startswith("metrics."):
+            return await metrics._get_channel_ids(q.channelIds)
+        return await dashboard._resolve_channel_ids(q.channelIds)
+
+    async def _prefetch(self, dashboard: DashboardService, metrics: MetricsService, queries: list[BatchQuery]) -> int:
+        oldest_by_channel: dict[str, float] = {}
+        for q in queries:
+            oldest = self._oldest_for_range(dashboard, q.range)
+            for cid in await self._query_channel_ids(dashboard, metrics, q):
+                oldest_by_channel[cid] = min(oldest, oldest_by_channel.get(cid, oldest))
+
+        async def load(cid: str, oldest: float) -> None:
+            try:
+                # Past the deadline the fetch keeps filling the cache in the background and the
+                # queries fall back to whatever is cached, reporting those channels as partial
+                await deadline.bounded(
+                    message_store.get_channel_window(dashboard.slack, cid, oldest=oldest), lambda: None, shield=True
+                )
+            except Exception as exc:
+                # The query itself will retry and report the failure
+                logging.getLogger(__name__).warning("batch: prefetch failed for channel %s: %s", cid, exc)
+
+        await asyncio.gather(*(load(cid, oldest) for cid, oldest in oldest_by_channel.items()))
+        return len(oldest_by_channel)
+
+    @staticmethod
+    def _dispatch(dashboard: DashboardService, metrics: MetricsService, q: BatchQuery) -> Awaitable[Any]:
+        common = {"time_range": q.range, "channel_ids": q.channelIds}
+        if q.kind == "dashboard.kpi":
+            return dashboard.compute_kpi(**common)
+        if q.kind == "dashboard.channels":
+            return dashboard.compute_channel_metrics(**common)
+        if q.kind == "dashboard.trend":
+            return dashboard.compute_trend(**common)
+        if q.kind == "dashboard.burnout-series":
+            return dashboard.compute_burnout_series(group=q.group, **common)
+        if q.kind == "dashboard.heatmap":
+            return dashboard.compute_heatmap(grouping=q.grouping, metric=q.metric, **common)
+        if q.kind == "metrics.entity-totals":
+            return metrics.compute_entity_totals(perspective=q.perspective, **common)
+        return metrics.compute_top_emojis(limit=q.limit, **common)
+
+    async def run(self, queries: list[BatchQuery]) -> BatchResponse:
+        slack = _SharedSlack(self.slack)
+        scores = _SharedScores(self.anthropic)
+        dashboard = DashboardService(slack, scores)  # type: ignore[arg-type]
+        metrics = MetricsService(slack, scores)  # type: ignore[arg-type]
+        channels = await self._prefetch(dashboard, metrics, queries)
+
+        async def execute(index: int, q: BatchQuery) -> BatchResult:
+            query_id = q.id or str(index)
+            try:
+                return BatchResult(id=query_id, ok=True, result=await self._dispatch(dashboard, metrics, q))
+            except Exception as exc:
+                logging.getLogger(__name__).error("batch: query %s (%s) failed: %s", query_id, q.kind, exc)
+                return BatchResult(id=query_id, ok=False, error=str(exc) or type(exc).__name__)
+
+        results = await asyncio.gather(*(execute(i, q) for i, q in enumerate(queries)))
+        logging.getLogger(__name__).info(
+            "batch: %d queries over %d channel windows, %d distinct scorings", len(queries), channels, scores.calls
+        )
+        return BatchResponse(results=list(results))
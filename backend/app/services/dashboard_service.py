@@ -1,27 +1,67 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timedelta
-from typing import Literal, Optional
+from typing import AsyncIterator, Iterable, Literal, Optional
 import logging
 
+from app.core import deadline, telemetry, tracing
 from app.models.pydantic_types import (
     BurnoutPoint,
+    LLMAnalysisSummary,
     ChannelMetric,
     HeatmapMatrix,
     KPI,
-    RiskLevel,
     SentimentPoint,
-    SlackMessage,
+    SlackChannel,
     TimeRange,
 )
+from app.services import message_store, persistence, user_store
+from app.services.message_batch import MessageBatch, shared_vocabulary
 from app.services.slack_service import SlackService
-from app.services.anthropic_service import AnthropicService
+from app.services.anthropic_service import AnthropicService, MessagesInput
+from app.services.thread_metrics import thread_stats
+
+
+HeatmapGrouping = Literal["channels", "teams", "people"]
+HeatmapMetric = Literal["sentiment", "messages", "threads"]
 
 
 class DashboardService:
-    def __init__(self) -> None:
-        self.slack = SlackService()
-        self.anthropic = AnthropicService()
+    def __init__(self, slack: Optional[SlackService] = None, anthropic: Optional[AnthropicService] = None) -> None:
+        self.slack = slack or SlackService()
+        self.anthropic = anthropic or AnthropicService()
+
+    def _persist_scores(self, channel_id: str, analysis: LLMAnalysisSummary) -> None:
+        team_id = self.slack.active_team_key()
+        # Unlabelled scores (no scorer recorded) are not stored
+        if team_id == "demo" or not analysis.items or analysis.model is None:
+            return
+        persistence.schedule(persistence.save_scores, team_id, channel_id, analysis.items, analysis.model)
+
+    # Slack and Anthropic calls go through the request deadline: once it is spent, a channel
+    # is served from whatever the cache holds (the fetch finishes in the background) and
+    # messages are scored heuristically. The bool is True for such partial values.
+
+    async def _window(self, cid: str, *, oldest: float, latest: Optional[float] = None) -> tuple[MessageBatch, bool]:
+        with tracing.span("dashboard.window", channel=cid):
+            return await deadline.bounded(
+                message_store.get_channel_window(self.slack, cid, oldest=oldest, latest=latest),
+                lambda: message_store.peek_channel_window(self.slack, cid, oldest=oldest, latest=latest),
+                shield=True,
+            )
+
+    async def _analyze(self, cid: Optional[str], messages: MessagesInput) -> tuple[LLMAnalysisSummary, bool]:
+        with tracing.span("dashboard.analyze", channel=cid, messages=len(messages)):
+            analysis, partial = await deadline.bounded(
+                self.anthropic.analyze_slack_messages(messages),
+                lambda: self.anthropic.heuristic_analysis(messages),
+            )
+        if partial:
+            telemetry.LLM_FALLBACKS.inc("analyze", "deadline")
+        elif cid is not None:
+            self._persist_scores(cid, analysis)
+        return analysis, partial
 
     @staticmethod
     def _oldest_ts_for_range(time_range: TimeRange) -> str:
@@ -29,144 +69,188 @@ class DashboardService:
         days = 7 if time_range == "week" else 30 if time_range == "month" else 90 if time_range == "quarter" else 365
         return str(now - days * 24 * 60 * 60)
 
-    async def _fetch_recent_messages(self, *, channel_ids: Optional[list[str]] = None, oldest: Optional[str] = None, latest: Optional[str] = None) -> dict[str, list[SlackMessage]]:
-        channels = channel_ids
-        if not channels:
-            selected = await self.slack.get_selected_channels()
-            if selected.channels:
-                channels = [c.id for c in selected.channels]
-            else:
-                # If not connected to Slack, fall back to demo channels; otherwise avoid fan-out
-                if getattr(self.slack, "is_connected", lambda: False)():
-                    channels = []
-                else:
-                    channels = [c.id for c in (await self.slack.list_channels())]
-        results: dict[str, list[SlackMessage]] = {}
+    @staticmethod
+    def _buckets(time_range: TimeRange) -> list[tuple[str, datetime, datetime]]:
+        """Contiguous (label, start, end) buckets, oldest first."""
+        step_days = 1 if time_range in ("week", "month") else (7 if time_range == "quarter" else 30)
+        steps = 7 if time_range == "week" else 30 if time_range == "month" else 12
+        now = datetime.utcnow()
+        buckets: list[tuple[str, datetime, datetime]] = []
+        for i in range(steps - 1, -1, -1):
+            start = now - timedelta(days=(i + 1) * step_days)
+            end = now - timedelta(days=i * step_days)
+            label = (
+                end.strftime("%a") if time_range == "week" else (str(end.day) if time_range == "month" else end.strftime("%b"))
+            )
+            buckets.append((label, start, end))
+        return buckets
+
+    @staticmethod
+    def _bucket_edges(buckets: list[tuple[str, datetime, datetime]]) -> list[float]:
+        return [start.timestamp() for _, start, _ in buckets] + [buckets[-1][2].timestamp()]
+
+    async def _resolve_channel_ids(self, channel_ids: Optional[list[str]] = None) -> list[str]:
+        if channel_ids:
+            return channel_ids
+        selected = await self.slack.get_selected_channels()
+        if selected.channels:
+            return [c.id for c in selected.channels]
+        # If not connected to Slack, fall back to demo channels; otherwise avoid fan-out
+        if getattr(self.slack, "is_connected", lambda: False)():
+            return []
+        return [c.id for c in (await self.slack.list_channels())]
+
+    async def _fetch_recent_messages(
+        self,
+        *,
+        channel_ids: Optional[list[str]] = None,
+        oldest: Optional[str | float] = None,
+        latest: Optional[str | float] = None,
+        partial: Optional[set[str]] = None,
+    ) -> dict[str, MessageBatch]:
+        """Channel windows by ID; channels served from cache after the deadline are added to `partial`."""
+        channels = await self._resolve_channel_ids(channel_ids)
+        results: dict[str, MessageBatch] = {}
         for cid in channels:
-            resp = await self.slack.get_channel_messages(channel_id=cid, oldest=oldest, latest=latest, limit=200)
-            results[cid] = resp.messages
+            results[cid], late = await self._window(
+                cid,
+                oldest=float(oldest or self._oldest_ts_for_range("year")),
+                latest=float(latest) if latest else None,
+            )
+            if late and partial is not None:
+                partial.add(cid)
         return results
 
+    @tracing.traced("dashboard.kpi")
     async def compute_kpi(self, *, time_range: TimeRange, channel_ids: Optional[list[str]] = None) -> KPI:
         oldest = self._oldest_ts_for_range(time_range)
         logging.getLogger(__name__).info("dashboard: computing KPI for range=%s oldest=%s", time_range, oldest)
-        by_channel = await self._fetch_recent_messages(channel_ids=channel_ids, oldest=oldest)
+        partial: set[str] = set()
+        by_channel = await self._fetch_recent_messages(channel_ids=channel_ids, oldest=oldest, partial=partial)
         logging.getLogger(__name__).debug("dashboard: fetched messages for %d channels", len(by_channel))
         # Aggregate sentiment via LLM per channel and overall
-        channel_levels: list[RiskLevel] = []
-        sentiments: list[float] = []
+        analyses: list[LLMAnalysisSummary] = []
         for cid, msgs in by_channel.items():
             if not msgs:
                 continue
             logging.getLogger(__name__).debug("dashboard: analyzing channel=%s messages=%d", cid, len(msgs))
             try:
-                analysis = await self.anthropic.analyze_slack_messages(msgs)
-                sentiments.append(analysis.overallSentiment)
-                channel_levels.append(analysis.burnoutRiskLevel)
+                analysis, late = await self._analyze(cid, msgs)
+                if late:
+                    partial.add(cid)
+                analyses.append(analysis)
             except Exception as exc:  # pragma: no cover
                 logging.getLogger(__name__).error("dashboard: anthropic error for channel=%s: %s", cid, exc)
-        avg = 0.0 if not sentiments else sum(sentiments) / max(1, len(sentiments))
-        burnout = len([lvl for lvl in channel_levels if lvl in ("Medium", "High")])  # type: ignore[comparison-overlap]
-        return KPI(avgSentiment=round(avg, 2), burnoutRiskCount=burnout, monitoredChannels=len(by_channel))
+        return self._kpi(analyses, monitored=len(by_channel), partial=bool(partial))
+
+    @staticmethod
+    def _kpi(analyses: Iterable[LLMAnalysisSummary], *, monitored: int, partial: bool) -> KPI:
+        """KPI from the per-channel analyses of channels with messages."""
+        analyses = list(analyses)
+        avg = 0.0 if not analyses else sum(a.overallSentiment for a in analyses) / len(analyses)
+        burnout = len([a for a in analyses if a.burnoutRiskLevel in ("Medium", "High")])
+        return KPI(avgSentiment=round(avg, 2), burnoutRiskCount=burnout, monitoredChannels=monitored, partial=partial)
 
+    async def _channel_metric(
+        self, cid: str, name: str, msgs: MessageBatch, *, partial: bool = False, analysis: Optional[LLMAnalysisSummary] = None
+    ) -> ChannelMetric:
+        # `analysis`: the window's score when the caller already has it
+        logging.getLogger(__name__).debug("dashboard: channel=%s name=%s messages=%d", cid, name, len(msgs))
+        if msgs and analysis is None:
+            try:
+                analysis, late = await self._analyze(cid, msgs)
+                partial = partial or late
+            except Exception as exc:  # pragma: no cover
+                logging.getLogger(__name__).error("dashboard: anthropic error for channel=%s: %s", cid, exc)
+        avg_sent = analysis.overallSentiment if analysis else 0.0
+        risk = analysis.burnoutRiskLevel if analysis else "Low"
+        replies, late = await deadline.bounded(
+            message_store.get_thread_replies(self.slack, msgs),
+            lambda: message_store.peek_thread_replies(self.slack, msgs),
+            shield=True,
+        )
+        stats = thread_stats(msgs, replies)
+        last_ts = msgs.ts[-1] if msgs else datetime.utcnow().timestamp()
+        last_iso = datetime.utcfromtimestamp(int(float(last_ts))).isoformat()
+        return ChannelMetric(
+            id=cid,
+            name=name,
+            avgSentiment=round(avg_sent, 2),
+            messages=len(msgs),
+            threads=stats.threads,
+            lastActivity=last_iso,
+            risk=risk,
+            responses=stats.replies,
+            avgFirstResponseMinutes=stats.avg_first_response_minutes,
+            partial=partial or late,
+        )
+
+    @tracing.traced("dashboard.channels")
     async def compute_channel_metrics(self, *, time_range: TimeRange, channel_ids: Optional[list[str]] = None) -> list[ChannelMetric]:
         oldest = self._oldest_ts_for_range(time_range)
         logging.getLogger(__name__).info("dashboard: computing channel metrics range=%s oldest=%s", time_range, oldest)
-        by_channel = await self._fetch_recent_messages(channel_ids=channel_ids, oldest=oldest)
+        partial: set[str] = set()
+        by_channel = await self._fetch_recent_messages(channel_ids=channel_ids, oldest=oldest, partial=partial)
         # Need names
         channel_name_map = {c.id: c.name for c in (await self.slack.list_channels())}
-        out: list[ChannelMetric] = []
-        for cid, msgs in by_channel.items():
-            name = channel_name_map.get(cid, cid)
-            logging.getLogger(__name__).debug("dashboard: channel=%s name=%s messages=%d", cid, name, len(msgs))
-            analysis = None
-            if msgs:
-                try:
-                    analysis = await self.anthropic.analyze_slack_messages(msgs)
-                except Exception as exc:  # pragma: no cover
-                    logging.getLogger(__name__).error("dashboard: anthropic error for channel=%s: %s", cid, exc)
-            avg_sent = analysis.overallSentiment if analysis else 0.0
-            risk = analysis.burnoutRiskLevel if analysis else "Low"
-            threads = max(0, len(msgs) // 5)
-            last_ts = msgs[0].ts if msgs else str(int(datetime.utcnow().timestamp()))
-            last_iso = datetime.utcfromtimestamp(int(float(last_ts))).isoformat()
-            out.append(
-                ChannelMetric(
-                    id=cid,
-                    name=name,
-                    avgSentiment=round(avg_sent, 2),
-                    messages=len(msgs),
-                    threads=threads,
-                    lastActivity=last_iso,
-                    risk=risk,
+        return [
+            await self._channel_metric(cid, channel_name_map.get(cid, cid), msgs, partial=cid in partial)
+            for cid, msgs in by_channel.items()
+        ]
+
+    async def _trend_point(self, i: int, label: str, end: datetime, views: list[MessageBatch], *, partial: bool = False) -> SentimentPoint:
+        count = sum(len(v) for v in views)
+        logging.getLogger(__name__).debug(
+            "dashboard: trend bucket %d channels=%d message_count=%d", i, len(views), count
+        )
+        if count:
+            try:
+                analysis, late = await self._analyze(None, [r for v in views for r in v.rows()])
+                partial = partial or late
+                avg_s = analysis.overallSentiment
+            except Exception as exc:  # pragma: no cover
+                logging.getLogger(__name__).error(
+                    "dashboard: anthropic error in trend bucket %d: %s", i, exc
                 )
-            )
-        return out
+                avg_s = 0.0
+        else:
+            avg_s = 0.0
+        return SentimentPoint(
+            date=end.strftime("%Y-%m-%d"),
+            label=label,
+            avgSentiment=round(avg_s, 2),
+            messageCount=count,
+            partial=partial,
+        )
 
+    @tracing.traced("dashboard.trend")
     async def compute_trend(self, *, time_range: TimeRange, channel_ids: Optional[list[str]] = None) -> list[SentimentPoint]:
-        # Build buckets by day/week/month and analyze per bucket
-        step_days = 1 if time_range in ("week", "month") else (7 if time_range == "quarter" else 30)
-        steps = 7 if time_range == "week" else 30 if time_range == "month" else 12
-        points: list[SentimentPoint] = []
-        now = datetime.utcnow()
+        # Fetch each channel's window once, then split it into day/week/month buckets by binary search
+        buckets = self._buckets(time_range)
+        edges = self._bucket_edges(buckets)
         logging.getLogger(__name__).info(
-            "dashboard: computing trend range=%s steps=%d step_days=%d",
+            "dashboard: computing trend range=%s steps=%d",
             time_range,
-            steps,
-            step_days,
+            len(buckets),
         )
-        for i in range(steps - 1, -1, -1):
-            start = now - timedelta(days=(i + 1) * step_days)
-            end = now - timedelta(days=i * step_days)
-            oldest = str(int(start.timestamp()))
-            latest = str(int(end.timestamp()))
-            by_channel = await self._fetch_recent_messages(channel_ids=channel_ids, oldest=oldest, latest=latest)
-            logging.getLogger(__name__).debug(
-                "dashboard: trend bucket %d: oldest=%s channels=%d",
-                i,
-                oldest,
-                len(by_channel),
-            )
-            # Flatten messages in window (Slack API call already filters oldest; we could also filter latest if provided)
-            msgs = [m for msgs in by_channel.values() for m in msgs]
-            logging.getLogger(__name__).debug(
-                "dashboard: trend bucket %d message_count=%d", i, len(msgs)
-            )
-            if msgs:
-                try:
-                    analysis = await self.anthropic.analyze_slack_messages(msgs)
-                    avg_s = analysis.overallSentiment
-                    count = len(msgs)
-                except Exception as exc:  # pragma: no cover
-                    logging.getLogger(__name__).error(
-                        "dashboard: anthropic error in trend bucket %d: %s", i, exc
-                    )
-                    avg_s = 0.0
-                    count = len(msgs)
-            else:
-                avg_s = 0.0
-                count = 0
-            label = (
-                end.strftime("%a")
-                if time_range == "week"
-                else str(end.day)
-                if time_range == "month"
-                else end.strftime("%b")
-            )
-            points.append(
-                SentimentPoint(
-                    date=end.strftime("%Y-%m-%d"),
-                    label=label,
-                    avgSentiment=round(avg_s, 2),
-                    messageCount=count,
-                )
-            )
-        return points
+        partial: set[str] = set()
+        by_channel = await self._fetch_recent_messages(channel_ids=channel_ids, oldest=edges[0], partial=partial)
+        splits = [batch.split(edges) for batch in by_channel.values()]
+        return [
+            await self._trend_point(i, label, end, [split[i] for split in splits], partial=bool(partial))
+            for i, (label, _, end) in enumerate(buckets)
+        ]
 
-    async def compute_burnout_series(self, *, time_range: TimeRange, group: Literal["channels", "team", "person"] = "channels", channel_ids: Optional[list[str]] = None) -> dict[str, object]:
+    async def compute_current_trend_point(self, *, time_range: TimeRange, channel_ids: Optional[list[str]] = None) -> SentimentPoint:
+        """Only the newest trend bucket (the one still receiving messages)."""
+        buckets = self._buckets(time_range)
+        label, start, end = buckets[-1]
+        partial: set[str] = set()
+        by_channel = await self._fetch_recent_messages(channel_ids=channel_ids, oldest=start.timestamp(), partial=partial)
+        return await self._trend_point(len(buckets) - 1, label, end, list(by_channel.values()), partial=bool(partial))
+
+    async def _burnout_channels(self, channel_ids: Optional[list[str]]) -> list[SlackChannel]:
         # Channels-as-teams: show risk over time per selected channel
-        steps = 7 if time_range == "week" else 30 if time_range == "month" else 12
-        step_days = 1 if time_range in ("week", "month") else (7 if time_range == "quarter" else 30)
         selected = await self.slack.get_selected_channels()
         if channel_ids:
             # Filter to provided ids intersecting with selected list
@@ -177,42 +261,39 @@ class DashboardService:
         # If not connected, use demo channels
         if not channels:
             channels = await self.slack.list_channels()
+        return channels
 
+    async def _burnout_points(self, cid: str, buckets: list[tuple[str, datetime, datetime]], split: list[MessageBatch], *, partial: bool = False) -> list[BurnoutPoint]:
+        points: list[BurnoutPoint] = []
+        for (label, _, _), msgs in zip(buckets, split):
+            val = 0
+            late = False
+            if msgs:
+                try:
+                    analysis, late = await self._analyze(None, msgs)
+                    lvl = analysis.burnoutRiskLevel
+                    val = 2 if lvl == "High" else (1 if lvl == "Medium" else 0)
+                except Exception as exc:  # pragma: no cover
+                    logging.getLogger(__name__).error("dashboard: anthropic error in burnout series for channel=%s: %s", cid, exc)
+            points.append(BurnoutPoint(label=label, value=val, partial=partial or late))
+        return points
+
+    @tracing.traced("dashboard.burnout_series")
+    async def compute_burnout_series(self, *, time_range: TimeRange, group: Literal["channels", "team", "person"] = "channels", channel_ids: Optional[list[str]] = None) -> dict[str, object]:
+        channels = await self._burnout_channels(channel_ids)
         # Map id->name for labels
         name_map = {c.id: (c.name or c.id) for c in channels}
         series: dict[str, list[BurnoutPoint]] = {name_map[c.id]: [] for c in channels}
 
-        now = datetime.utcnow()
-        for i in range(steps - 1, -1, -1):
-            start = now - timedelta(days=(i + 1) * step_days)
-            end = now - timedelta(days=i * step_days)
-            oldest = str(int(start.timestamp()))
-            latest = str(int(end.timestamp()))
-            label = (
-                end.strftime("%a")
-                if time_range == "week"
-                else str(end.day)
-                if time_range == "month"
-                else end.strftime("%b")
-            )
-            for c in channels:
-                msgs = (await self.slack.get_channel_messages(channel_id=c.id, oldest=oldest, latest=latest, limit=200)).messages
-                if msgs:
-                    try:
-                        analysis = await self.anthropic.analyze_slack_messages(msgs)
-                        lvl = analysis.burnoutRiskLevel
-                        val = 2 if lvl == "High" else (1 if lvl == "Medium" else 0)
-                    except Exception as exc:  # pragma: no cover
-                        logging.getLogger(__name__).error("dashboard: anthropic error in burnout series for channel=%s: %s", c.id, exc)
-                        val = 0
-                else:
-                    val = 0
-                series[name_map[c.id]].append(BurnoutPoint(label=label, value=val))
+        buckets = self._buckets(time_range)
+        edges = self._bucket_edges(buckets)
+        for c in channels:
+            window, late = await self._window(c.id, oldest=edges[0])
+            series[name_map[c.id]] = await self._burnout_points(c.id, buckets, window.split(edges), partial=late)
         label = "Channels" if group in ("channels", "team") else "People"
         return {"label": label, "series": series}
 
-    async def compute_heatmap(self, *, grouping: Literal["channels", "teams", "people"], metric: Literal["sentiment", "messages", "threads"], time_range: TimeRange, channel_ids: Optional[list[str]] = None) -> HeatmapMatrix:
-        # Determine entities
+    async def _heatmap_channels(self, channel_ids: Optional[list[str]]) -> list[SlackChannel]:
         selected = await self.slack.get_selected_channels()
         channels = selected.channels or []
         if not channels:
@@ -220,106 +301,213 @@ class DashboardService:
         if channel_ids:
             channel_id_set = set(channel_ids)
             channels = [c for c in channels if c.id in channel_id_set]
+        return channels
 
-        # Group mapping
-        if grouping in ("channels", "teams"):
-            # Treat teams as channels
-            rows = [c.name for c in channels]
-            # id mapping not currently needed
-        else:
-            # People: derive from selected channels' users
-            users = await self.slack.list_users()
-            # Default to all non-bot users; will filter per bucket
-            rows = [u.displayName or u.username or u.id for u in users]
-            user_id_map = { (u.displayName or u.username or u.id): u.id for u in users }
+    async def _heatmap_channel_row(self, split: list[MessageBatch], metric: HeatmapMetric) -> tuple[list[float], bool]:
+        row_vals: list[float] = []
+        partial = False
+        for msgs in split:
+            if metric == "sentiment":
+                if msgs:
+                    try:
+                        analysis, late = await self._analyze(None, msgs)
+                        partial = partial or late
+                        row_vals.append(float(analysis.overallSentiment))
+                    except Exception:  # pragma: no cover
+                        row_vals.append(0.0)
+                else:
+                    row_vals.append(0.0)
+            elif metric == "messages":
+                row_vals.append(float(len(msgs)))
+            else:  # threads started in the bucket
+                row_vals.append(float(len(msgs.thread_root_indices())))
+        return row_vals, partial
 
-        # Build bucket boundaries and labels similar to trend
-        step_days = 1 if time_range in ("week", "month") else (7 if time_range == "quarter" else 30)
-        steps = 7 if time_range == "week" else 30 if time_range == "month" else 12
-        now = datetime.utcnow()
-        buckets: list[tuple[str, str, str]] = []  # (label, oldest, latest)
-        for i in range(steps - 1, -1, -1):
-            start = now - timedelta(days=(i + 1) * step_days)
-            end = now - timedelta(days=i * step_days)
-            label = (
-                end.strftime("%a") if time_range == "week" else (str(end.day) if time_range == "month" else end.strftime("%b"))
-            )
-            buckets.append((label, str(int(start.timestamp())), str(int(end.timestamp()))))
-        cols = [b[0] for b in buckets]
+    async def _people_heatmap(
+        self,
+        windows: dict[str, MessageBatch],
+        splits: dict[str, list[MessageBatch]],
+        bucket_count: int,
+        metric: HeatmapMetric,
+        time_range: TimeRange,
+    ) -> tuple[list[str], list[list[float]]]:
+        # People: derive from selected channels' users
+        users = await user_store.get_users(self.slack)
+        user_id_map = {(u.displayName or u.username or u.id): u.id for u in users}
+
+        # People metrics: compute counts per user per bucket; for sentiment, use a simple heuristic
+        positive_words = {"great","good","excellent","awesome","thanks","thank you","love","nice","well done","amazing","happy","win","ship"}
+        negative_words = {"bad","terrible","awful","hate","stuck","blocked","broken","late","fail","risky","stress","stressful","overworked","burnout","exhausted","tired","anxious","deadline"}
+
+        def score_sent(text: str) -> float:
+            t = text.lower()
+            pos = sum(1 for w in positive_words if w in t)
+            neg = sum(1 for w in negative_words if w in t)
+            raw = pos - neg
+            if raw == 0:
+                return 0.0
+            return max(-1.0, min(1.0, raw / 5.0))
+
+        # determine top users by total messages across the window to limit heatmap size
+        aggregate_counts: dict[str, int] = {}
+        vocab = shared_vocabulary(windows.values()).users
+        oldest_range = float(self._oldest_ts_for_range(time_range))
+        for w in windows.values():
+            for code, (count, _) in w.window(oldest_range).counts_by_user().items():
+                uid = vocab.lookup(code) or "unknown"
+                aggregate_counts[uid] = aggregate_counts.get(uid, 0) + count
+        # Map to names
+        user_name_map = {v: k for k, v in user_id_map.items()}
+        top_users = sorted(aggregate_counts.items(), key=lambda kv: kv[1], reverse=True)[:8]
+        rows = [user_name_map.get(uid, uid) for uid, _ in top_users]
+        target_codes = [vocab.intern(uid) for uid, _ in top_users]
+
+        # Single pass per bucket: per-user message texts and started threads across channels
+        per_bucket: list[dict[int, list[str]]] = []
+        threads_per_bucket: list[dict[int, int]] = []
+        for i in range(bucket_count):
+            by_user: dict[int, list[str]] = {}
+            threads_by_user: dict[int, int] = {}
+            for split in splits.values():
+                view = split[i]
+                texts = view.texts
+                for j, code in enumerate(view.user_codes):
+                    by_user.setdefault(code, []).append(texts[j] if texts is not None else "")
+                for j in view.thread_root_indices():
+                    code = view.user_codes[j]
+                    threads_by_user[code] = threads_by_user.get(code, 0) + 1
+            per_bucket.append(by_user)
+            threads_per_bucket.append(threads_by_user)
 
-        # Initialize values matrix
         values: list[list[float]] = []
+        for user_code in target_codes:
+            row_vals = []
+            for by_user, threads_by_user in zip(per_bucket, threads_per_bucket):
+                texts = by_user.get(user_code, [])
+                if metric == "messages":
+                    row_vals.append(float(len(texts)))
+                elif metric == "threads":
+                    row_vals.append(float(threads_by_user.get(user_code, 0)))
+                else:  # sentiment heuristic per user
+                    if texts:
+                        s = sum(score_sent(t or "") for t in texts) / max(1, len(texts))
+                        row_vals.append(float(s))
+                    else:
+                        row_vals.append(0.0)
+            values.append(row_vals)
+        return rows, values
 
-        if grouping in ("channels", "teams"):
-            for c in channels:
-                row_vals: list[float] = []
-                for _, oldest, latest in buckets:
-                    msgs = (await self.slack.get_channel_messages(channel_id=c.id, oldest=oldest, latest=latest, limit=200)).messages
-                    if metric == "sentiment":
-                        if msgs:
-                            try:
-                                analysis = await self.anthropic.analyze_slack_messages(msgs)
-                                row_vals.append(float(analysis.overallSentiment))
-                            except Exception:  # pragma: no cover
-                                row_vals.append(0.0)
-                        else:
-                            row_vals.append(0.0)
-                    elif metric == "messages":
-                        row_vals.append(float(len(msgs)))
-                    else:  # threads
-                        row_vals.append(float(max(0, len(msgs) // 5)))
-                values.append(row_vals)
-            rows = [c.name for c in channels]
-        else:
-            # People metrics: compute counts per user per bucket; for sentiment, use a simple heuristic
-            positive_words = {"great","good","excellent","awesome","thanks","thank you","love","nice","well done","amazing","happy","win","ship"}
-            negative_words = {"bad","terrible","awful","hate","stuck","blocked","broken","late","fail","risky","stress","stressful","overworked","burnout","exhausted","tired","anxious","deadline"}
-
-            def score_sent(text: str) -> float:
-                t = text.lower()
-                pos = sum(1 for w in positive_words if w in t)
-                neg = sum(1 for w in negative_words if w in t)
-                raw = pos - neg
-                if raw == 0:
-                    return 0.0
-                return max(-1.0, min(1.0, raw / 5.0))
-
-            # determine top users by total messages across the window to limit heatmap size
-            aggregate_counts: dict[str, int] = {}
-            # Single broad window for ranking
-            wide_msgs = []
-            oldest_all = self._oldest_ts_for_range(time_range)
-            for c in channels:
-                wide_msgs.extend((await self.slack.get_channel_messages(channel_id=c.id, oldest=oldest_all, limit=200)).messages)
-            for m in wide_msgs:
-                uid = m.userId or "unknown"
-                aggregate_counts[uid] = aggregate_counts.get(uid, 0) + 1
-            # Map to names
-            user_name_map = {v: k for k, v in user_id_map.items()} if 'user_id_map' in locals() else {}
-            top_users = sorted(aggregate_counts.items(), key=lambda kv: kv[1], reverse=True)[:8]
-            rows = [user_name_map.get(uid, uid) for uid, _ in top_users]
-            target_user_ids = [uid for uid, _ in top_users]
-
-            for uid in target_user_ids:
-                row_vals: list[float] = []
-                for _, oldest, latest in buckets:
-                    # gather user messages across selected channels in this window
-                    msgs: list[SlackMessage] = []
-                    for c in channels:
-                        m = (await self.slack.get_channel_messages(channel_id=c.id, oldest=oldest, latest=latest, limit=200)).messages
-                        msgs.extend([x for x in m if (x.userId or "") == uid])
-                    if metric == "messages":
-                        row_vals.append(float(len(msgs)))
-                    elif metric == "threads":
-                        row_vals.append(float(max(0, int(len(msgs) * 0.2))))
-                    else:  # sentiment heuristic per user
-                        if msgs:
-                            s = sum(score_sent(x.text or "") for x in msgs) / max(1, len(msgs))
-                            row_vals.append(float(s))
-                        else:
-                            row_vals.append(0.0)
-                values.append(row_vals)
-
-        return HeatmapMatrix(rows=rows, cols=cols, values=values)
+    @tracing.traced("dashboard.heatmap")
+    async def compute_heatmap(self, *, grouping: HeatmapGrouping, metric: HeatmapMetric, time_range: TimeRange, channel_ids: Optional[list[str]] = None) -> HeatmapMatrix:
+        cols: list[str] = []
+        rows: dict[int, tuple[str, list[float], bool]] = {}
+        async for event, data in self.stream_heatmap(grouping=grouping, metric=metric, time_range=time_range, channel_ids=channel_ids):
+            if event == "meta":
+                cols = data["cols"]
+            elif event == "row":
+                rows[data["index"]] = (data["name"], data["values"], data["partial"])
+        ordered = [rows[i] for i in sorted(rows)]
+        return HeatmapMatrix(
+            rows=[name for name, _, _ in ordered],
+            cols=cols,
+            values=[values for _, values, _ in ordered],
+            partialRows=[name for name, _, partial in ordered if partial],
+        )
+
+    # ===== Progressive (streaming) variants =====
+    #
+    # Async generators yielding `(event, data)` pairs as results become ready, for the SSE
+    # routes. Each stream starts with `meta`, emits `progress` after every channel, and ends
+    # with `done`. Channel windows are fetched concurrently and handled in completion order,
+    # so rows carry an `index` giving their position in the final (non-streamed) layout.
+
+    async def _windows_as_completed(self, channel_ids: list[str], *, oldest: float) -> AsyncIterator[tuple[int, str, MessageBatch, bool]]:
+        async def load(index: int, cid: str) -> tuple[int, str, MessageBatch, bool]:
+            window, partial = await self._window(cid, oldest=oldest)
+            return index, cid, window, partial
+
+        tasks = [asyncio.ensure_future(load(i, cid)) for i, cid in enumerate(channel_ids)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def stream_channel_metrics(self, *, time_range: TimeRange, channel_ids: Optional[list[str]] = None) -> AsyncIterator[tuple[str, dict]]:
+        channels = await self._resolve_channel_ids(channel_ids)
+        yield "meta", {"total": len(channels)}
+        channel_name_map = {c.id: c.name for c in (await self.slack.list_channels())}
+        oldest = float(self._oldest_ts_for_range(time_range))
+        done = 0
+        async for index, cid, msgs, partial in self._windows_as_completed(channels, oldest=oldest):
+            metric = await self._channel_metric(cid, channel_name_map.get(cid, cid), msgs, partial=partial)
+            done += 1
+            yield "row", {"index": index, "metric": metric}
+            yield "progress", {"done": done, "total": len(channels)}
+        yield "done", {}
+
+    async def stream_trend(self, *, time_range: TimeRange, channel_ids: Optional[list[str]] = None) -> AsyncIterator[tuple[str, dict]]:
+        # Buckets span all channels, so points follow once every window is loaded
+        channels = await self._resolve_channel_ids(channel_ids)
+        buckets = self._buckets(time_range)
+        edges = self._bucket_edges(buckets)
+        yield "meta", {"total": len(channels), "labels": [b[0] for b in buckets]}
+        splits: list[list[MessageBatch]] = []
+        any_partial = False
+        async for _, _, batch, partial in self._windows_as_completed(channels, oldest=edges[0]):
+            splits.append(batch.split(edges))
+            any_partial = any_partial or partial
+            yield "progress", {"done": len(splits), "total": len(channels)}
+        for i, (label, _, end) in enumerate(buckets):
+            point = await self._trend_point(i, label, end, [split[i] for split in splits], partial=any_partial)
+            yield "point", {"index": i, "point": point}
+        yield "done", {}
 
+    async def stream_burnout_series(self, *, time_range: TimeRange, group: Literal["channels", "team", "person"] = "channels", channel_ids: Optional[list[str]] = None) -> AsyncIterator[tuple[str, dict]]:
+        channels = await self._burnout_channels(channel_ids)
+        buckets = self._buckets(time_range)
+        edges = self._bucket_edges(buckets)
+        label = "Channels" if group in ("channels", "team") else "People"
+        yield "meta", {"label": label, "labels": [b[0] for b in buckets], "total": len(channels)}
+        done = 0
+        async for index, cid, window, partial in self._windows_as_completed([c.id for c in channels], oldest=edges[0]):
+            points = await self._burnout_points(cid, buckets, window.split(edges), partial=partial)
+            done += 1
+            yield "series", {"index": index, "name": channels[index].name or cid, "points": points}
+            yield "progress", {"done": done, "total": len(channels)}
+        yield "done", {}
 
+    async def stream_heatmap(self, *, grouping: HeatmapGrouping, metric: HeatmapMetric, time_range: TimeRange, channel_ids: Optional[list[str]] = None) -> AsyncIterator[tuple[str, dict]]:
+        channels = await self._heatmap_channels(channel_ids)
+        # Build bucket boundaries and labels similar to trend
+        buckets = self._buckets(time_range)
+        edges = self._bucket_edges(buckets)
+        yield "meta", {"cols": [b[0] for b in buckets], "total": len(channels), "grouping": grouping, "metric": metric}
+
+        # One window per channel for the whole range; buckets are zero-copy views into it
+        oldest_all = min(edges[0], float(self._oldest_ts_for_range(time_range)))
+        windows: dict[str, MessageBatch] = {}
+        splits: dict[str, list[MessageBatch]] = {}
+        by_channel_grouping = grouping in ("channels", "teams")  # teams are treated as channels
+        done = 0
+        any_partial = False
+        async for index, cid, window, partial in self._windows_as_completed([c.id for c in channels], oldest=oldest_all):
+            windows[cid] = window
+            splits[cid] = window.split(edges)
+            any_partial = any_partial or partial
+            if by_channel_grouping:
+                values, late = await self._heatmap_channel_row(splits[cid], metric)
+                yield "row", {"index": index, "name": channels[index].name, "values": values, "partial": partial or late}
+            done += 1
+            yield "progress", {"done": done, "total": len(channels)}
+
+        if not by_channel_grouping:
+            # Top people are ranked across all channels, so their rows follow the last window
+            ordered = {c.id: windows[c.id] for c in channels}
+            names, matrix = await self._people_heatmap(
+                ordered, {cid: splits[cid] for cid in ordered}, len(buckets), metric, time_range
+            )
+            for index, (name, values) in enumerate(zip(names, matrix)):
+                yield "row", {"index": index, "name": name, "values": values, "partial": any_partial}
+        yield "done", {}
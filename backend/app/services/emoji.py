@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from app.services.message_batch import Vocabulary
+
+
+# Slack alias names -> unicode. Names without an entry are shown as the alias itself.
+EMOJI_ALIASES: dict[str, str] = {
+    "tada": "🎉",
+    "rocket": "🚀",
+    "raised_hands": "🙌",
+    "thumbsup": "👍",
+    "+1": "👍",
+    "white_check_mark": "✅",
+    "heavy_check_mark": "✔️",
+    "smile": "😄",
+    "simple_smile": "🙂",
+    "grinning": "😀",
+    "joy": "😂",
+    "laughing": "😆",
+    "sweat_smile": "😅",
+    "heart": "❤️",
+    "fire": "🔥",
+    "pray": "🙏",
+    "clap": "👏",
+    "eyes": "👀",
+    "bulb": "💡",
+    "handshake": "🤝",
+    "brain": "🧠",
+    "sparkles": "✨",
+    "star": "⭐",
+    "confetti_ball": "🎊",
+    "100": "💯",
+}
+
+
+def to_unicode(name: str) -> str:
+    # Skin-tone variants ("+1::skin-tone-3") count towards the base emoji
+    base = name.split("::", 1)[0]
+    return EMOJI_ALIASES.get(base, base)
+
+
+def display_for_code(vocab: Vocabulary, code: int) -> str:
+    """Unicode (or alias) for an emoji code of `vocab`, cached there so the alias table is consulted once."""
+    display = vocab.emoji_display
+    while len(display) <= code:
+        display.append(to_unicode(vocab.emojis.lookup(len(display))))
+    return display[code]
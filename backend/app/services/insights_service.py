@@ -5,14 +5,17 @@ from typing import Optional
 import json
 import logging
 
+from app.core import admission, deadline, telemetry
 from app.models.pydantic_types import (
     Insight,
-    SlackMessage,
     TimeRange,
     LLMGeneratedInsights,
 )
+from app.services import message_store
+from app.services.message_batch import MessageBatch
 from app.services.slack_service import SlackService
 from app.services.anthropic_service import AnthropicService
+from app.services.tenant_limits import LlmQuotaExceeded
 
 
 class InsightsService:
@@ -23,9 +26,9 @@ class InsightsService:
     - Falls back to a light heuristic when Anthropic is unavailable
     """
 
-    def __init__(self) -> None:
-        self.slack = SlackService()
-        self.anthropic = AnthropicService()
+    def __init__(self, slack: Optional[SlackService] = None, anthropic: Optional[AnthropicService] = None) -> None:
+        self.slack = slack or SlackService()
+        self.anthropic = anthropic or AnthropicService()
 
     @staticmethod
     def _oldest_ts_for_range(time_range: TimeRange) -> str:
@@ -45,16 +48,22 @@ class InsightsService:
         return [(c.id, (c.name or c.id)) for c in channels]
 
     async def _fetch_messages_for_channels(
-        self, channel_ids: list[str], *, oldest: Optional[str]
-    ) -> dict[str, list[SlackMessage]]:
-        results: dict[str, list[SlackMessage]] = {}
+        self, channel_ids: list[str], *, oldest: Optional[str], partial: Optional[set[str]] = None
+    ) -> dict[str, MessageBatch]:
+        results: dict[str, MessageBatch] = {}
         for cid in channel_ids:
             try:
-                resp = await self.slack.get_channel_messages(channel_id=cid, oldest=oldest, limit=200)
-                results[cid] = resp.messages
+                # Past the request deadline, use whatever is cached for the channel
+                results[cid], late = await deadline.bounded(
+                    message_store.get_channel_window(self.slack, cid, oldest=float(oldest or 0)),
+                    lambda: message_store.peek_channel_window(self.slack, cid, oldest=float(oldest or 0)),
+                    shield=True,
+                )
+                if late and partial is not None:
+                    partial.add(cid)
             except Exception as exc:  # pragma: no cover
                 logging.getLogger(__name__).warning("insights: error fetching messages for channel=%s: %s", cid, exc)
-                results[cid] = []
+                results[cid] = MessageBatch.empty(cid)
         return results
 
     async def generate_team_insights(
@@ -71,21 +80,22 @@ class InsightsService:
         oldest = self._oldest_ts_for_range(time_range)
         ids = [cid for cid, _ in channel_pairs]
         id_to_name = {cid: name for cid, name in channel_pairs}
-        by_channel = await self._fetch_messages_for_channels(ids, oldest=oldest)
+        partial: set[str] = set()
+        by_channel = await self._fetch_messages_for_channels(ids, oldest=oldest, partial=partial)
 
         # Prepare compact input for the LLM
         compact: list[dict[str, object]] = []
         for cid, name in channel_pairs:
-            msgs = by_channel.get(cid, [])
-            # Trim to keep prompt reasonable
-            trimmed = msgs[-80:]
+            msgs = by_channel.get(cid)
+            # Trim to the most recent messages to keep prompt reasonable
+            trimmed = msgs.rows()[-80:] if msgs is not None else []
             compact.append(
                 {
                     "channelId": cid,
                     "channelName": name,
                     "messages": [
-                        {"id": m.id, "userId": m.userId, "text": m.text, "ts": m.ts}
-                        for m in trimmed
+                        {"id": mid, "userId": uid, "text": text, "ts": ts}
+                        for mid, uid, text, ts in trimmed
                     ],
                 }
             )
@@ -113,17 +123,30 @@ class InsightsService:
             "Keep writing crisp and non-repetitive across insights."
         )
 
+        if admission.request_mode() != "normal":
+            logging.getLogger(__name__).info("insights: admission mode is %s, using heuristic", admission.request_mode())
+            telemetry.LLM_FALLBACKS.inc("insights", "admission")
+            return self._heuristic_insights(time_range=time_range, id_to_name=id_to_name, limit=limit)
+
         try:
-            result = await self.anthropic.generate_structured(
-                prompt=(
-                    "Context messages by channel: " + json.dumps(compact, ensure_ascii=False)
-                    + "\n\nTask: "
-                    + task
+            result, late = await deadline.bounded(
+                self.anthropic.generate_structured(
+                    prompt=(
+                        "Context messages by channel: " + json.dumps(compact, ensure_ascii=False)
+                        + "\n\nTask: "
+                        + task
+                    ),
+                    schema_model=LLMGeneratedInsights,
+                    system=system,
+                    temperature=0.2,
                 ),
-                schema_model=LLMGeneratedInsights,
-                system=system,
-                temperature=0.2,
+                lambda: None,
             )
+            if late:
+                logging.getLogger(__name__).warning("insights: request deadline reached, using heuristic")
+                telemetry.LLM_FALLBACKS.inc("insights", "deadline")
+                heuristic = self._heuristic_insights(time_range=time_range, id_to_name=id_to_name, limit=limit)
+                return [it.model_copy(update={"partial": True}) for it in heuristic]
             drafts = result.insights[:limit]
             # Post-process to ensure required fields and normalization into Insight
             now_iso = datetime.utcnow().isoformat()
@@ -161,6 +184,7 @@ class InsightsService:
                         createdAt=created,
                         metricContext=None,
                         range=time_range,
+                        partial=getattr(d, "channelId", None) in partial,
                     )
                 )
             # If fewer than requested, supplement with heuristic items
@@ -174,9 +198,14 @@ class InsightsService:
                         if len(normalized) >= limit:
                             break
             return normalized[:limit]
+        except LlmQuotaExceeded as exc:
+            logging.getLogger(__name__).warning("insights: %s, using heuristic", exc)
+            telemetry.LLM_FALLBACKS.inc("insights", "quota")
+            return self._heuristic_insights(time_range=time_range, id_to_name=id_to_name, limit=limit)
         except Exception as exc:  # pragma: no cover
             # Fallback to simple heuristic similar to the frontend mocks
             logging.getLogger(__name__).warning("insights: anthropic failed or unavailable, using heuristic: %s", exc)
+            telemetry.LLM_FALLBACKS.inc("insights", "error")
             return self._heuristic_insights(time_range=time_range, id_to_name=id_to_name, limit=limit)
 
     def _heuristic_insights(
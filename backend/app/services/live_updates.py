@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Optional
+
+from app.core import deadline
+from app.models.pydantic_types import LLMAnalysisSummary, TimeRange
+from app.services import message_store
+from app.services.dashboard_service import DashboardService
+
+
+# Live dashboard updates for WebSocket subscribers. Subscribers asking for the same
+# (team, range, channels) share one topic: a single background task that pulls only new
+# messages into the channel window cache every `interval` seconds and, when channels'
+# ingest revisions moved, rescores just those channels, rebuilds the KPI from the per-channel
+# scores and recomputes the current trend bucket, then pushes what changed to every subscriber.
+# A quiet topic is recomputed too once time moves it: when the current trend bucket rolls
+# over, or when the range start passes a channel's oldest scored message.
+#
+# Messages put on subscriber queues are `(type, data)`:
+#   snapshot  {"kpi", "channels", "trend"}           first message, and after a queue overflow
+#   kpi       KPI                                      when it changed
+#   channels  {"changed": [ChannelMetric], "removed": [id]}
+#   trend     SentimentPoint for the current bucket    when it changed
+
+_MAX_PENDING = 32
+
+TopicKey = tuple[str, str, tuple[str, ...]]
+
+
+@dataclass
+class _Topic:
+    key: TopicKey
+    time_range: TimeRange
+    channel_ids: Optional[list[str]]
+    subscribers: set[asyncio.Queue] = field(default_factory=set)
+    task: Optional[asyncio.Task] = None
+    # Ingest revision per channel as of the last recompute (None before the first)
+    revision: Optional[dict[str, int]] = None
+    kpi: Optional[dict[str, Any]] = None
+    channels: dict[str, dict[str, Any]] = field(default_factory=dict)
+    # Per channel: its window's score (None when empty) and whether it was partial
+    scores: dict[str, tuple[Optional[LLMAnalysisSummary], bool]] = field(default_factory=dict)
+    # Per channel: ts of the oldest message in its scored window (None when empty)
+    oldest: dict[str, Optional[float]] = field(default_factory=dict)
+    # Label of the current trend bucket as of the last recompute
+    bucket: Optional[str] = None
+    trend: Optional[dict[str, Any]] = None
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"kpi": self.kpi, "channels": list(self.channels.values()), "trend": self.trend}
+
+
+class LiveHub:
+    def __init__(self, dashboard: DashboardService, *, interval: float) -> None:
+        self.dashboard = dashboard
+        self.interval = interval
+        self._topics: dict[TopicKey, _Topic] = {}
+
+    def topic_count(self) -> int:
+        return len(self._topics)
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, time_range: TimeRange, channel_ids: Optional[list[str]] = None) -> AsyncIterator[asyncio.Queue]:
+        key: TopicKey = (self.dashboard.slack.active_team_key(), time_range, tuple(sorted(channel_ids or ())))
+        topic = self._topics.get(key)
+        if topic is None:
+            topic = self._topics[key] = _Topic(key=key, time_range=time_range, channel_ids=channel_ids)
+            # The task inherits this context, including the requested team (see app/core/tenancy.py)
+            topic.task = asyncio.get_running_loop().create_task(self._run(topic))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_MAX_PENDING)
+        topic.subscribers.add(queue)
+        if topic.revision is not None:
+            queue.put_nowait(("snapshot", topic.snapshot()))
+        try:
+            yield queue
+        finally:
+            topic.subscribers.discard(queue)
+            if not topic.subscribers and self._topics.get(key) is topic:
+                del self._topics[key]
+                if topic.task is not None:
+                    topic.task.cancel()
+
+    async def _run(self, topic: _Topic) -> None:
+        # Long-lived: not bound by the deadline of the request that opened the topic
+        deadline.set_deadline(None)
+        while True:
+            try:
+                await self._tick(topic)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logging.getLogger(__name__).error("live: refresh failed for %s: %s", topic.key, exc)
+            await asyncio.sleep(self.interval)
+
+    async def _tick(self, topic: _Topic) -> None:
+        revision = await self._refresh(topic)
+        if revision != topic.revision or self._aged(topic):
+            await self._recompute(topic, revision)
+            topic.revision = revision
+
+    def _aged(self, topic: _Topic) -> bool:
+        """Whether time alone moved the topic: the current bucket rolled over, or messages
+        fell out of the range."""
+        dashboard = self.dashboard
+        if topic.bucket != dashboard._buckets(topic.time_range)[-1][0]:
+            return True
+        start = float(dashboard._oldest_ts_for_range(topic.time_range))
+        return any(ts is not None and ts < start for ts in topic.oldest.values())
+
+    async def _refresh(self, topic: _Topic) -> dict[str, int]:
+        # Pulls new messages only (tail fetch) once the cached windows are past their TTL
+        dashboard = self.dashboard
+        channels = await dashboard._resolve_channel_ids(topic.channel_ids)
+        oldest = min(
+            float(dashboard._oldest_ts_for_range(topic.time_range)),
+            dashboard._buckets(topic.time_range)[0][1].timestamp(),
+        )
+        for cid in channels:
+            await message_store.get_channel_window(dashboard.slack, cid, oldest=oldest)
+        team = topic.key[0]
+        return {cid: message_store.revision(team, cid) for cid in channels}
+
+    async def _recompute(self, topic: _Topic, revision: dict[str, int]) -> None:
+        dashboard = self.dashboard
+        first = topic.revision is None
+        previous = topic.revision or {}
+        oldest = float(dashboard._oldest_ts_for_range(topic.time_range))
+        stale = [
+            cid
+            for cid, rev in revision.items()
+            if previous.get(cid) != rev or (topic.oldest.get(cid) or oldest) < oldest
+        ]
+
+        channels = {cid: topic.channels[cid] for cid in revision if cid in topic.channels}
+        names = {c.id: c.name for c in await dashboard.slack.list_channels()} if stale else {}
+        for cid in stale:
+            window, partial = await dashboard._window(cid, oldest=oldest)
+            analysis = None
+            if window:
+                try:
+                    analysis, late = await dashboard._analyze(cid, window)
+                    partial = partial or late
+                except Exception as exc:
+                    logging.getLogger(__name__).error("live: scoring failed for channel=%s: %s", cid, exc)
+            topic.scores[cid] = (analysis, partial)
+            topic.oldest[cid] = window.ts[0] if window else None
+            metric = await dashboard._channel_metric(cid, names.get(cid, cid), window, partial=partial, analysis=analysis)
+            channels[cid] = metric.model_dump()
+        # Listing order, as compute_channel_metrics returns them
+        channels = {cid: channels[cid] for cid in revision}
+        topic.scores = {cid: topic.scores[cid] for cid in revision}
+        topic.oldest = {cid: topic.oldest[cid] for cid in revision}
+        kpi = dashboard._kpi(
+            (a for a, _ in topic.scores.values() if a is not None),
+            monitored=len(revision),
+            partial=any(p for _, p in topic.scores.values()),
+        ).model_dump()
+        # The current bucket spans every channel, so any new message moves it
+        topic.bucket = dashboard._buckets(topic.time_range)[-1][0]
+        trend = (
+            await dashboard.compute_current_trend_point(time_range=topic.time_range, channel_ids=topic.channel_ids)
+        ).model_dump()
+
+        updates: list[tuple[str, Any]] = []
+        if not first:
+            if kpi != topic.kpi:
+                updates.append(("kpi", kpi))
+            changed = [channels[cid] for cid in stale if topic.channels.get(cid) != channels[cid]]
+            removed = [cid for cid in topic.channels if cid not in channels]
+            if changed or removed:
+                updates.append(("channels", {"changed": changed, "removed": removed}))
+            if trend != topic.trend:
+                updates.append(("trend", trend))
+        topic.kpi, topic.channels, topic.trend = kpi, channels, trend
+        if first:
+            updates.append(("snapshot", topic.snapshot()))
+        for message in updates:
+            self._broadcast(topic, message)
+
+    @staticmethod
+    def _broadcast(topic: _Topic, message: tuple[str, Any]) -> None:
+        for queue in topic.subscribers:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow consumer: deltas would be lost, so replace its backlog with a snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(("snapshot", topic.snapshot()))
@@ -0,0 +1,420 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from typing import Any, Iterable, Iterator, Optional, TypeVar, Union
+from weakref import WeakValueDictionary
+
+from app.models.pydantic_types import SlackMessage, SlackReaction
+
+
+class StringInterner:
+    """Map strings to dense integer codes so columns can store ints instead of str objects."""
+
+    __slots__ = ("_codes", "_values")
+
+    def __init__(self) -> None:
+        self._codes: dict[str, int] = {}
+        self._values: list[str] = []
+
+    def intern(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._values)
+            self._codes[value] = code
+            self._values.append(value)
+        return code
+
+    def code_of(self, value: str) -> Optional[int]:
+        return self._codes.get(value)
+
+    def lookup(self, code: int) -> str:
+        return self._values[code]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class Vocabulary:
+    """Interned user IDs and emoji names of one Slack team.
+
+    Every batch holds its team's vocabulary and the registry below only weakly, so a
+    team's vocabulary is shared by all of its live batches (codes can be merged and grouped
+    across channels and requests) and is freed once the last of them, e.g. its last cached
+    window, is gone.
+    """
+
+    __slots__ = ("users", "emojis", "emoji_display", "__weakref__")
+
+    def __init__(self) -> None:
+        self.users = StringInterner()
+        self.emojis = StringInterner()
+        # Display string per emoji code, filled lazily (see app/services/emoji.py)
+        self.emoji_display: list[str] = []
+
+
+DEFAULT_TEAM = "demo"
+_VOCABULARIES: "WeakValueDictionary[str, Vocabulary]" = WeakValueDictionary()
+
+
+def vocabulary(team_id: str = DEFAULT_TEAM) -> Vocabulary:
+    """The team's vocabulary; callers keep it alive for as long as they hold its codes."""
+    vocab = _VOCABULARIES.get(team_id)
+    if vocab is None:
+        vocab = _VOCABULARIES[team_id] = Vocabulary()
+    return vocab
+
+
+def shared_vocabulary(batches: Iterable["MessageBatch"]) -> Vocabulary:
+    """The one vocabulary of the non-empty `batches` (a team's), for grouping their codes together."""
+    vocabs = {id(b.vocab): b.vocab for b in batches if len(b)}
+    if len(vocabs) > 1:
+        raise ValueError("batches are interned in different vocabularies")
+    return next(iter(vocabs.values()), None) or vocabulary()
+
+
+T = TypeVar("T")
+# Owned `array` for built batches, zero-copy `memoryview` slices for window views
+Column = Union[array, memoryview]
+
+
+class _SeqView(Sequence[T]):
+    """Zero-copy read-only window over a list (used for text columns of views)."""
+
+    __slots__ = ("_seq", "_lo", "_hi")
+
+    def __init__(self, seq: Sequence[T], lo: int, hi: int) -> None:
+        self._seq = seq
+        self._lo = lo
+        self._hi = hi
+
+    def __len__(self) -> int:
+        return self._hi - self._lo
+
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return [self._seq[self._lo + j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._seq[self._lo + i]
+
+
+def format_ts(ts: float) -> str:
+    """Render a float timestamp back into Slack's canonical `seconds.micros` form."""
+    return f"{ts:.6f}"
+
+
+# Per-message columns: (attribute, array typecode)
+_ROW_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("ts", "d"),
+    ("user_codes", "i"),
+    ("reaction_totals", "I"),
+    ("thread_ts", "d"),
+    ("reply_counts", "I"),
+    ("latest_reply", "d"),
+)
+# Per-reaction columns, indexed through `reaction_offsets`
+_REACTION_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("reaction_codes", "i"),
+    ("reaction_counts", "I"),
+)
+
+
+def _float_or_zero(value: Any) -> float:
+    try:
+        return float(value or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class MessageBatch:
+    """Columnar, read-only view of a channel's messages, sorted by timestamp ascending.
+
+    Per-message columns:
+    - ts: float64 timestamps
+    - user_codes: interned user (or bot) IDs, see `vocab.users`
+    - reaction_totals: number of reacting users across all reactions on the message
+    - thread_ts / reply_counts / latest_reply: Slack thread fields (0 when absent)
+
+    Reactions are stored CSR-style: `reaction_offsets[i]:reaction_offsets[i + 1]` indexes
+    into `reaction_codes` (interned emoji names, see `vocab.emojis`) and `reaction_counts`,
+    shifted by `reaction_base` (non-zero only for views).
+
+    Because `ts` is sorted, any `[oldest, latest)` window is found with two binary searches
+    and returned by `slice()` as a view sharing the parent's buffers.
+
+    Text and reacting-user IDs are only kept when the batch is built `with_text=True`;
+    count-only aggregations never need them.
+    """
+
+    __slots__ = (
+        "channel_id",
+        "vocab",
+        *(name for name, _ in _ROW_COLUMNS),
+        "reaction_offsets",
+        *(name for name, _ in _REACTION_COLUMNS),
+        "texts",
+        "reaction_user_ids",
+        "reaction_base",
+    )
+
+    def __init__(
+        self,
+        channel_id: str,
+        *,
+        texts: Optional[Sequence[str]] = None,
+        reaction_user_ids: Optional[Sequence[tuple[str, ...]]] = None,
+        reaction_base: int = 0,
+        vocab: Optional[Vocabulary] = None,
+        **columns: Column,
+    ) -> None:
+        self.channel_id = channel_id
+        self.vocab = vocab or vocabulary()
+        for name, typecode in _ROW_COLUMNS + _REACTION_COLUMNS:
+            column = columns.pop(name, None)
+            setattr(self, name, column if column is not None else array(typecode))
+        offsets = columns.pop("reaction_offsets", None)
+        self.reaction_offsets = offsets if offsets is not None else array("I", [0])
+        if columns:
+            raise TypeError(f"unknown columns: {sorted(columns)}")
+        self.texts = texts
+        self.reaction_user_ids = reaction_user_ids
+        self.reaction_base = reaction_base
+
+    @classmethod
+    def empty(cls, channel_id: str, *, with_text: bool = True, vocab: Optional[Vocabulary] = None) -> "MessageBatch":
+        return cls(
+            channel_id, texts=[] if with_text else None, reaction_user_ids=[] if with_text else None, vocab=vocab
+        )
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @property
+    def has_text(self) -> bool:
+        return self.texts is not None
+
+    @classmethod
+    def from_slack_payload(
+        cls,
+        channel_id: str,
+        raw_messages: Iterable[dict[str, Any]],
+        *,
+        with_text: bool = True,
+        vocab: Optional[Vocabulary] = None,
+    ) -> "MessageBatch":
+        """Build a batch from raw `conversations.history`/`.replies` message dicts (any order),
+        interning into `vocab` (the team's, see `vocabulary()`)."""
+        rows: list[tuple[float, dict[str, Any]]] = []
+        for m in raw_messages:
+            try:
+                rows.append((float(m.get("ts") or 0.0), m))
+            except (TypeError, ValueError):
+                continue
+        rows.sort(key=lambda r: r[0])
+
+        batch = cls.empty(channel_id, with_text=with_text, vocab=vocab)
+        intern_user = batch.vocab.users.intern
+        intern_emoji = batch.vocab.emojis.intern
+        for ts, m in rows:
+            batch.ts.append(ts)
+            batch.user_codes.append(intern_user(str(m.get("user") or m.get("bot_id") or "")))
+            batch.thread_ts.append(_float_or_zero(m.get("thread_ts")))
+            batch.reply_counts.append(int(m.get("reply_count") or 0))
+            batch.latest_reply.append(_float_or_zero(m.get("latest_reply")))
+            total = 0
+            reactions_raw = m.get("reactions")
+            if isinstance(reactions_raw, list):
+                for r in reactions_raw:
+                    r = r or {}
+                    users = r.get("users") or []
+                    if not isinstance(users, list):
+                        users = []
+                    # Slack caps `users` but always reports the full `count`
+                    count = int(r.get("count") or len(users))
+                    batch.reaction_codes.append(intern_emoji(str(r.get("name", ""))))
+                    batch.reaction_counts.append(count)
+                    total += count
+                    if batch.reaction_user_ids is not None:
+                        batch.reaction_user_ids.append(tuple(str(u) for u in users))
+            batch.reaction_totals.append(total)
+            batch.reaction_offsets.append(len(batch.reaction_codes))
+            if batch.texts is not None:
+                batch.texts.append(m.get("text") or "")
+        return batch
+
+    def _reaction_range(self, i: int) -> tuple[int, int]:
+        base = self.reaction_base
+        return self.reaction_offsets[i] - base, self.reaction_offsets[i + 1] - base
+
+    # ===== Windowing =====
+
+    def bounds(self, oldest: Optional[float] = None, latest: Optional[float] = None) -> tuple[int, int]:
+        """Row range `[lo, hi)` of messages with `oldest <= ts < latest` in O(log n)."""
+        lo = bisect_left(self.ts, oldest) if oldest is not None else 0
+        hi = bisect_left(self.ts, latest, lo) if latest is not None else len(self)
+        return lo, max(lo, hi)
+
+    def slice(self, lo: int, hi: int) -> "MessageBatch":
+        """Return rows `[lo, hi)` as a view over this batch's buffers (no data copied)."""
+        base = self.reaction_base
+        r_lo, r_hi = self.reaction_offsets[lo] - base, self.reaction_offsets[hi] - base
+        columns: dict[str, Column] = {name: memoryview(getattr(self, name))[lo:hi] for name, _ in _ROW_COLUMNS}
+        columns.update(
+            {name: memoryview(getattr(self, name))[r_lo:r_hi] for name, _ in _REACTION_COLUMNS}
+        )
+        return MessageBatch(
+            self.channel_id,
+            reaction_offsets=memoryview(self.reaction_offsets)[lo : hi + 1],
+            texts=_SeqView(self.texts, lo, hi) if self.texts is not None else None,
+            reaction_user_ids=(
+                _SeqView(self.reaction_user_ids, r_lo, r_hi) if self.reaction_user_ids is not None else None
+            ),
+            reaction_base=r_lo + base,
+            vocab=self.vocab,
+            **columns,
+        )
+
+    def window(self, oldest: Optional[float] = None, latest: Optional[float] = None) -> "MessageBatch":
+        """View of messages with `oldest <= ts < latest`."""
+        return self.slice(*self.bounds(oldest, latest))
+
+    def split(self, edges: Sequence[float]) -> list["MessageBatch"]:
+        """Split into `len(edges) - 1` consecutive bucket views in O(B log n)."""
+        cuts = [bisect_left(self.ts, e) for e in edges]
+        return [self.slice(lo, max(lo, hi)) for lo, hi in zip(cuts, cuts[1:])]
+
+    @classmethod
+    def concat(cls, channel_id: str, batches: list["MessageBatch"]) -> "MessageBatch":
+        """Merge batches (e.g. pagination pages) of one team into one batch sorted by timestamp."""
+        if len(batches) == 1:
+            return batches[0]
+        with_text = bool(batches) and all(b.has_text for b in batches)
+        batches = [b for b in batches if len(b)] or batches[:1]
+        if len(batches) == 1:
+            # e.g. a cached window plus an empty refresh tail: nothing to copy
+            return batches[0]
+        vocab = batches[0].vocab
+        if any(b.vocab is not vocab for b in batches):
+            raise ValueError("cannot merge batches interned in different vocabularies")
+        ordered = sorted(batches, key=lambda b: b.ts[0] if len(b) else 0.0)
+        if all(prev.ts[-1] <= nxt.ts[0] for prev, nxt in zip(ordered, ordered[1:])):
+            return cls._append_ordered(channel_id, ordered, with_text=with_text)
+        order = sorted(
+            ((b.ts[i], bi, i) for bi, b in enumerate(batches) for i in range(len(b))),
+            key=lambda r: r[0],
+        )
+        out = cls.empty(channel_id, with_text=with_text, vocab=vocab)
+        for _, bi, i in order:
+            b = batches[bi]
+            for name, _ in _ROW_COLUMNS:
+                getattr(out, name).append(getattr(b, name)[i])
+            lo, hi = b._reaction_range(i)
+            for name, _ in _REACTION_COLUMNS:
+                getattr(out, name).extend(getattr(b, name)[lo:hi])
+            out.reaction_offsets.append(len(out.reaction_codes))
+            if with_text:
+                out.texts.append(b.texts[i])  # type: ignore[union-attr, index]
+                out.reaction_user_ids.extend(b.reaction_user_ids[lo:hi])  # type: ignore[union-attr, index]
+        return out
+
+    @classmethod
+    def _append_ordered(cls, channel_id: str, batches: list["MessageBatch"], *, with_text: bool) -> "MessageBatch":
+        # Non-overlapping batches (pagination pages, cache tails): bulk column copies, no sort
+        out = cls.empty(channel_id, with_text=with_text, vocab=batches[0].vocab)
+        for b in batches:
+            shift = len(out.reaction_codes) - b.reaction_base
+            for name, _ in _ROW_COLUMNS + _REACTION_COLUMNS:
+                getattr(out, name).extend(getattr(b, name))
+            out.reaction_offsets.extend(o + shift for o in b.reaction_offsets[1:])
+            if with_text:
+                out.texts.extend(b.texts)  # type: ignore[union-attr, arg-type]
+                out.reaction_user_ids.extend(b.reaction_user_ids)  # type: ignore[union-attr, arg-type]
+        return out
+
+    # ===== Aggregations =====
+
+    def total_reactions(self) -> int:
+        return sum(self.reaction_totals)
+
+    def user_ids(self) -> Iterator[str]:
+        lookup = self.vocab.users.lookup
+        return (lookup(c) for c in self.user_codes)
+
+    def counts_by_user(self) -> dict[int, list[int]]:
+        """Return `{user_code: [messages, reaction_total]}` in one pass over the columns."""
+        out: dict[int, list[int]] = {}
+        for code, reactions in zip(self.user_codes, self.reaction_totals):
+            entry = out.get(code)
+            if entry is None:
+                out[code] = [1, reactions]
+            else:
+                entry[0] += 1
+                entry[1] += reactions
+        return out
+
+    def reaction_histogram(self) -> dict[int, int]:
+        """Return `{emoji_code: reacting_users}` across the batch."""
+        out: dict[int, int] = {}
+        for code, count in zip(self.reaction_codes, self.reaction_counts):
+            out[code] = out.get(code, 0) + count
+        return out
+
+    def thread_root_indices(self) -> list[int]:
+        """Rows that start a thread with at least one reply."""
+        return [
+            i
+            for i, (ts, thread_ts, replies) in enumerate(zip(self.ts, self.thread_ts, self.reply_counts))
+            if replies and (thread_ts == 0.0 or thread_ts == ts)
+        ]
+
+    # ===== Boundary conversions =====
+
+    def rows(self) -> list[tuple[str, str, str, str]]:
+        """Return `(id, userId, text, ts)` tuples in ascending time order (text may be empty)."""
+        lookup = self.vocab.users.lookup
+        texts = self.texts
+        out: list[tuple[str, str, str, str]] = []
+        for i, (ts, code) in enumerate(zip(self.ts, self.user_codes)):
+            ts_str = format_ts(ts)
+            out.append((ts_str, lookup(code), texts[i] if texts is not None else "", ts_str))
+        return out
+
+    def to_messages(self, rows: Optional[Iterable[int]] = None) -> list[SlackMessage]:
+        """Materialize Pydantic messages, newest first like `conversations.history`.
+
+        `rows` limits (and orders) the output to those row indices, e.g. one page.
+        """
+        user_lookup = self.vocab.users.lookup
+        emoji_lookup = self.vocab.emojis.lookup
+        texts = self.texts
+        reaction_users = self.reaction_user_ids
+        out: list[SlackMessage] = []
+        for i in rows if rows is not None else range(len(self) - 1, -1, -1):
+            ts_str = format_ts(self.ts[i])
+            lo, hi = self._reaction_range(i)
+            reactions = [
+                SlackReaction(
+                    name=emoji_lookup(self.reaction_codes[j]),
+                    userIds=list(reaction_users[j]) if reaction_users is not None else [],
+                )
+                for j in range(lo, hi)
+            ]
+            out.append(
+                SlackMessage(
+                    id=ts_str,
+                    userId=user_lookup(self.user_codes[i]),
+                    text=texts[i] if texts is not None else "",
+                    ts=ts_str,
+                    reactions=reactions or None,
+                )
+            )
+        return out
+
+    def nbytes(self) -> int:
+        """Approximate size of the numeric buffers (excludes optional text)."""
+        columns = [getattr(self, name) for name, _ in _ROW_COLUMNS + _REACTION_COLUMNS]
+        return sum(col.itemsize * len(col) for col in columns + [self.reaction_offsets])
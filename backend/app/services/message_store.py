@@ -0,0 +1,355 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from bisect import bisect_left
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core import telemetry
+from app.core.admission import request_mode
+from app.core.config import get_settings
+from app.services import persistence
+from app.services.emoji import display_for_code
+from app.services.message_batch import MessageBatch, format_ts
+from app.services.slack_service import SlackService
+
+
+# Per-process cache of channel history windows keyed by (team_id, channel_id).
+# Each window is one sorted MessageBatch; any sub-range is served as a zero-copy view.
+# Reaction histograms per UTC day are maintained as messages are ingested.
+
+_DAY = 24 * 60 * 60
+_PAGE_LIMIT = 200
+
+
+@dataclass
+class _ChannelWindow:
+    batch: MessageBatch
+    oldest: float  # history is complete from here; later than `requested` when the page cap was hit
+    requested: float  # start asked of Slack; the window serves requests back to here without refetching
+    latest: float  # wall-clock time of the most recent fetch; history is complete up to here
+    fetched_at: float
+    full_fetched_at: float
+    # {utc_day_index: {emoji: reacting_users}}
+    reactions_by_day: dict[int, dict[str, int]]
+
+
+@dataclass
+class _ThreadReplies:
+    latest_reply: float
+    replies: MessageBatch
+
+
+_WINDOWS: "OrderedDict[tuple[str, str], _ChannelWindow]" = OrderedDict()
+# Bumped whenever a channel ingests messages (full load or non-empty tail); lets live views
+# skip recomputation when nothing changed
+_REVISIONS: dict[tuple[str, str], int] = {}
+_LOCKS: dict[tuple[str, str], asyncio.Lock] = {}
+# Replies per (team_id, channel_id, thread_ts); refreshed only when the root's latest_reply moves
+_THREADS: "OrderedDict[tuple[str, str, float], _ThreadReplies]" = OrderedDict()
+_MAX_THREADS = 50_000
+
+
+def clear() -> None:
+    _WINDOWS.clear()
+    _REVISIONS.clear()
+    _LOCKS.clear()
+    _THREADS.clear()
+
+
+def invalidate(team_id: str, channel_id: str) -> None:
+    _WINDOWS.pop((team_id, channel_id), None)
+
+
+def _reactions_by_day(batch: MessageBatch, into: Optional[dict[int, dict[str, int]]] = None) -> dict[int, dict[str, int]]:
+    out = into if into is not None else {}
+    offsets, base = batch.reaction_offsets, batch.reaction_base
+    for i, ts in enumerate(batch.ts):
+        lo, hi = offsets[i] - base, offsets[i + 1] - base
+        if lo == hi:
+            continue
+        day = out.setdefault(int(ts // _DAY), {})
+        for j in range(lo, hi):
+            emoji = display_for_code(batch.vocab, batch.reaction_codes[j])
+            day[emoji] = day.get(emoji, 0) + batch.reaction_counts[j]
+    return out
+
+
+def revision(team_id: str, channel_id: str) -> int:
+    return _REVISIONS.get((team_id, channel_id), 0)
+
+
+def _persist(team_id: str, batch: MessageBatch) -> None:
+    # Newly ingested messages are upserted in the background; demo data is never stored
+    if team_id != "demo" and len(batch):
+        persistence.schedule(persistence.persist_batch, team_id, batch)
+
+
+def _capped(batch: MessageBatch, max_pages: int) -> bool:
+    # Full pages up to the cap: Slack may hold older messages that were not fetched
+    return len(batch) >= _PAGE_LIMIT * max(1, max_pages)
+
+
+def _evict(key: tuple[str, str]) -> None:
+    del _WINDOWS[key]
+    _LOCKS.pop(key, None)
+
+
+def _store(key: tuple[str, str], window: _ChannelWindow) -> None:
+    settings = get_settings()
+    _WINDOWS[key] = window
+    _WINDOWS.move_to_end(key)
+    # Per-team cap first (evicting that team's least recently used), then the global LRU
+    team_keys = [k for k in _WINDOWS if k[0] == key[0]]
+    for evicted in team_keys[: max(0, len(team_keys) - settings.message_cache_max_windows_per_team)]:
+        _evict(evicted)
+    while len(_WINDOWS) > settings.message_cache_max_windows:
+        _evict(next(iter(_WINDOWS)))
+
+
+async def get_channel_window(
+    slack: SlackService,
+    channel_id: str,
+    *,
+    oldest: float,
+    latest: Optional[float] = None,
+) -> MessageBatch:
+    """Return messages with `oldest <= ts < latest` for a channel, served from the cache when possible.
+
+    A miss fetches the whole `[oldest, now]` range once (paginated); a stale hit fetches
+    only messages newer than the previous fetch and appends them. When a fetch hits
+    `slack_history_max_pages`, only the newest messages are kept and the window starts at
+    the oldest of them.
+
+    Tail refreshes only see new messages, so `reply_count`/`latest_reply` of roots already
+    in the window stay as of the last full fetch: thread metadata is at most
+    `message_cache_max_age_seconds` stale.
+    """
+    window = await _load_window(slack, channel_id, oldest=oldest, latest=latest)
+    return window.batch.window(oldest, latest)
+
+
+async def find_messages(
+    slack: SlackService,
+    channel_id: str,
+    *,
+    oldest: float,
+    latest: Optional[float] = None,
+    before: Optional[float] = None,
+    user_id: Optional[str] = None,
+    has_reactions: Optional[bool] = None,
+    limit: int = 200,
+) -> tuple[MessageBatch, list[int], Optional[float]]:
+    """One newest-first page of a channel's cached messages matching the filters.
+
+    Returns the window, the page's row indices in it, and the timestamp to pass as
+    `before` for the next page (None on the last page).
+    """
+    window = await get_channel_window(slack, channel_id, oldest=oldest, latest=latest)
+    code = window.vocab.users.code_of(user_id) if user_id else None
+    if user_id and code is None:
+        return window, [], None
+    rows: list[int] = []
+    i = (bisect_left(window.ts, before) if before is not None else len(window)) - 1
+    while i >= 0 and len(rows) <= limit:
+        if (code is None or window.user_codes[i] == code) and (
+            has_reactions is None or (window.reaction_totals[i] > 0) == has_reactions
+        ):
+            rows.append(i)
+        i -= 1
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return window, rows, window.ts[rows[-1]]
+    return window, rows, None
+
+
+async def get_reaction_counts(slack: SlackService, channel_id: str, *, oldest: float) -> dict[str, int]:
+    """`{emoji: reacting_users}` for messages since `oldest`, at UTC-day resolution.
+
+    Merges the per-day histograms built at ingest instead of scanning messages.
+    """
+    return _reaction_counts(await _load_window(slack, channel_id, oldest=oldest), oldest)
+
+
+def _reaction_counts(window: _ChannelWindow, oldest: float) -> dict[str, int]:
+    first_day = int(oldest // _DAY)
+    out: dict[str, int] = {}
+    for day, histogram in window.reactions_by_day.items():
+        if day < first_day:
+            continue
+        for emoji, n in histogram.items():
+            out[emoji] = out.get(emoji, 0) + n
+    return out
+
+
+# ===== Cache-only reads =====
+# Whatever is cached right now, however stale, without calling Slack. Used as the fallback
+# when a request's deadline runs out (see app/core/deadline.py).
+
+
+def peek_channel_window(slack: SlackService, channel_id: str, *, oldest: float, latest: Optional[float] = None) -> MessageBatch:
+    cached = _WINDOWS.get((slack.active_team_key(), channel_id))
+    if cached is None:
+        return MessageBatch.empty(channel_id)
+    return cached.batch.window(oldest, latest)
+
+
+def peek_reaction_counts(slack: SlackService, channel_id: str, *, oldest: float) -> dict[str, int]:
+    cached = _WINDOWS.get((slack.active_team_key(), channel_id))
+    return _reaction_counts(cached, oldest) if cached is not None else {}
+
+
+def peek_thread_replies(slack: SlackService, batch: MessageBatch) -> dict[float, MessageBatch]:
+    team_id = slack.active_team_key()
+    out: dict[float, MessageBatch] = {}
+    for i in batch.thread_root_indices():
+        cached = _THREADS.get((team_id, batch.channel_id, batch.ts[i]))
+        if cached is not None:
+            out[batch.ts[i]] = cached.replies
+    return out
+
+
+async def _load_window(
+    slack: SlackService,
+    channel_id: str,
+    *,
+    oldest: float,
+    latest: Optional[float] = None,
+) -> _ChannelWindow:
+    settings = get_settings()
+    key = (slack.active_team_key(), channel_id)
+    lock = _LOCKS.setdefault(key, asyncio.Lock())
+    async with lock:
+        now = time.time()
+        cached = _WINDOWS.get(key)
+        if cached is not None and cached.requested <= oldest:
+            covered = latest is not None and latest <= cached.latest
+            if covered or now - cached.fetched_at <= settings.message_cache_ttl_seconds or request_mode() != "normal":
+                # Under load (see app/core/admission.py) a stale window is served as is
+                _WINDOWS.move_to_end(key)
+                telemetry.CACHE_REQUESTS.inc("messages", "hit")
+                return cached
+            if now - cached.full_fetched_at <= settings.message_cache_max_age_seconds:
+                tail = await slack.get_channel_batch(
+                    channel_id=channel_id,
+                    oldest=str(cached.latest),
+                    limit=_PAGE_LIMIT,
+                    max_pages=settings.slack_history_max_pages,
+                )
+                logging.getLogger(__name__).debug(
+                    "store: channel=%s appended %d new messages", channel_id, len(tail)
+                )
+                telemetry.CACHE_REQUESTS.inc("messages", "refresh")
+                if _capped(tail, settings.slack_history_max_pages):
+                    # Messages between the previous fetch and the oldest one in the tail are
+                    # missing, so the tail replaces the window instead of leaving a gap in it
+                    logging.getLogger(__name__).warning(
+                        "store: channel=%s tail hit the page cap; window restarts at %s", channel_id, tail.ts[0]
+                    )
+                    window = _ChannelWindow(
+                        batch=tail,
+                        oldest=tail.ts[0],
+                        requested=cached.requested,
+                        latest=now,
+                        fetched_at=now,
+                        full_fetched_at=now,
+                        reactions_by_day=_reactions_by_day(tail),
+                    )
+                else:
+                    window = _ChannelWindow(
+                        batch=MessageBatch.concat(channel_id, [cached.batch, tail]) if len(tail) else cached.batch,
+                        oldest=cached.oldest,
+                        requested=cached.requested,
+                        latest=now,
+                        fetched_at=now,
+                        full_fetched_at=cached.full_fetched_at,
+                        reactions_by_day=_reactions_by_day(tail, into=cached.reactions_by_day),
+                    )
+                _store(key, window)
+                if len(tail):
+                    _REVISIONS[key] = _REVISIONS.get(key, 0) + 1
+                _persist(key[0], tail)
+                return window
+
+        # Miss (or too old / not reaching back far enough): fetch the whole range once
+        start = min(oldest, cached.requested) if cached is not None else oldest
+        batch = await slack.get_channel_batch(
+            channel_id=channel_id,
+            oldest=str(int(start)),
+            limit=_PAGE_LIMIT,
+            max_pages=settings.slack_history_max_pages,
+        )
+        logging.getLogger(__name__).debug("store: channel=%s loaded %d messages", channel_id, len(batch))
+        telemetry.CACHE_REQUESTS.inc("messages", "miss")
+        complete_from = start
+        if _capped(batch, settings.slack_history_max_pages):
+            complete_from = batch.ts[0]
+            logging.getLogger(__name__).warning(
+                "store: channel=%s history hit the page cap; window starts at %s, not %s", channel_id, complete_from, start
+            )
+        window = _ChannelWindow(
+            batch=batch,
+            oldest=complete_from,
+            requested=start,
+            latest=now,
+            fetched_at=now,
+            full_fetched_at=now,
+            reactions_by_day=_reactions_by_day(batch),
+        )
+        _store(key, window)
+        _REVISIONS[key] = _REVISIONS.get(key, 0) + 1
+        _persist(key[0], batch)
+        return window
+
+
+async def get_thread_replies(slack: SlackService, batch: MessageBatch) -> dict[float, MessageBatch]:
+    """Replies for every thread root in `batch`, keyed by root ts.
+
+    Threads whose `latest_reply` has not moved since the last fetch are served from the
+    cache; the rest are fetched concurrently, bounded by `slack_replies_concurrency`.
+    `latest_reply` comes from the channel window, so new replies on a root are noticed
+    once the window is fully refetched (see `get_channel_window`).
+    """
+    team_id = slack.active_team_key()
+    out: dict[float, MessageBatch] = {}
+    stale: list[tuple[float, float]] = []
+    for i in batch.thread_root_indices():
+        root_ts, latest_reply = batch.ts[i], batch.latest_reply[i]
+        cached = _THREADS.get((team_id, batch.channel_id, root_ts))
+        if cached is not None and cached.latest_reply >= latest_reply:
+            out[root_ts] = cached.replies
+        else:
+            stale.append((root_ts, latest_reply))
+    if out:
+        telemetry.CACHE_REQUESTS.inc("threads", "hit", amount=len(out))
+    if stale:
+        telemetry.CACHE_REQUESTS.inc("threads", "miss", amount=len(stale))
+    if not stale:
+        return out
+
+    semaphore = asyncio.Semaphore(max(1, get_settings().slack_replies_concurrency))
+
+    async def fetch(root_ts: float, latest_reply: float) -> None:
+        async with semaphore:
+            try:
+                replies = await slack.get_thread_replies(batch.channel_id, format_ts(root_ts))
+            except Exception as exc:  # pragma: no cover
+                logging.getLogger(__name__).warning(
+                    "store: replies fetch failed channel=%s thread=%s: %s", batch.channel_id, root_ts, exc
+                )
+                return
+        key = (team_id, batch.channel_id, root_ts)
+        _THREADS[key] = _ThreadReplies(latest_reply=latest_reply, replies=replies)
+        _THREADS.move_to_end(key)
+        out[root_ts] = replies
+
+    await asyncio.gather(*(fetch(root_ts, latest) for root_ts, latest in stale))
+    while len(_THREADS) > _MAX_THREADS:
+        _THREADS.popitem(last=False)
+    logging.getLogger(__name__).debug(
+        "store: channel=%s threads cached=%d refreshed=%d", batch.channel_id, len(out) - len(stale), len(stale)
+    )
+    return out
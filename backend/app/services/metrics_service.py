@@ -1,26 +1,32 @@
 from __future__ import annotations
 
+import asyncio
 from collections import defaultdict
+import heapq
+from operator import itemgetter
 import time
 from typing import Iterable, Optional
 
+from app.core import deadline
 from app.models.pydantic_types import (
     EmojiStat,
     EntityTotalMetric,
     Perspective,
-    SlackMessage,
     TimeRange,
 )
+from app.services import message_store, team_directory, user_store
+from app.services.message_batch import MessageBatch, shared_vocabulary
 from app.services.slack_service import SlackService
+from app.services.thread_metrics import ThreadStats, thread_stats_by_user
 from app.services.anthropic_service import AnthropicService
 
 
 class MetricsService:
     """Compute basic metrics from Slack data without heavy processing."""
 
-    def __init__(self) -> None:
-        self.slack = SlackService()
-        self.anthropic = AnthropicService()
+    def __init__(self, slack: Optional[SlackService] = None, anthropic: Optional[AnthropicService] = None) -> None:
+        self.slack = slack or SlackService()
+        self.anthropic = anthropic or AnthropicService()
 
     async def _get_channel_ids(self, requested: Optional[list[str]] = None) -> list[str]:
         if requested:
@@ -47,32 +53,64 @@ class MetricsService:
         oldest = now - days * 24 * 60 * 60
         return str(oldest)
 
-    async def _fetch_messages_for_channels(self, channel_ids: Iterable[str], *, oldest: Optional[str] = None) -> dict[str, list[SlackMessage]]:
-        # For MVP we fetch recent history once per channel
-        results: dict[str, list[SlackMessage]] = {}
+    async def _fetch_messages_for_channels(
+        self, channel_ids: Iterable[str], *, oldest: Optional[str] = None, partial: Optional[set[str]] = None
+    ) -> dict[str, MessageBatch]:
+        # Served from the shared channel window cache; repeated queries reuse one fetch.
+        # Past the request deadline, channels come from whatever is cached (added to `partial`).
+        results: dict[str, MessageBatch] = {}
         for cid in channel_ids:
             try:
-                resp = await self.slack.get_channel_messages(channel_id=cid, oldest=oldest, limit=200)
+                batch, late = await deadline.bounded(
+                    message_store.get_channel_window(self.slack, cid, oldest=float(oldest or 0)),
+                    lambda: message_store.peek_channel_window(self.slack, cid, oldest=float(oldest or 0)),
+                    shield=True,
+                )
+                if late and partial is not None:
+                    partial.add(cid)
                 # Basic debug info: how many messages we fetched per channel
                 __import__("logging").getLogger(__name__).debug(
                     "metrics: fetched %d messages for channel %s (oldest=%s)",
-                    len(resp.messages),
+                    len(batch),
                     cid,
                     oldest,
                 )
-                results[cid] = resp.messages
+                results[cid] = batch
             except Exception as exc:
                 __import__("logging").getLogger(__name__).warning(
                     "metrics: error fetching messages for channel %s: %s", cid, exc
                 )
-                results[cid] = []
+                results[cid] = MessageBatch.empty(cid, with_text=False)
         return results
 
+    async def _thread_stats_by_channel(
+        self, by_channel: dict[str, MessageBatch], partial: Optional[set[str]] = None
+    ) -> dict[str, dict[int, ThreadStats]]:
+        """Per-channel, per-user thread stats from cached `conversations.replies` data."""
+        channel_ids = list(by_channel)
+        replies = await asyncio.gather(
+            *(
+                deadline.bounded(
+                    message_store.get_thread_replies(self.slack, by_channel[cid]),
+                    lambda cid=cid: message_store.peek_thread_replies(self.slack, by_channel[cid]),
+                    shield=True,
+                )
+                for cid in channel_ids
+            )
+        )
+        if partial is not None:
+            partial.update(cid for cid, (_, late) in zip(channel_ids, replies) if late)
+        return {
+            cid: thread_stats_by_user(by_channel[cid], replies_by_thread)
+            for cid, (replies_by_thread, _) in zip(channel_ids, replies)
+        }
+
     @staticmethod
-    def _count_threads(messages: list[SlackMessage]) -> int:
-        # Minimal heuristic: treat messages that look like thread roots (have replies?) as threads
-        # Slack conversations.history does not include reply_count unless requested; keep basic for now
-        return max(0, len(messages) // 5)
+    def _apply_thread_stats(entry: EntityTotalMetric, stats: ThreadStats) -> None:
+        entry.threads = stats.threads
+        entry.responses = stats.replies
+        entry.uniqueRepliers = stats.unique_repliers
+        entry.avgFirstResponseMinutes = stats.avg_first_response_minutes
 
     async def compute_entity_totals(
         self,
@@ -81,10 +119,11 @@ class MetricsService:
         perspective: Perspective,
         channel_ids: Optional[list[str]] = None,
     ) -> list[EntityTotalMetric]:
-        # Range currently not used for filtering; could map to oldest ts later
         channels = await self._get_channel_ids(channel_ids)
         oldest = self._oldest_ts_for_range(time_range)
-        by_channel = await self._fetch_messages_for_channels(channels, oldest=oldest)
+        partial: set[str] = set()
+        by_channel = await self._fetch_messages_for_channels(channels, oldest=oldest, partial=partial)
+        threads_by_channel = await self._thread_stats_by_channel(by_channel, partial)
 
         if perspective == "channel":
             items: list[EntityTotalMetric] = []
@@ -92,72 +131,90 @@ class MetricsService:
             channel_name_map = {c.id: c.name for c in (await self.slack.list_channels())}
             for cid, msgs in by_channel.items():
                 name = channel_name_map.get(cid, cid)
-                messages = len(msgs)
-                threads = self._count_threads(msgs)
-                responses = max(0, int(messages * 0.6))  # heuristic
-                emojis = sum(len(r.userIds) for m in msgs for r in (m.reactions or []))
-                items.append(
-                    EntityTotalMetric(
-                        id=cid,
-                        name=f"#{name}",
-                        messages=messages,
-                        threads=threads,
-                        responses=responses,
-                        emojis=emojis,
-                    )
+                stats = ThreadStats()
+                for user_stats in threads_by_channel[cid].values():
+                    stats.merge(user_stats)
+                entry = EntityTotalMetric(
+                    id=cid,
+                    name=f"#{name}",
+                    messages=len(msgs),
+                    threads=0,
+                    responses=0,
+                    emojis=msgs.total_reactions(),
+                    partial=cid in partial,
                 )
+                self._apply_thread_stats(entry, stats)
+                items.append(entry)
             return items
 
+        # Per-user thread stats across all channels
+        user_threads: dict[int, ThreadStats] = defaultdict(ThreadStats)
+        for per_user in threads_by_channel.values():
+            for code, user_stats in per_user.items():
+                user_threads[code].merge(user_stats)
+
         if perspective == "employee":
             per_user_counts: dict[str, EntityTotalMetric] = {}
+            users = shared_vocabulary(by_channel.values()).users
             # user display names map
-            user_name_map = {u.id: (u.displayName or u.username or u.id) for u in (await self.slack.list_users())}
-            for _, msgs in by_channel.items():
-                for m in msgs:
-                    uid = m.userId or "unknown"
-                    if uid not in per_user_counts:
-                        per_user_counts[uid] = EntityTotalMetric(
-                            id=uid,
-                            name=user_name_map.get(uid, uid),
-                            messages=0,
-                            threads=0,
-                            responses=0,
-                            emojis=0,
-                        )
-                    entry = per_user_counts[uid]
-                    entry.messages += 1
-                    entry.responses += 1  # simplistic: treat each message as a response opportunity
-                    entry.emojis += sum(len(r.userIds) for r in (m.reactions or []))
-            # approximate threads per user
-            for entry in per_user_counts.values():
-                entry.threads = max(0, int(entry.messages * 0.2))
-            return list(per_user_counts.values())
-
-        # perspective == "team"
-        # Without org mapping, group by first letter of username as pseudo-team
-        team_map: dict[str, EntityTotalMetric] = {}
-        user_map = {u.id: (u.displayName or u.username or u.id) for u in (await self.slack.list_users())}
-        pseudo_team_of: dict[str, str] = {uid: (name[:1].upper() if name else "X") for uid, name in user_map.items()}
-
-        for _, msgs in by_channel.items():
-            for m in msgs:
-                team = pseudo_team_of.get(m.userId, "X")
-                if team not in team_map:
-                    team_map[team] = EntityTotalMetric(
-                        id=f"team-{team}",
-                        name=f"Team {team}",
+            user_name_map = {u.id: (u.displayName or u.username or u.id) for u in (await user_store.get_users(self.slack))}
+
+            def user_entry(code: int) -> EntityTotalMetric:
+                uid = users.lookup(code) or "unknown"
+                if uid not in per_user_counts:
+                    per_user_counts[uid] = EntityTotalMetric(
+                        id=uid,
+                        name=user_name_map.get(uid, uid),
                         messages=0,
                         threads=0,
                         responses=0,
                         emojis=0,
+                        partial=bool(partial),
                     )
-                entry = team_map[team]
-                entry.messages += 1
-                entry.responses += 1
-                entry.emojis += sum(len(r.userIds) for r in (m.reactions or []))
-        for entry in team_map.values():
-            entry.threads = max(0, int(entry.messages * 0.2))
-        return list(team_map.values())
+                return per_user_counts[uid]
+
+            for _, msgs in by_channel.items():
+                for code, (count, reactions) in msgs.counts_by_user().items():
+                    entry = user_entry(code)
+                    entry.messages += count
+                    entry.emojis += reactions
+            for code, stats in user_threads.items():
+                self._apply_thread_stats(user_entry(code), stats)
+            return list(per_user_counts.values())
+
+        # perspective == "team": dense team IDs from the cached directory, one group-by per channel
+        directory = await team_directory.get_directory(self.slack)
+        size = len(directory.team_ids) + 1
+        team_messages = [0] * size
+        team_emojis = [0] * size
+        for _, msgs in by_channel.items():
+            messages, emojis = directory.team_totals(msgs)
+            for idx in range(size):
+                team_messages[idx] += messages[idx]
+                team_emojis[idx] += emojis[idx]
+        team_threads: dict[int, ThreadStats] = defaultdict(ThreadStats)
+        vocab = shared_vocabulary(by_channel.values())
+        for code, stats in user_threads.items():
+            team_threads[directory.team_of(code, vocab)].merge(stats)
+
+        team_ids = directory.team_ids + ["team-unassigned"]
+        team_names = directory.team_names + [team_directory.UNASSIGNED]
+        items = []
+        for idx in range(size):
+            if not team_messages[idx] and idx not in team_threads:
+                continue
+            entry = EntityTotalMetric(
+                id=team_ids[idx],
+                name=team_names[idx],
+                messages=team_messages[idx],
+                threads=0,
+                responses=0,
+                emojis=team_emojis[idx],
+                partial=bool(partial),
+            )
+            self._apply_thread_stats(entry, team_threads.get(idx, ThreadStats()))
+            items.append(entry)
+        return items
 
     async def compute_top_emojis(
         self,
@@ -168,44 +225,25 @@ class MetricsService:
     ) -> list[EmojiStat]:
         channels = await self._get_channel_ids(channel_ids)
         oldest = self._oldest_ts_for_range(time_range)
-        by_channel = await self._fetch_messages_for_channels(channels, oldest=oldest)
+        # Merge per-(channel, day) histograms maintained at ingest; raw messages are not scanned
         counts: dict[str, int] = defaultdict(int)
-        for _, msgs in by_channel.items():
-            for m in msgs:
-                for r in (m.reactions or []):
-                    counts[r.name] += len(r.userIds)
-        # Map Slack alias names to unicode where possible
-        alias_map: dict[str, str] = {
-            "tada": "🎉",
-            "rocket": "🚀",
-            "raised_hands": "🙌",
-            "thumbsup": "👍",
-            "+1": "👍",
-            "white_check_mark": "✅",
-            "heavy_check_mark": "✔️",
-            "smile": "😄",
-            "simple_smile": "🙂",
-            "grinning": "😀",
-            "joy": "😂",
-            "laughing": "😆",
-            "sweat_smile": "😅",
-            "heart": "❤️",
-            "fire": "🔥",
-            "pray": "🙏",
-            "clap": "👏",
-            "eyes": "👀",
-            "bulb": "💡",
-            "handshake": "🤝",
-            "brain": "🧠",
-            "sparkles": "✨",
-            "star": "⭐",
-            "confetti_ball": "🎊",
-            "100": "💯",
-        }
-        def to_unicode(name: str) -> str:
-            return alias_map.get(name, name)
-
-        top = sorted((EmojiStat(emoji=to_unicode(k), count=v) for k, v in counts.items()), key=lambda e: e.count, reverse=True)
-        return top[:limit]
+        partial = False
+        for cid in channels:
+            try:
+                histogram, late = await deadline.bounded(
+                    message_store.get_reaction_counts(self.slack, cid, oldest=float(oldest or 0)),
+                    lambda: message_store.peek_reaction_counts(self.slack, cid, oldest=float(oldest or 0)),
+                    shield=True,
+                )
+                partial = partial or late
+            except Exception as exc:
+                __import__("logging").getLogger(__name__).warning(
+                    "metrics: error loading reactions for channel %s: %s", cid, exc
+                )
+                continue
+            for emoji, n in histogram.items():
+                counts[emoji] += n
+        top = heapq.nlargest(limit, counts.items(), key=itemgetter(1))
+        return [EmojiStat(emoji=emoji, count=n, partial=partial) for emoji, n in top]
 
 
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from app.core.db import get_db
+from app.models.pydantic_types import LLMMessageAnalysisItem, SlackChannel
+from app.services.anthropic_service import HEURISTIC_MODEL
+from app.services.message_batch import MessageBatch, format_ts
+
+
+# Durable copies of installations, channel selections, ingested messages, scores and daily
+# rollups in Postgres (schema: db/prisma/schema.prisma). Every function is a no-op when no
+# database is connected, so the in-memory paths keep working without DATABASE_URL.
+# Writes happen off the request path via `schedule()`.
+
+_DAY = 24 * 60 * 60
+# Rows per multi-row INSERT; 1000 x 11 params stays well under Postgres' 65535 bind limit
+_CHUNK_ROWS = 1000
+
+_PENDING: set[asyncio.Task] = set()
+
+
+def schedule(fn: Callable[..., Awaitable[Any]], *args: Any) -> None:
+    """Run a persistence write in the background (fire-and-forget, errors are logged)."""
+    if get_db() is None:
+        return
+
+    async def run() -> None:
+        try:
+            await fn(*args)
+        except Exception as exc:
+            logging.getLogger(__name__).error("db: %s failed: %s", getattr(fn, "__name__", fn), exc)
+
+    task = asyncio.get_running_loop().create_task(run())
+    _PENDING.add(task)
+    task.add_done_callback(_PENDING.discard)
+
+
+async def drain() -> None:
+    """Wait for scheduled writes to finish (called on shutdown before disconnecting)."""
+    if _PENDING:
+        await asyncio.gather(*list(_PENDING), return_exceptions=True)
+
+
+def _chunks(rows: list, size: int = _CHUNK_ROWS) -> Iterable[list]:
+    for i in range(0, len(rows), size):
+        yield rows[i : i + size]
+
+
+# ===== Installations / channels =====
+
+async def save_installation(team_id: str, team_name: str, access_token: str, bot_user_id: Optional[str]) -> None:
+    db = get_db()
+    if db is None:
+        return
+    data = {"teamName": team_name, "accessToken": access_token, "botUserId": bot_user_id}
+    await db.installation.upsert(
+        where={"teamId": team_id},
+        data={"create": {"teamId": team_id, **data}, "update": data},
+    )
+
+
+async def load_installations() -> list[Any]:
+    """All stored installations, most recently updated last."""
+    db = get_db()
+    if db is None:
+        return []
+    return await db.installation.find_many(order={"updatedAt": "asc"})
+
+
+async def save_channel_selection(team_id: str, channels: list[SlackChannel], selected_ids: list[str]) -> None:
+    db = get_db()
+    if db is None:
+        return
+    selected = set(selected_ids)
+    async with db.batch_() as batch:
+        batch.channel.update_many(where={"teamId": team_id}, data={"selected": False})
+        for ch in channels:
+            data = {"name": ch.name, "isPrivate": ch.isPrivate, "selected": ch.id in selected}
+            batch.channel.upsert(
+                where={"teamId_id": {"teamId": team_id, "id": ch.id}},
+                data={"create": {"teamId": team_id, "id": ch.id, **data}, "update": data},
+            )
+
+
+async def load_channel_selection(team_id: str) -> Optional[list[str]]:
+    """Ids of the team's selected channels, or None when no database is connected."""
+    db = get_db()
+    if db is None:
+        return None
+    return [row.id for row in await db.channel.find_many(where={"teamId": team_id, "selected": True})]
+
+
+# ===== Messages =====
+
+def _message_rows(team_id: str, batch: MessageBatch) -> list[tuple]:
+    user_lookup = batch.vocab.users.lookup
+    emoji_lookup = batch.vocab.emojis.lookup
+    texts = batch.texts
+    out: list[tuple] = []
+    for i, ts in enumerate(batch.ts):
+        lo, hi = batch._reaction_range(i)
+        reactions = [
+            {"name": emoji_lookup(batch.reaction_codes[j]), "count": batch.reaction_counts[j]} for j in range(lo, hi)
+        ]
+        thread_ts, latest_reply = batch.thread_ts[i], batch.latest_reply[i]
+        out.append(
+            (
+                team_id,
+                batch.channel_id,
+                format_ts(ts),
+                ts,
+                user_lookup(batch.user_codes[i]),
+                texts[i] if texts is not None else "",
+                format_ts(thread_ts) if thread_ts else None,
+                batch.reply_counts[i],
+                format_ts(latest_reply) if latest_reply else None,
+                batch.reaction_totals[i],
+                reactions,
+            )
+        )
+    return out
+
+
+_MESSAGE_UPSERT = (
+    'INSERT INTO "Message" ("teamId", "channelId", "ts", "tsEpoch", "userId", "text", "threadTs", '
+    '"replyCount", "latestReply", "reactionTotal", "reactions") VALUES {values} '
+    'ON CONFLICT ("teamId", "channelId", "ts") DO UPDATE SET '
+    '"threadTs" = EXCLUDED."threadTs", "replyCount" = EXCLUDED."replyCount", '
+    '"latestReply" = EXCLUDED."latestReply", "reactionTotal" = EXCLUDED."reactionTotal", '
+    '"reactions" = EXCLUDED."reactions", '
+    # Count-only batches carry no text; never blank out text stored by an earlier fetch
+    '"text" = CASE WHEN EXCLUDED."text" <> \'\' THEN EXCLUDED."text" ELSE "Message"."text" END'
+)
+
+
+async def persist_batch(team_id: str, batch: MessageBatch) -> None:
+    """Bulk-upsert a batch's messages and refresh the channel's daily rollups."""
+    db = get_db()
+    if db is None or not len(batch):
+        return
+    rows = _message_rows(team_id, batch)
+    width = len(rows[0])
+    for chunk in _chunks(rows):
+        values = ", ".join(
+            "(" + ", ".join(f"${r * width + c + 1}" + ("::jsonb" if c == width - 1 else "") for c in range(width)) + ")"
+            for r in range(len(chunk))
+        )
+        params = [v for row in chunk for v in row[:-1] + (json.dumps(row[-1]),)]
+        await db.execute_raw(_MESSAGE_UPSERT.format(values=values), *params)
+    await save_rollups(team_id, batch)
+    logging.getLogger(__name__).debug("db: team=%s channel=%s upserted %d messages", team_id, batch.channel_id, len(rows))
+
+
+# ===== Scores =====
+
+async def save_scores(team_id: str, channel_id: str, items: list[LLMMessageAnalysisItem], model: str) -> None:
+    db = get_db()
+    if db is None or not items:
+        return
+    if model == HEURISTIC_MODEL:
+        # Fallback scores only fill gaps; they never replace a score the LLM produced
+        await db.messagescore.create_many(
+            data=[
+                {"teamId": team_id, "channelId": channel_id, "ts": item.messageId, "sentiment": item.sentiment,
+                 "burnoutRisk": item.burnoutRisk, "model": model}
+                for item in items
+            ],
+            skip_duplicates=True,
+        )
+        return
+    async with db.batch_() as tx:
+        for item in items:
+            data = {"sentiment": item.sentiment, "burnoutRisk": item.burnoutRisk, "model": model}
+            key = {"teamId": team_id, "channelId": channel_id, "ts": item.messageId}
+            tx.messagescore.upsert(
+                where={"teamId_channelId_ts": key},
+                data={"create": {**key, **data}, "update": data},
+            )
+
+
+# ===== Rollups =====
+
+def _rollup(rows: Iterable[tuple[float, int, float, int]]) -> dict[int, tuple[int, int, int, int]]:
+    out: dict[int, list[int]] = {}
+    for ts, replies, thread_ts, reactions in rows:
+        day = out.setdefault(int(ts // _DAY), [0, 0, 0, 0])
+        day[0] += 1
+        day[3] += reactions
+        if replies and (thread_ts == 0.0 or thread_ts == ts):
+            day[1] += 1
+            day[2] += replies
+    return {day: (m, t, r, e) for day, (m, t, r, e) in out.items()}
+
+
+def daily_rollups(batch: MessageBatch) -> dict[int, tuple[int, int, int, int]]:
+    """`{utc_day_index: (messages, threads, replies, reactions)}` for a batch.
+
+    `threads` counts thread roots with replies; `replies` sums their `reply_count`.
+    """
+    return _rollup(zip(batch.ts, batch.reply_counts, batch.thread_ts, batch.reaction_totals))
+
+
+async def save_rollups(team_id: str, batch: MessageBatch) -> None:
+    """Recompute rollups for the days `batch` touches from the stored messages."""
+    db = get_db()
+    if db is None or not len(batch):
+        return
+    first_day, last_day = int(batch.ts[0] // _DAY), int(batch.ts[-1] // _DAY)
+    # Aggregate in the database so partial (tail) batches don't clobber full-day totals
+    await db.execute_raw(
+        'INSERT INTO "ChannelRollup" ("teamId", "channelId", "day", "messages", "threads", "replies", '
+        '"reactions", "updatedAt") '
+        'SELECT "teamId", "channelId", to_timestamp(floor("tsEpoch" / 86400) * 86400) AT TIME ZONE \'UTC\', '
+        'COUNT(*), COUNT(*) FILTER (WHERE "replyCount" > 0 AND ("threadTs" IS NULL OR "threadTs" = "ts")), '
+        'COALESCE(SUM("replyCount") FILTER (WHERE "threadTs" IS NULL OR "threadTs" = "ts"), 0), '
+        'COALESCE(SUM("reactionTotal"), 0), NOW() '
+        'FROM "Message" WHERE "teamId" = $1 AND "channelId" = $2 AND "tsEpoch" >= $3 AND "tsEpoch" < $4 '
+        "GROUP BY 1, 2, 3 "
+        'ON CONFLICT ("teamId", "channelId", "day") DO UPDATE SET "messages" = EXCLUDED."messages", '
+        '"threads" = EXCLUDED."threads", "replies" = EXCLUDED."replies", '
+        '"reactions" = EXCLUDED."reactions", "updatedAt" = NOW()',
+        team_id,
+        batch.channel_id,
+        float(first_day * _DAY),
+        float((last_day + 1) * _DAY),
+    )
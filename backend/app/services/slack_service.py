@@ -1,15 +1,15 @@
 from __future__ import annotations
 
+import asyncio
 import time
 import secrets
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, List, Optional
 import logging
 from urllib.parse import urlencode
 
-import httpx
-
+from app.core import telemetry, tracing
 from app.core.config import get_settings
+from app.core.serialization import loads as json_loads
 from app.models.pydantic_types import (
     SlackChannel,
     SlackConnection,
@@ -21,55 +21,116 @@ from app.models.pydantic_types import (
     SlackSelectChannelsRequest,
     SlackThread,
     SlackUser,
+    SlackUserGroup,
     SlackDevRehydrateRequest,
 )
+from app.services import persistence
+from app.services.message_batch import MessageBatch, vocabulary
+from app.services.state_backend import Installation, active_installation, forget_active_installation, get_state_backend
+from app.services.tenant_limits import get_slack_scheduler
 from app.services.state_store import load_selected_channels, save_selected_channels
 
+if TYPE_CHECKING:
+    import httpx
 
-# In-memory store for demo/dev. Replace with DB persistence via Prisma when ready.
-_OAUTH_STATE_STORE: Dict[str, float] = {}
-# Optional mapping state -> return URL so we can redirect back to the frontend after OAuth
-_OAUTH_STATE_RETURN_TO: Dict[str, str] = {}
-
-
-@dataclass
-class _Installation:
-    team_id: str
-    team_name: str
-    access_token: str
-    bot_user_id: Optional[str] = None
-    selected_channel_ids: set[str] = field(default_factory=set)
 
-
-_INSTALLATIONS_BY_TEAM: Dict[str, _Installation] = {}
-_ACTIVE_TEAM_ID: Optional[str] = None
+_OAUTH_STATE_TTL_SECONDS = 600
 
 
 def _now_epoch() -> int:
     return int(time.time())
 
 
-def _cleanup_states(ttl_seconds: int = 600) -> None:
-    cutoff = _now_epoch() - ttl_seconds
-    for key in list(_OAUTH_STATE_STORE.keys()):
-        if _OAUTH_STATE_STORE[key] < cutoff:
-            del _OAUTH_STATE_STORE[key]
+async def restore_installations() -> int:
+    """Load installations persisted in the database (see app/services/persistence.py).
+
+    The most recently updated one becomes the active team unless one is already set.
+    Returns how many were loaded.
+    """
+    backend = get_state_backend()
+    records = await persistence.load_installations()
+    for rec in records:
+        backend.save_installation(
+            Installation(
+                team_id=rec.teamId,
+                team_name=rec.teamName,
+                access_token=rec.accessToken,
+                bot_user_id=rec.botUserId,
+            )
+        )
+    if records:
+        if backend.get_active_team() is None:
+            backend.set_active_team(records[-1].teamId)
+        logging.getLogger(__name__).info("slack: restored %d installations from db", len(records))
+    return len(records)
+
+
+def _cleanup_states(ttl_seconds: int = _OAUTH_STATE_TTL_SECONDS) -> None:
+    get_state_backend().cleanup_oauth_states(older_than=_now_epoch() - ttl_seconds)
 
 
 class SlackService:
     def __init__(self) -> None:
         self.settings = get_settings()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
 
     def is_connected(self) -> bool:
         return self._get_active_installation() is not None
 
     async def _http(self) -> httpx.AsyncClient:
-        return httpx.AsyncClient(base_url="https://slack.com/api", timeout=20)
+        """The service's shared client: one connection pool for every Slack call, closed by `aclose()`."""
+        loop = asyncio.get_running_loop()
+        # Pooled connections belong to the loop that opened them (scripts and tests may run several)
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            import httpx  # on first use; keeps it out of app import time
+
+            self._client = httpx.AsyncClient(base_url=self.settings.slack_api_base.rstrip("/"), timeout=20)
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        if client is not None and not client.is_closed:
+            await client.aclose()
+
+    async def _get_json(self, http: httpx.AsyncClient, path: str, params: dict, token: str) -> dict:
+        """GET a Slack Web API method, sleeping through HTTP 429s per Retry-After.
 
-    def _get_active_installation(self) -> Optional[_Installation]:
-        if _ACTIVE_TEAM_ID is None:
-            return None
-        return _INSTALLATIONS_BY_TEAM.get(_ACTIVE_TEAM_ID)
+        Each attempt holds a slot from the per-tenant fair scheduler while in flight.
+        """
+        scheduler = get_slack_scheduler()
+        tenant = self.active_team_key()
+        method = path.lstrip("/")
+        for attempt in range(self.settings.slack_max_retries + 1):
+            async with scheduler.slot(tenant):
+                with tracing.span("slack.api", method=method, attempt=attempt) as span:
+                    started = time.perf_counter()
+                    resp = await http.get(path, params=params, headers={"Authorization": f"Bearer {token}"})
+                    telemetry.SLACK_LATENCY.observe(time.perf_counter() - started, method)
+                    if span is not None:
+                        span.set(status=resp.status_code)
+            telemetry.SLACK_CALLS.inc(method, str(resp.status_code))
+            if resp.status_code == 429:
+                telemetry.SLACK_RATE_LIMITED.inc(method)
+            if resp.status_code != 429 or attempt == self.settings.slack_max_retries:
+                break
+            retry_after = float(resp.headers.get("Retry-After", "1") or 1)
+            logging.getLogger(__name__).warning("slack: rate limited on %s; retrying in %.1fs", path, retry_after)
+            await asyncio.sleep(retry_after)
+        if resp.status_code == 429:
+            return {"ok": False, "error": "ratelimited"}
+        # Decode the raw body directly (orjson when installed); history pages can be large
+        return json_loads(resp.content)
+
+    def active_team_key(self) -> str:
+        """Team ID of the active installation, or `"demo"` when not connected."""
+        installation = self._get_active_installation()
+        return installation.team_id if installation else "demo"
+
+    def _get_active_installation(self) -> Optional[Installation]:
+        # The team named by the request (X-Slack-Team) wins; otherwise the default installation
+        return active_installation()
 
     async def get_connection(self) -> SlackConnection:
         installation = self._get_active_installation()
@@ -88,14 +149,12 @@ class SlackService:
         if not client_id or not redirect_uri:
             # Generate a placeholder state even if misconfigured to avoid None issues
             state = secrets.token_urlsafe(24)
-            _OAUTH_STATE_STORE[state] = _now_epoch()
+            get_state_backend().put_oauth_state(state, _now_epoch())
             return SlackOAuthUrl(url="", state=state)
 
         _cleanup_states()
         state = secrets.token_urlsafe(24)
-        _OAUTH_STATE_STORE[state] = _now_epoch()
-        if return_to:
-            _OAUTH_STATE_RETURN_TO[state] = return_to
+        get_state_backend().put_oauth_state(state, _now_epoch(), return_to)
 
         params = {
             "client_id": client_id,
@@ -109,10 +168,11 @@ class SlackService:
         return SlackOAuthUrl(url=url, state=state)
 
     async def handle_oauth_callback(self, code: str, state: str, override_redirect_uri: Optional[str] = None) -> SlackOAuthCallbackResult:
-        expected_ts = _OAUTH_STATE_STORE.pop(state, None)
-        if expected_ts is None or (_now_epoch() - expected_ts) > 600:
+        # Consumed atomically, so with a shared backend any worker can complete the flow
+        pending = get_state_backend().pop_oauth_state(state)
+        if pending is None or (_now_epoch() - pending[0]) > _OAUTH_STATE_TTL_SECONDS:
             return SlackOAuthCallbackResult(ok=False, error="invalid_state")
-        return_to = _OAUTH_STATE_RETURN_TO.pop(state, None)
+        return_to = pending[1]
 
         client_id = self.settings.slack_client_id
         client_secret = self.settings.slack_client_secret
@@ -120,18 +180,18 @@ class SlackService:
         if not client_id or not client_secret or not redirect_uri:
             return SlackOAuthCallbackResult(ok=False, error="server_not_configured")
 
-        async with await self._http() as http:
-            resp = await http.post(
-                "/oauth.v2.access",
-                data={
-                    "client_id": client_id,
-                    "client_secret": client_secret,
-                    "code": code,
-                    "redirect_uri": redirect_uri,
-                },
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-            )
-            data = resp.json()
+        http = await self._http()
+        resp = await http.post(
+            "/oauth.v2.access",
+            data={
+                "client_id": client_id,
+                "client_secret": client_secret,
+                "code": code,
+                "redirect_uri": redirect_uri,
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+        data = resp.json()
         if not data.get("ok"):
             return SlackOAuthCallbackResult(ok=False, error=str(data.get("error", "unknown_error")))
 
@@ -144,15 +204,13 @@ class SlackService:
         if not access_token or not team_id:
             return SlackOAuthCallbackResult(ok=False, error="invalid_token_response")
 
-        installation = _Installation(
+        installation = Installation(
             team_id=team_id,
             team_name=team_name or team_id,
             access_token=access_token,
             bot_user_id=bot_user_id,
         )
-        _INSTALLATIONS_BY_TEAM[team_id] = installation
-        global _ACTIVE_TEAM_ID
-        _ACTIVE_TEAM_ID = team_id
+        await self._install(installation)
 
         return SlackOAuthCallbackResult(
             ok=True,
@@ -174,17 +232,32 @@ class SlackService:
             return SlackConnection(teamId="", teamName="", isConnected=False)
 
         team_id = payload.teamId
-        installation = _Installation(
+        installation = Installation(
             team_id=team_id,
             team_name=(payload.teamName or team_id),
             access_token=payload.accessToken,
             bot_user_id=payload.botUserId,
         )
-        _INSTALLATIONS_BY_TEAM[team_id] = installation
-        global _ACTIVE_TEAM_ID
-        _ACTIVE_TEAM_ID = team_id
+        await self._install(installation)
         return SlackConnection(teamId=team_id, teamName=installation.team_name, isConnected=True, botUserId=installation.bot_user_id)
 
+    @staticmethod
+    async def _install(installation: Installation) -> None:
+        # Active in this process, and stored in the database so the team's Channel rows
+        # satisfy their foreign key to Installation (Message, MessageScore and ChannelRollup
+        # carry a teamId but no relation)
+        backend = get_state_backend()
+        backend.save_installation(installation)
+        backend.set_active_team(installation.team_id)
+        forget_active_installation()
+        try:
+            await persistence.save_installation(
+                installation.team_id, installation.team_name, installation.access_token, installation.bot_user_id
+            )
+        except Exception as exc:
+            logging.getLogger(__name__).error("slack: failed to persist installation team=%s: %s", installation.team_id, exc)
+
+    @tracing.traced("slack.list_channels")
     async def list_channels(self) -> List[SlackChannel]:
         installation = self._get_active_installation()
         if not installation:
@@ -218,33 +291,28 @@ class SlackService:
 
         channels: list[SlackChannel] = []
         cursor: Optional[str] = None
-        async with await self._http() as http:
-            while True:
-                params = {
-                    "limit": 200,
-                    "types": "public_channel,private_channel",
-                }
-                if cursor:
-                    params["cursor"] = cursor
-                resp = await http.get(
-                    "/conversations.list",
-                    params=params,
-                    headers={"Authorization": f"Bearer {installation.access_token}"},
-                )
-                data = resp.json()
-                if not data.get("ok"):
-                    break
-                for ch in data.get("channels", []) or []:
-                    channels.append(
-                        SlackChannel(
-                            id=ch.get("id", ""),
-                            name=ch.get("name", ""),
-                            isPrivate=ch.get("is_private"),
-                        )
+        http = await self._http()
+        while True:
+            params = {
+                "limit": 200,
+                "types": "public_channel,private_channel",
+            }
+            if cursor:
+                params["cursor"] = cursor
+            data = await self._get_json(http, "/conversations.list", params, installation.access_token)
+            if not data.get("ok"):
+                break
+            for ch in data.get("channels", []) or []:
+                channels.append(
+                    SlackChannel(
+                        id=ch.get("id", ""),
+                        name=ch.get("name", ""),
+                        isPrivate=ch.get("is_private"),
                     )
-                cursor = (data.get("response_metadata") or {}).get("next_cursor")
-                if not cursor:
-                    break
+                )
+            cursor = (data.get("response_metadata") or {}).get("next_cursor")
+            if not cursor:
+                break
         return channels
 
     async def select_channels(self, payload: SlackSelectChannelsRequest) -> SlackSelectedChannels:
@@ -258,7 +326,6 @@ class SlackService:
             save_selected_channels(team_id="demo", channel_ids=payload.channelIds)
             return SlackSelectedChannels(channels=selected)
 
-        installation.selected_channel_ids = set(payload.channelIds)
         # Persist selection
         save_selected_channels(team_id=installation.team_id, channel_ids=payload.channelIds)
         # Return rich channel info
@@ -267,31 +334,45 @@ class SlackService:
         for cid in payload.channelIds:
             if cid in selected_map:
                 selected.append(selected_map[cid])
+        # Awaited, not scheduled: the next read (on any replica) comes from the database
+        await persistence.save_channel_selection(installation.team_id, all_channels, payload.channelIds)
         return SlackSelectedChannels(channels=selected)
 
     async def get_selected_channels(self) -> SlackSelectedChannels:
         installation = self._get_active_installation()
-        # Load persisted selection first
-        persisted_ids = load_selected_channels(installation.team_id) if installation else load_selected_channels("demo")
-        if installation:
-            installation.selected_channel_ids = set(persisted_ids)
+        # Postgres is shared by every replica; the local state file only serves without
+        # DATABASE_URL (and for the demo selection, which is never stored)
+        persisted_ids = await persistence.load_channel_selection(installation.team_id) if installation else None
+        if persisted_ids is None:
+            persisted_ids = load_selected_channels(installation.team_id if installation else "demo")
         if not persisted_ids:
             return SlackSelectedChannels(channels=[])
         all_channels = await self.list_channels()
         selected = [c for c in all_channels if c.id in persisted_ids]
         return SlackSelectedChannels(channels=selected)
 
-    async def get_channel_messages(
-        self, channel_id: str, oldest: Optional[str] = None, latest: Optional[str] = None, limit: int = 200
-    ) -> SlackMessagesResponse:
+    @tracing.traced("slack.get_channel_batch")
+    async def get_channel_batch(
+        self,
+        channel_id: str,
+        oldest: Optional[str] = None,
+        latest: Optional[str] = None,
+        limit: int = 200,
+        *,
+        with_text: bool = True,
+        max_pages: int = 1,
+    ) -> MessageBatch:
+        """Fetch channel history into a columnar `MessageBatch` (no per-message models).
+
+        Follows `next_cursor` for up to `max_pages` pages of `limit` messages each.
+        """
         installation = self._get_active_installation()
-        messages: list[SlackMessage] = []
         if not installation:
             logging.getLogger(__name__).warning(
                 "slack: no active installation; returning empty message list for channel=%s",
                 channel_id,
             )
-            return SlackMessagesResponse(channelId=channel_id, messages=messages)
+            return MessageBatch.empty(channel_id, with_text=with_text)
 
         params: dict[str, str | int] = {"channel": channel_id, "limit": limit}
         if oldest:
@@ -299,46 +380,58 @@ class SlackService:
         if latest:
             params["latest"] = latest
 
-        async with await self._http() as http:
-            resp = await http.get(
-                "/conversations.history",
-                params=params,
-                headers={"Authorization": f"Bearer {installation.access_token}"},
+        pages: list[MessageBatch] = []
+        vocab = vocabulary(installation.team_id)
+        http = await self._http()
+        for _ in range(max(1, max_pages)):
+            data = await self._get_json(http, "/conversations.history", params, installation.access_token)
+            raw_messages = (data.get("messages") or []) if data.get("ok") else []
+            logging.getLogger(__name__).info(
+                "slack: history channel=%s ok=%s count=%s page=%d",
+                channel_id,
+                data.get("ok"),
+                len(raw_messages),
+                len(pages),
             )
-            data = resp.json()
-        logging.getLogger(__name__).info(
-            "slack: history channel=%s ok=%s count=%s",
-            channel_id,
-            data.get("ok"),
-            len((data.get("messages") or [])),
-        )
-        if data.get("ok"):
-            for m in data.get("messages", []) or []:
-                # Skip non-user messages (e.g. channel_join) without text where appropriate
-                msg_id = m.get("ts", "")
-                user = m.get("user") or m.get("bot_id") or ""
-                text = m.get("text", "")
-                ts = m.get("ts", "")
-                reactions = []
-                reactions_raw = m.get("reactions")
-                if isinstance(reactions_raw, list):
-                    for r in reactions_raw:
-                        name = (r or {}).get("name", "")
-                        users = (r or {}).get("users") or []
-                        if not isinstance(users, list):
-                            users = []
-                        reactions.append({"name": name, "userIds": [str(u) for u in users], "emoji": None})
-                messages.append(
-                    SlackMessage(
-                        id=msg_id,
-                        userId=str(user),
-                        text=text or "",
-                        ts=str(ts),
-                        reactions=reactions or None,
-                    )
+            pages.append(MessageBatch.from_slack_payload(channel_id, raw_messages, with_text=with_text, vocab=vocab))
+            cursor = (data.get("response_metadata") or {}).get("next_cursor")
+            if not data.get("ok") or not data.get("has_more") or not cursor:
+                break
+            params["cursor"] = cursor
+        return MessageBatch.concat(channel_id, pages)
+
+    @tracing.traced("slack.get_thread_replies")
+    async def get_thread_replies(self, channel_id: str, thread_ts: str, *, with_text: bool = False) -> MessageBatch:
+        """Fetch all replies of one thread (root excluded) via `conversations.replies`."""
+        installation = self._get_active_installation()
+        if not installation:
+            return MessageBatch.empty(channel_id, with_text=with_text)
+        params: dict[str, str | int] = {"channel": channel_id, "ts": thread_ts, "limit": 200}
+        raw_replies: list[dict] = []
+        http = await self._http()
+        while True:
+            data = await self._get_json(http, "/conversations.replies", params, installation.access_token)
+            if not data.get("ok"):
+                logging.getLogger(__name__).warning(
+                    "slack: replies channel=%s thread=%s error=%s", channel_id, thread_ts, data.get("error")
                 )
-        return SlackMessagesResponse(channelId=channel_id, messages=messages)
+                break
+            raw_replies.extend(m for m in data.get("messages") or [] if m.get("ts") != thread_ts)
+            cursor = (data.get("response_metadata") or {}).get("next_cursor")
+            if not data.get("has_more") or not cursor:
+                break
+            params["cursor"] = cursor
+        return MessageBatch.from_slack_payload(
+            channel_id, raw_replies, with_text=with_text, vocab=vocabulary(installation.team_id)
+        )
 
+    async def get_channel_messages(
+        self, channel_id: str, oldest: Optional[str] = None, latest: Optional[str] = None, limit: int = 200
+    ) -> SlackMessagesResponse:
+        batch = await self.get_channel_batch(channel_id=channel_id, oldest=oldest, latest=latest, limit=limit)
+        return SlackMessagesResponse(channelId=channel_id, messages=batch.to_messages())
+
+    @tracing.traced("slack.list_users")
     async def list_users(self) -> List[SlackUser]:
         installation = self._get_active_installation()
         if not installation:
@@ -350,32 +443,51 @@ class SlackService:
 
         users: list[SlackUser] = []
         cursor: Optional[str] = None
-        async with await self._http() as http:
-            while True:
-                params = {"limit": 200}
-                if cursor:
-                    params["cursor"] = cursor
-                resp = await http.get(
-                    "/users.list",
-                    params=params,
-                    headers={"Authorization": f"Bearer {installation.access_token}"},
-                )
-                data = resp.json()
-                if not data.get("ok"):
-                    break
-                for u in data.get("members", []) or []:
-                    if u.get("deleted"):
-                        continue
-                    users.append(
-                        SlackUser(
-                            id=u.get("id", ""),
-                            username=u.get("name", ""),
-                            displayName=(u.get("profile", {}) or {}).get("real_name", ""),
-                            avatarUrl=(u.get("profile", {}) or {}).get("image_48"),
-                            isBot=u.get("is_bot"),
-                        )
+        http = await self._http()
+        while True:
+            params = {"limit": 200}
+            if cursor:
+                params["cursor"] = cursor
+            data = await self._get_json(http, "/users.list", params, installation.access_token)
+            if not data.get("ok"):
+                break
+            for u in data.get("members", []) or []:
+                if u.get("deleted"):
+                    continue
+                users.append(
+                    SlackUser(
+                        id=u.get("id", ""),
+                        username=u.get("name", ""),
+                        displayName=(u.get("profile", {}) or {}).get("real_name", ""),
+                        avatarUrl=(u.get("profile", {}) or {}).get("image_48"),
+                        isBot=u.get("is_bot"),
                     )
-                cursor = (data.get("response_metadata") or {}).get("next_cursor")
-                if not cursor:
-                    break
+                )
+            cursor = (data.get("response_metadata") or {}).get("next_cursor")
+            if not cursor:
+                break
         return users
+
+    @tracing.traced("slack.list_user_groups")
+    async def list_user_groups(self) -> List[SlackUserGroup]:
+        """User groups with members (`usergroups.list`, needs the `usergroups:read` scope)."""
+        installation = self._get_active_installation()
+        if not installation:
+            return []
+        http = await self._http()
+        data = await self._get_json(
+            http, "/usergroups.list", {"include_users": "true"}, installation.access_token
+        )
+        if not data.get("ok"):
+            logging.getLogger(__name__).warning("slack: usergroups.list error=%s", data.get("error"))
+            return []
+        return [
+            SlackUserGroup(
+                id=g.get("id", ""),
+                name=g.get("name") or g.get("handle") or g.get("id", ""),
+                handle=g.get("handle"),
+                userIds=[str(u) for u in g.get("users") or []],
+            )
+            for g in data.get("usergroups", []) or []
+            if not g.get("date_delete")
+        ]
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional
+
+from app.core.config import get_settings
+from app.core.tenancy import request_cache, requested_team
+
+
+# Where OAuth states and Slack installations live. The in-memory backend is per process;
+# the SQLite backend is a file shared by every worker on a host (WAL mode), so an OAuth
+# callback can land on any worker. Select with STATE_BACKEND=memory|sqlite.
+
+
+@dataclass
+class Installation:
+    team_id: str
+    team_name: str
+    access_token: str
+    bot_user_id: Optional[str] = None
+
+
+class StateBackend(ABC):
+    @abstractmethod
+    def put_oauth_state(self, state: str, created_at: float, return_to: Optional[str] = None) -> None: ...
+
+    @abstractmethod
+    def pop_oauth_state(self, state: str) -> Optional[tuple[float, Optional[str]]]:
+        """Atomically remove a state; returns `(created_at, return_to)` or None if unknown."""
+
+    @abstractmethod
+    def cleanup_oauth_states(self, older_than: float) -> None: ...
+
+    @abstractmethod
+    def save_installation(self, installation: Installation) -> None: ...
+
+    @abstractmethod
+    def get_installation(self, team_id: str) -> Optional[Installation]: ...
+
+    @abstractmethod
+    def list_installations(self) -> list[Installation]: ...
+
+    @abstractmethod
+    def set_active_team(self, team_id: Optional[str]) -> None: ...
+
+    @abstractmethod
+    def get_active_team(self) -> Optional[str]: ...
+
+    def get_active_installation(self) -> Optional[Installation]:
+        team_id = self.get_active_team()
+        return self.get_installation(team_id) if team_id else None
+
+
+class MemoryStateBackend(StateBackend):
+    def __init__(self) -> None:
+        self._states: Dict[str, tuple[float, Optional[str]]] = {}
+        self._installations: Dict[str, Installation] = {}
+        self._active_team_id: Optional[str] = None
+
+    def put_oauth_state(self, state: str, created_at: float, return_to: Optional[str] = None) -> None:
+        self._states[state] = (created_at, return_to)
+
+    def pop_oauth_state(self, state: str) -> Optional[tuple[float, Optional[str]]]:
+        return self._states.pop(state, None)
+
+    def cleanup_oauth_states(self, older_than: float) -> None:
+        for key in [k for k, (created, _) in self._states.items() if created < older_than]:
+            del self._states[key]
+
+    def save_installation(self, installation: Installation) -> None:
+        self._installations[installation.team_id] = installation
+
+    def get_installation(self, team_id: str) -> Optional[Installation]:
+        return self._installations.get(team_id)
+
+    def list_installations(self) -> list[Installation]:
+        return list(self._installations.values())
+
+    def set_active_team(self, team_id: Optional[str]) -> None:
+        self._active_team_id = team_id
+
+    def get_active_team(self) -> Optional[str]:
+        return self._active_team_id
+
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS oauth_state (state TEXT PRIMARY KEY, created_at REAL NOT NULL, return_to TEXT)",
+    "CREATE TABLE IF NOT EXISTS installation (team_id TEXT PRIMARY KEY, team_name TEXT NOT NULL, "
+    "access_token TEXT NOT NULL, bot_user_id TEXT, updated_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+)
+
+
+class SqliteStateBackend(StateBackend):
+    """State shared across worker processes through one SQLite file.
+
+    Every operation is a single autocommitted statement; `pop_oauth_state` uses
+    `DELETE ... RETURNING` so exactly one worker can consume a given state.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+
+    def _execute(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def put_oauth_state(self, state: str, created_at: float, return_to: Optional[str] = None) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO oauth_state (state, created_at, return_to) VALUES (?, ?, ?)",
+            (state, created_at, return_to),
+        )
+
+    def pop_oauth_state(self, state: str) -> Optional[tuple[float, Optional[str]]]:
+        rows = self._execute("DELETE FROM oauth_state WHERE state = ? RETURNING created_at, return_to", (state,))
+        return (rows[0][0], rows[0][1]) if rows else None
+
+    def cleanup_oauth_states(self, older_than: float) -> None:
+        self._execute("DELETE FROM oauth_state WHERE created_at < ?", (older_than,))
+
+    def save_installation(self, installation: Installation) -> None:
+        self._execute(
+            "INSERT INTO installation (team_id, team_name, access_token, bot_user_id, updated_at) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT (team_id) DO UPDATE SET team_name = excluded.team_name, "
+            "access_token = excluded.access_token, bot_user_id = excluded.bot_user_id, updated_at = excluded.updated_at",
+            (installation.team_id, installation.team_name, installation.access_token, installation.bot_user_id, time.time()),
+        )
+
+    def get_installation(self, team_id: str) -> Optional[Installation]:
+        rows = self._execute(
+            "SELECT team_id, team_name, access_token, bot_user_id FROM installation WHERE team_id = ?", (team_id,)
+        )
+        return Installation(*rows[0]) if rows else None
+
+    def list_installations(self) -> list[Installation]:
+        rows = self._execute(
+            "SELECT team_id, team_name, access_token, bot_user_id FROM installation ORDER BY updated_at"
+        )
+        return [Installation(*row) for row in rows]
+
+    def set_active_team(self, team_id: Optional[str]) -> None:
+        if team_id is None:
+            self._execute("DELETE FROM meta WHERE key = 'active_team_id'")
+        else:
+            self._execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('active_team_id', ?)", (team_id,))
+
+    def get_active_team(self) -> Optional[str]:
+        rows = self._execute("SELECT value FROM meta WHERE key = 'active_team_id'")
+        return rows[0][0] if rows else None
+
+
+@lru_cache
+def get_state_backend() -> StateBackend:
+    settings = get_settings()
+    if settings.state_backend == "sqlite":
+        logging.getLogger(__name__).info("state: using sqlite backend at %s", settings.state_sqlite_path)
+        return SqliteStateBackend(settings.state_sqlite_path)
+    return MemoryStateBackend()
+
+
+def active_installation() -> Optional[Installation]:
+    """Installation the current request is for: the team it names (X-Slack-Team), else the default.
+
+    Looked up once per HTTP request: with the SQLite backend each lookup is a blocking query,
+    and every Slack call needs the installation.
+    """
+    cache = request_cache()
+    if cache is not None and "installation" in cache:
+        return cache["installation"]
+    backend = get_state_backend()
+    team_id = requested_team() or backend.get_active_team()
+    installation = backend.get_installation(team_id) if team_id else None
+    if cache is not None:
+        cache["installation"] = installation
+    return installation
+
+
+def forget_active_installation() -> None:
+    """Drop the request's memoized installation after installing or switching teams."""
+    cache = request_cache()
+    if cache is not None:
+        cache.pop("installation", None)
+
+
+def active_team_key() -> str:
+    """Team ID of the active installation, or `"demo"` when not connected."""
+    installation = active_installation()
+    return installation.team_id if installation else "demo"
+
+
+def is_known_team(team_id: str) -> bool:
+    return get_state_backend().get_installation(team_id) is not None
@@ -1,31 +1,106 @@
 from __future__ import annotations
 
+import contextlib
 import json
+import logging
 import os
-from typing import Dict, List, Set
+import tempfile
+import threading
+from typing import Dict, Iterator, List, Optional, Set
+
+try:  # POSIX advisory locks; on other platforms writes are atomic but not serialized
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
 
 
 _STATE_PATH = os.environ.get("EPULSE_STATE_FILE", os.path.join(os.path.dirname(__file__), "_state.json"))
 
 
+class StateStoreError(RuntimeError):
+    """Raised when persisted state cannot be written."""
+
+
+# Read-through cache of the parsed file, invalidated when (mtime_ns, size) changes so that
+# writes from other worker processes are picked up on the next read.
+_cache_lock = threading.Lock()
+_cache_key: Optional[tuple[str, int, int]] = None
+_cache_data: Dict[str, dict] = {}
+
+
+def _stat_key() -> Optional[tuple[str, int, int]]:
+    try:
+        st = os.stat(_STATE_PATH)
+    except FileNotFoundError:
+        return None
+    return (_STATE_PATH, st.st_mtime_ns, st.st_size)
+
+
 def _load_all() -> Dict[str, dict]:
+    global _cache_key, _cache_data
+    key = _stat_key()
+    if key is None:
+        return {}
+    with _cache_lock:
+        if key == _cache_key:
+            return _cache_data
     try:
-        if not os.path.exists(_STATE_PATH):
-            return {}
         with open(_STATE_PATH, "r", encoding="utf-8") as f:
             data = json.load(f)
-            return data if isinstance(data, dict) else {}
-    except Exception:
+    except (OSError, json.JSONDecodeError) as exc:
+        logging.getLogger(__name__).error("state: failed to read %s: %s", _STATE_PATH, exc)
         return {}
+    data = data if isinstance(data, dict) else {}
+    with _cache_lock:
+        _cache_key, _cache_data = key, data
+    return data
+
+
+_write_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def _exclusive() -> Iterator[None]:
+    """Serialize read-modify-write cycles across threads and worker processes."""
+    with _write_lock:
+        if fcntl is None:
+            yield
+            return
+        try:
+            lock_file = open(_STATE_PATH + ".lock", "a+")
+        except OSError as exc:
+            raise StateStoreError(f"could not lock {_STATE_PATH}") from exc
+        with lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
 
 
 def _save_all(data: Dict[str, dict]) -> None:
+    # Write to a temp file in the same directory and rename over the target, so readers
+    # in other processes see either the old or the new file, never a partial one.
+    global _cache_key, _cache_data
+    directory = os.path.dirname(os.path.abspath(_STATE_PATH))
     try:
-        with open(_STATE_PATH, "w", encoding="utf-8") as f:
-            json.dump(data, f)
-    except Exception:
-        # best-effort
-        pass
+        fd, tmp_path = tempfile.mkstemp(prefix=".state-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, _STATE_PATH)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+    except OSError as exc:
+        logging.getLogger(__name__).error("state: failed to write %s: %s", _STATE_PATH, exc)
+        raise StateStoreError(f"could not persist state to {_STATE_PATH}") from exc
+    key = _stat_key()
+    with _cache_lock:
+        _cache_key, _cache_data = key, data
 
 
 def load_selected_channels(team_id: str) -> Set[str]:
@@ -38,10 +113,10 @@ def load_selected_channels(team_id: str) -> Set[str]:
 
 
 def save_selected_channels(team_id: str, channel_ids: List[str]) -> None:
-    data = _load_all()
-    team = data.get(team_id) or {}
-    team["selected_channel_ids"] = list(dict.fromkeys(channel_ids))
-    data[team_id] = team
-    _save_all(data)
-
-
+    with _exclusive():
+        # Copy so the cached dict other readers hold is never mutated in place
+        data = {k: dict(v) for k, v in _load_all().items() if isinstance(v, dict)}
+        team = data.get(team_id) or {}
+        team["selected_channel_ids"] = list(dict.fromkeys(channel_ids))
+        data[team_id] = team
+        _save_all(data)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import os
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from weakref import WeakKeyDictionary
+
+from app.core.config import get_settings
+from app.services import user_store
+from app.services.message_batch import MessageBatch, Vocabulary
+from app.services.slack_service import SlackService
+
+
+# User -> team membership, cached per Slack team with a TTL. Teams get dense integer IDs
+# and users are mapped through their interned code (see `Vocabulary` in message_batch.py;
+# one code table per vocabulary, built on first use), so aggregations can group message
+# columns by team without touching user ID strings.
+
+UNASSIGNED = "Unassigned"
+
+
+@dataclass
+class TeamDirectory:
+    team_ids: list[str]
+    team_names: list[str]
+    # team index per user ID
+    members: dict[str, int] = field(default_factory=dict)
+    source: str = "none"
+    loaded_at: float = 0.0
+    # team index per interned user code of a vocabulary; -1 for users without a team
+    _tables: "WeakKeyDictionary[Vocabulary, array]" = field(default_factory=WeakKeyDictionary, repr=False)
+
+    @property
+    def unassigned(self) -> int:
+        """Dense index used for users without a team (one past the last real team)."""
+        return len(self.team_ids)
+
+    def table(self, vocab: Vocabulary) -> array:
+        """Team index per user code of `vocab`. Members are interned up front, so codes
+        added later belong to users without a team."""
+        table = self._tables.get(vocab)
+        if table is None:
+            codes = [(vocab.users.intern(uid), index) for uid, index in self.members.items()]
+            table = array("i", [-1]) * len(vocab.users)
+            for code, index in codes:
+                table[code] = index
+            self._tables[vocab] = table
+        return table
+
+    def team_of(self, user_code: int, vocab: Vocabulary) -> int:
+        table = self.table(vocab)
+        if 0 <= user_code < len(table):
+            team = table[user_code]
+            if team >= 0:
+                return team
+        return self.unassigned
+
+    def team_totals(self, batch: MessageBatch) -> tuple[list[int], list[int]]:
+        """Messages and reactions per dense team index (last slot: unassigned) in one group-by."""
+        size = len(self.team_ids) + 1
+        team_of_code = self.table(batch.vocab)
+        np = _numpy()
+        if np is not None and len(batch) and len(team_of_code):
+            table = np.frombuffer(team_of_code, dtype=np.int32)
+            codes = np.frombuffer(batch.user_codes, dtype=np.int32)
+            in_table = codes < len(table)
+            teams = np.where(in_table, table[np.where(in_table, codes, 0)], -1)
+            teams[teams < 0] = self.unassigned
+            reactions = np.frombuffer(batch.reaction_totals, dtype=np.uint32)
+            messages = np.bincount(teams, minlength=size)
+            emojis = np.bincount(teams, weights=reactions, minlength=size)
+            return [int(x) for x in messages], [int(x) for x in emojis]
+
+        messages = [0] * size
+        emojis = [0] * size
+        vocab = batch.vocab
+        team_of = self.team_of
+        for code, reactions in zip(batch.user_codes, batch.reaction_totals):
+            team = team_of(code, vocab)
+            messages[team] += 1
+            emojis[team] += reactions
+        return messages, emojis
+
+
+_NUMPY: Any = None
+_NUMPY_CHECKED = False
+
+
+def _numpy() -> Any:
+    # numpy is optional (`poetry install -E fast`); the pure-Python loop is the fallback
+    global _NUMPY, _NUMPY_CHECKED
+    if not _NUMPY_CHECKED:
+        _NUMPY_CHECKED = True
+        try:
+            import numpy
+
+            _NUMPY = numpy
+        except ImportError:
+            _NUMPY = None
+    return _NUMPY
+
+
+_DIRECTORIES: dict[str, TeamDirectory] = {}
+
+
+def refresh(team_key: Optional[str] = None) -> None:
+    """Drop cached directories (all, or one Slack team's) so the next lookup reloads them."""
+    if team_key is None:
+        _DIRECTORIES.clear()
+    else:
+        _DIRECTORIES.pop(team_key, None)
+
+
+def build_directory(memberships: list[tuple[str, str, list[str]]], *, source: str) -> TeamDirectory:
+    """Build from `(team_id, team_name, user_ids)`; a user in several teams keeps the first."""
+    team_ids: list[str] = []
+    team_names: list[str] = []
+    members: dict[str, int] = {}
+    for team_id, team_name, user_ids in memberships:
+        index = len(team_ids)
+        team_ids.append(team_id)
+        team_names.append(team_name)
+        for uid in user_ids:
+            members.setdefault(uid, index)
+    return TeamDirectory(team_ids=team_ids, team_names=team_names, members=members, source=source, loaded_at=time.time())
+
+
+def _load_file(path: str) -> list[tuple[str, str, list[str]]]:
+    """Parse a directory file.
+
+    JSON: `{"Team name": ["U1", "U2"], ...}` or `{"U1": "Team name", ...}`.
+    CSV: rows of `user_id,team` (a header row is skipped).
+    """
+    members: dict[str, list[str]] = {}
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            for row in csv.reader(f):
+                if len(row) < 2 or row[0].strip().lower() in ("user_id", "userid", "user"):
+                    continue
+                members.setdefault(row[1].strip(), []).append(row[0].strip())
+        else:
+            data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError("team directory JSON must be an object")
+            for key, value in data.items():
+                if isinstance(value, list):
+                    members.setdefault(str(key), []).extend(str(u) for u in value)
+                else:
+                    members.setdefault(str(value), []).append(str(key))
+    return [(f"team-{name.lower().replace(' ', '-')}", name, users) for name, users in members.items()]
+
+
+async def _load(slack: SlackService) -> TeamDirectory:
+    settings = get_settings()
+    path = settings.team_directory_file
+    if path and os.path.exists(path):
+        try:
+            return build_directory(_load_file(path), source="file")
+        except Exception as exc:
+            logging.getLogger(__name__).error("teams: failed to read directory file %s: %s", path, exc)
+
+    groups = await slack.list_user_groups()
+    if groups:
+        return build_directory([(g.id, g.name, g.userIds) for g in groups], source="slack")
+
+    # No directory configured (e.g. demo mode): pseudo-teams by display-name initial
+    pseudo: dict[str, list[str]] = {}
+    for u in await user_store.get_users(slack):
+        name = u.displayName or u.username or u.id
+        pseudo.setdefault(name[:1].upper() if name else "X", []).append(u.id)
+    return build_directory(
+        [(f"team-{letter}", f"Team {letter}", users) for letter, users in sorted(pseudo.items())],
+        source="pseudo",
+    )
+
+
+async def get_directory(slack: SlackService) -> TeamDirectory:
+    key = slack.active_team_key()
+    cached = _DIRECTORIES.get(key)
+    if cached is not None and time.time() - cached.loaded_at <= get_settings().team_directory_ttl_seconds:
+        return cached
+    directory = await _load(slack)
+    logging.getLogger(__name__).info(
+        "teams: loaded %d teams from %s for team=%s", len(directory.team_ids), directory.source, key
+    )
+    _DIRECTORIES[key] = directory
+    return directory
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AsyncIterator
+
+from app.core.config import get_settings
+
+
+# Per-tenant limits so one workspace cannot monopolise shared capacity:
+# - `FairScheduler` hands out a global pool of Slack API slots round-robin across tenants,
+#   with a per-tenant cap, so a large backfill queues behind its own requests only.
+# - `LlmQuota` is a token bucket per tenant for LLM calls; callers degrade to the heuristic
+#   analysis when a tenant's bucket is empty.
+
+
+class FairScheduler:
+    def __init__(self, capacity: int, per_tenant: int) -> None:
+        self.capacity = max(1, capacity)
+        self.per_tenant = max(1, min(per_tenant, self.capacity))
+        self._in_use = 0
+        self._by_tenant: dict[str, int] = {}
+        # Tenants with waiters, in round-robin order
+        self._waiting: "OrderedDict[str, deque[asyncio.Future]]" = OrderedDict()
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    def queued(self, tenant: str) -> int:
+        return len(self._waiting.get(tenant, ()))
+
+    @contextlib.asynccontextmanager
+    async def slot(self, tenant: str) -> AsyncIterator[None]:
+        await self._acquire(tenant)
+        try:
+            yield
+        finally:
+            self._release(tenant)
+
+    async def _acquire(self, tenant: str) -> None:
+        if not self._waiting and self._has_room(tenant):
+            self._grant(tenant)
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(tenant, deque()).append(fut)
+        self._dispatch()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self._release(tenant)  # granted just as we were cancelled
+            else:
+                queue = self._waiting.get(tenant)
+                if queue is not None and fut in queue:
+                    queue.remove(fut)
+                    if not queue:
+                        del self._waiting[tenant]
+            raise
+
+    def _has_room(self, tenant: str) -> bool:
+        return self._in_use < self.capacity and self._by_tenant.get(tenant, 0) < self.per_tenant
+
+    def _grant(self, tenant: str) -> None:
+        self._in_use += 1
+        self._by_tenant[tenant] = self._by_tenant.get(tenant, 0) + 1
+
+    def _release(self, tenant: str) -> None:
+        self._in_use -= 1
+        remaining = self._by_tenant.get(tenant, 1) - 1
+        if remaining:
+            self._by_tenant[tenant] = remaining
+        else:
+            self._by_tenant.pop(tenant, None)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._in_use < self.capacity and self._waiting:
+            for tenant, queue in self._waiting.items():
+                if self._by_tenant.get(tenant, 0) < self.per_tenant:
+                    break
+            else:
+                return  # every waiting tenant is at its own cap
+            fut = queue.popleft()
+            if queue:
+                self._waiting.move_to_end(tenant)
+            else:
+                del self._waiting[tenant]
+            if fut.cancelled():
+                continue
+            self._grant(tenant)
+            fut.set_result(None)
+
+
+@dataclass
+class _Bucket:
+    tokens: float
+    updated_at: float
+
+
+class LlmQuotaExceeded(RuntimeError):
+    """A tenant has used up its LLM calls for now; callers fall back to heuristics."""
+
+
+class LlmQuota:
+    """Token bucket per tenant: `per_minute` calls, refilled continuously, burst up to `per_minute`."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.per_minute = per_minute
+        self._buckets: dict[str, _Bucket] = {}
+
+    def try_acquire(self, tenant: str) -> bool:
+        if self.per_minute <= 0:
+            return True  # unlimited
+        now = time.monotonic()
+        bucket = self._buckets.get(tenant)
+        if bucket is None:
+            bucket = self._buckets[tenant] = _Bucket(tokens=float(self.per_minute), updated_at=now)
+        bucket.tokens = min(float(self.per_minute), bucket.tokens + (now - bucket.updated_at) * self.per_minute / 60.0)
+        bucket.updated_at = now
+        if bucket.tokens < 1.0:
+            return False
+        bucket.tokens -= 1.0
+        return True
+
+
+@lru_cache
+def get_slack_scheduler() -> FairScheduler:
+    settings = get_settings()
+    return FairScheduler(settings.slack_global_concurrency, settings.slack_tenant_concurrency)
+
+
+@lru_cache
+def get_llm_quota() -> LlmQuota:
+    return LlmQuota(get_settings().llm_calls_per_minute_per_tenant)
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.services.message_batch import MessageBatch
+
+
+@dataclass
+class ThreadStats:
+    """Thread/response totals for an entity (channel, user or team)."""
+
+    threads: int = 0  # thread roots with at least one reply
+    replies: int = 0
+    repliers: set[int] = field(default_factory=set)  # interned user codes
+    first_response_seconds: list[float] = field(default_factory=list)
+
+    @property
+    def unique_repliers(self) -> int:
+        return len(self.repliers)
+
+    @property
+    def avg_first_response_minutes(self) -> Optional[float]:
+        if not self.first_response_seconds:
+            return None
+        return round(sum(self.first_response_seconds) / len(self.first_response_seconds) / 60.0, 1)
+
+    def merge(self, other: "ThreadStats") -> None:
+        self.threads += other.threads
+        self.replies += other.replies
+        self.repliers |= other.repliers
+        self.first_response_seconds.extend(other.first_response_seconds)
+
+
+def _first_response(root_ts: float, root_user: int, replies: MessageBatch) -> Optional[float]:
+    # First reply from someone other than the author; self-follow-ups are not responses
+    for ts, code in zip(replies.ts, replies.user_codes):
+        if code != root_user:
+            return max(0.0, ts - root_ts)
+    return None
+
+
+def thread_stats_by_user(batch: MessageBatch, replies_by_thread: dict[float, MessageBatch]) -> dict[int, ThreadStats]:
+    """Per-user stats: threads they started, and replies they wrote in this batch's threads.
+
+    `threads`, `repliers` and `first_response_seconds` are attributed to the thread author;
+    `replies` to the reply author. When a thread's replies were not fetched, the root's
+    `reply_count` is used for the reply total and attributed to the author.
+    """
+    out: dict[int, ThreadStats] = {}
+    for i in batch.thread_root_indices():
+        root_ts, author = batch.ts[i], batch.user_codes[i]
+        stats = out.setdefault(author, ThreadStats())
+        stats.threads += 1
+        replies = replies_by_thread.get(root_ts)
+        if replies is None:
+            stats.replies += batch.reply_counts[i]
+            continue
+        for code in replies.user_codes:
+            out.setdefault(code, ThreadStats()).replies += 1
+            stats.repliers.add(code)
+        first = _first_response(root_ts, author, replies)
+        if first is not None:
+            stats.first_response_seconds.append(first)
+    return out
+
+
+def thread_stats(batch: MessageBatch, replies_by_thread: dict[float, MessageBatch]) -> ThreadStats:
+    """Channel-level stats for the threads rooted in `batch`."""
+    total = ThreadStats()
+    for stats in thread_stats_by_user(batch, replies_by_thread).values():
+        total.merge(stats)
+    return total
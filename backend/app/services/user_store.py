@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core import telemetry
+from app.core.config import get_settings
+from app.models.pydantic_types import SlackUser
+from app.services.slack_service import SlackService
+
+
+# Workspace members per Slack team, cached with a TTL so listing, paging and name lookups
+# do not walk all of `users.list` on every request. Users are kept sorted by ID, which is
+# what the paging cursor refers to.
+
+
+@dataclass
+class _UserList:
+    users: list[SlackUser]
+    ids: list[str]
+    loaded_at: float
+
+
+_USERS: dict[str, _UserList] = {}
+_LOCKS: dict[str, asyncio.Lock] = {}
+
+
+def refresh(team_key: Optional[str] = None) -> None:
+    """Drop cached users (all, or one Slack team's) so the next lookup reloads them."""
+    if team_key is None:
+        _USERS.clear()
+    else:
+        _USERS.pop(team_key, None)
+
+
+async def _load(slack: SlackService) -> _UserList:
+    key = slack.active_team_key()
+    async with _LOCKS.setdefault(key, asyncio.Lock()):
+        cached = _USERS.get(key)
+        if cached is not None and time.time() - cached.loaded_at <= get_settings().slack_users_ttl_seconds:
+            telemetry.CACHE_REQUESTS.inc("users", "hit")
+            return cached
+        telemetry.CACHE_REQUESTS.inc("users", "miss")
+        users = sorted(await slack.list_users(), key=lambda u: u.id)
+        logging.getLogger(__name__).info("users: loaded %d users for team=%s", len(users), key)
+        cached = _USERS[key] = _UserList(users=users, ids=[u.id for u in users], loaded_at=time.time())
+        return cached
+
+
+async def get_users(slack: SlackService) -> list[SlackUser]:
+    return (await _load(slack)).users
+
+
+async def find_users(
+    slack: SlackService,
+    *,
+    after: Optional[str] = None,
+    query: Optional[str] = None,
+    is_bot: Optional[bool] = None,
+    limit: int = 200,
+) -> tuple[list[SlackUser], Optional[str]]:
+    """One page of users ordered by ID, starting after the `after` ID.
+
+    `query` matches username or display name case-insensitively. Returns the page and the
+    ID to pass as `after` for the next page (None on the last page).
+    """
+    cached = await _load(slack)
+    needle = query.lower() if query else None
+    page: list[SlackUser] = []
+    for user in cached.users[bisect_right(cached.ids, after) if after else 0 :]:
+        if is_bot is not None and bool(user.isBot) != is_bot:
+            continue
+        if needle and needle not in user.username.lower() and needle not in user.displayName.lower():
+            continue
+        if len(page) == limit:
+            return page, page[-1].id
+        page.append(user)
+    return page, None
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import random
+import time
+from typing import Any, Callable
+
+# JSON benchmark: FastAPI's default response path (response_model re-validation + stdlib
+# json) vs FastJSONResponse, in-process and through the ASGI stack, plus Slack page decoding
+# and heatmap wire size / client parse time for plain vs compact encoding, with and without gzip.
+#
+#   cd backend
+#   poetry run python -m scripts.bench_json --messages 10000
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.core.serialization import FastJSONResponse, compact_matrix, dumps, loads, orjson, unpack_array
+from app.models.pydantic_types import HeatmapMatrix, SlackMessage, SlackMessagesResponse, SlackReaction
+
+
+def _heatmap(rows: int, cols: int, seed: int) -> HeatmapMatrix:
+    rng = random.Random(seed)
+    return HeatmapMatrix(
+        rows=[f"channel-{i}" for i in range(rows)],
+        cols=[f"day-{j}" for j in range(cols)],
+        values=[[round(rng.uniform(-1, 1), 3) for _ in range(cols)] for _ in range(rows)],
+    )
+
+
+def _history(n: int, seed: int) -> SlackMessagesResponse:
+    rng = random.Random(seed)
+    start = time.time() - 30 * 86400
+    messages = []
+    for i in range(n):
+        ts = f"{start + i * 60:.6f}"
+        reactions = None
+        if rng.random() < 0.3:
+            reactions = [SlackReaction(name="tada", userIds=[f"U{rng.randrange(500):05d}"])]
+        messages.append(
+            SlackMessage(id=ts, userId=f"U{rng.randrange(500):05d}", text="Shipped the fix, thanks team " * 2, ts=ts, reactions=reactions)
+        )
+    return SlackMessagesResponse(channelId="C-bench", messages=messages)
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> float:
+    fn()  # warm up
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+
+def _encode_timings(name: str, payload: Any, repeat: int) -> dict[str, float]:
+    # Serializer only: model -> dict -> stdlib json vs straight to bytes
+    return {
+        f"{name}_encode_default_ms": _time(lambda: JSONResponse(payload.model_dump(mode="json")).body, repeat),
+        f"{name}_encode_fast_ms": _time(lambda: FastJSONResponse(payload).body, repeat),
+    }
+
+
+def _endpoint_timings(name: str, payload: Any, model: type, repeat: int) -> dict[str, float]:
+    app = FastAPI()
+
+    @app.get("/default", response_model=model, response_class=JSONResponse)
+    async def default() -> Any:
+        return payload
+
+    @app.get("/fast", response_model=model)
+    async def fast() -> FastJSONResponse:
+        return FastJSONResponse(payload)
+
+    client = TestClient(app)
+    assert client.get("/default").json() == client.get("/fast").json()
+    return {
+        f"{name}_default_ms": _time(lambda: client.get("/default"), repeat),
+        f"{name}_fast_ms": _time(lambda: client.get("/fast"), repeat),
+    }
+
+
+def _wire_timings(name: str, heatmap: HeatmapMatrix, repeat: int) -> dict[str, float]:
+    plain = dumps(heatmap)
+    compact = dumps(compact_matrix(heatmap.rows, heatmap.cols, heatmap.values))
+    return {
+        f"{name}_plain_bytes": len(plain),
+        f"{name}_plain_gzip_bytes": len(gzip.compress(plain, 6)),
+        f"{name}_compact_bytes": len(compact),
+        f"{name}_compact_gzip_bytes": len(gzip.compress(compact, 6)),
+        # Client side: parse the body and get at the numbers
+        f"{name}_parse_plain_ms": _time(lambda: json.loads(plain)["values"], repeat),
+        f"{name}_parse_compact_ms": _time(lambda: unpack_array(json.loads(compact)["values"]), repeat),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare API response serialization and Slack payload decoding.")
+    parser.add_argument("--messages", type=int, default=10_000)
+    parser.add_argument("--rows", type=int, default=30)
+    parser.add_argument("--cols", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    heatmap = _heatmap(args.rows, args.cols, args.seed)
+    history = _history(args.messages, args.seed)
+    results: dict[str, Any] = {"orjson": orjson is not None}
+    for name, payload, model in (
+        (f"heatmap_{args.rows}x{args.cols}", heatmap, HeatmapMatrix),
+        (f"history_{args.messages}", history, SlackMessagesResponse),
+    ):
+        results.update(_encode_timings(name, payload, args.repeat))
+        results.update(_endpoint_timings(name, payload, model, args.repeat))
+
+    big = _heatmap(args.rows * 10, args.cols * 8, args.seed)
+    results.update(_wire_timings(f"wire_heatmap_{args.rows * 10}x{args.cols * 8}", big, args.repeat))
+
+    # Decoding one conversations.history-shaped body (what SlackService._get_json receives)
+    raw = json.dumps(
+        {"ok": True, "has_more": False, "messages": [m.model_dump(exclude_none=True) for m in history.messages]}
+    ).encode("utf-8")
+    results["decode_bytes"] = len(raw)
+    results["decode_stdlib_ms"] = _time(lambda: json.loads(raw.decode("utf-8")), args.repeat)
+    results["decode_fast_ms"] = _time(lambda: loads(raw), args.repeat)
+
+    print(json.dumps({k: round(v, 3) if isinstance(v, float) else v for k, v in results.items()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+import io
+import logging
+import logging.handlers
+import statistics
+import time
+
+# Logging benchmark: cost of one `logger.info(...)` call as seen by the caller (the event
+# loop), for a synchronous StreamHandler vs the QueueHandler used by configure_logging,
+# writing to a fast sink and to a slow one (a stdout pipe whose reader falls behind).
+#
+#   cd backend
+#   poetry run python -m scripts.bench_logging --records 20000
+
+from app.core.logging import TEXT_FORMAT, DroppingQueueHandler, JsonFormatter, RequestContextFilter
+
+
+class _SlowStream(io.TextIOBase):
+    """A stdout that takes `delay` seconds per write, like a pipe to a busy log shipper."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+
+    def write(self, s: str) -> int:
+        time.sleep(self.delay)
+        return len(s)
+
+
+def _per_call_us(logger: logging.Logger, records: int) -> tuple[float, float]:
+    samples = []
+    for i in range(records):
+        started = time.perf_counter()
+        logger.info("slack: channel=%s appended %d new messages", "C0123", i)
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return statistics.fmean(samples), samples[int(len(samples) * 0.99)]
+
+
+def _run(name: str, handler: logging.Handler, records: int, listener_sink: logging.Handler | None = None) -> None:
+    logger = logging.getLogger(f"bench.{name}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.handlers = [handler]
+    listener = None
+    if listener_sink is not None:
+        listener = logging.handlers.QueueListener(handler.queue, listener_sink)  # type: ignore[attr-defined]
+        listener.start()
+    mean, p99 = _per_call_us(logger, records)
+    dropped = getattr(handler, "dropped", 0)
+    if listener is not None:
+        listener.stop()
+    print(f"{name:<28} mean {mean:7.2f} us   p99 {p99:8.2f} us   dropped {dropped}")
+
+
+def _stream(stream, json_format: bool) -> logging.Handler:
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+    handler.addFilter(RequestContextFilter())
+    return handler
+
+
+def _queued(maxsize: int) -> DroppingQueueHandler:
+    handler = DroppingQueueHandler(maxsize)
+    handler.addFilter(RequestContextFilter())
+    return handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-call logging cost: synchronous vs queued handlers")
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--slow-write-us", type=float, default=50.0, help="per-write delay of the slow sink")
+    parser.add_argument("--queue-size", type=int, default=10000)
+    args = parser.parse_args()
+    delay = args.slow_write_us / 1e6
+
+    _run("sync text, fast sink", _stream(io.StringIO(), False), args.records)
+    _run("sync json, fast sink", _stream(io.StringIO(), True), args.records)
+    _run("sync text, slow sink", _stream(_SlowStream(delay), False), args.records)
+    _run("queued text, fast sink", _queued(args.queue_size), args.records, _stream(io.StringIO(), False))
+    _run("queued json, slow sink", _queued(args.queue_size), args.records, _stream(_SlowStream(delay), True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from typing import Any, Callable
+
+# Memory benchmark: Pydantic SlackMessage lists vs the columnar MessageBatch.
+#
+#   cd backend
+#   poetry run python -m scripts.bench_message_batch --messages 200000
+
+from app.models.pydantic_types import SlackMessage
+from app.services.message_batch import MessageBatch
+
+
+_EMOJIS = ["tada", "rocket", "+1", "eyes", "fire", "heart", "white_check_mark", "pray"]
+
+
+def _synthetic_payload(n: int, *, users: int, reaction_density: float, seed: int) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    start = time.time() - 365 * 24 * 3600
+    out: list[dict[str, Any]] = []
+    for i in range(n):
+        m: dict[str, Any] = {
+            "type": "message",
+            "ts": f"{start + i * 30 + rng.random():.6f}",
+            "user": f"U{rng.randrange(users):06d}",
+            "text": "Status update: shipped the fix, blocked on review, thanks team " * rng.randint(1, 3),
+        }
+        if rng.random() < reaction_density:
+            m["reactions"] = [
+                {"name": name, "users": [f"U{rng.randrange(users):06d}" for _ in range(rng.randint(1, 4))]}
+                for name in rng.sample(_EMOJIS, rng.randint(1, 3))
+            ]
+            for r in m["reactions"]:
+                r["count"] = len(r["users"])
+        out.append(m)
+    return out
+
+
+def _as_pydantic(channel_id: str, payload: list[dict[str, Any]]) -> list[SlackMessage]:
+    # Mirrors the pre-columnar decode loop in SlackService
+    out: list[SlackMessage] = []
+    for m in payload:
+        reactions = [
+            {"name": r.get("name", ""), "userIds": [str(u) for u in r.get("users") or []], "emoji": None}
+            for r in m.get("reactions") or []
+        ]
+        out.append(
+            SlackMessage(
+                id=m.get("ts", ""),
+                userId=str(m.get("user") or ""),
+                text=m.get("text", ""),
+                ts=str(m.get("ts", "")),
+                reactions=reactions or None,
+            )
+        )
+    return out
+
+
+def _measure(label: str, build: Callable[[], object]) -> dict[str, Any]:
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    obj = build()
+    elapsed = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return {
+        "label": label,
+        "retained_mb": round(current / 1e6, 2),
+        "peak_mb": round(peak / 1e6, 2),
+        "build_s": round(elapsed, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare memory of SlackMessage lists vs MessageBatch")
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--reaction-density", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    payload = _synthetic_payload(args.messages, users=args.users, reaction_density=args.reaction_density, seed=args.seed)
+    results = [
+        _measure("pydantic SlackMessage", lambda: _as_pydantic("C1", payload)),
+        _measure("MessageBatch with_text", lambda: MessageBatch.from_slack_payload("C1", payload, with_text=True)),
+        _measure("MessageBatch counts only", lambda: MessageBatch.from_slack_payload("C1", payload, with_text=False)),
+    ]
+    print(json.dumps({"messages": args.messages, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
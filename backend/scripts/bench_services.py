@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+# Service benchmark: DashboardService, MetricsService and InsightsService methods over a
+# synthetic workspace (scripts/synthetic_workspace.py), against an in-process fake Slack
+# and a fake Anthropic SDK client with configurable latency. For every method and range it
+# reports cold latency (caches cleared), warm latency (caches populated), Slack/LLM call
+# counts of the cold run and its peak traced memory. Results are written as JSON;
+# `--compare` diffs them against an earlier run and exits non-zero on regressions.
+# With `--slack-url` the real SlackService is used instead, over HTTP against a running
+# scripts/fake_slack.py (same workspace flags), so paging, 429s and the per-tenant
+# scheduler are part of the measurement.
+#
+#   cd backend
+#   poetry run python -m scripts.bench_services --channels 20 --messages-per-day 40 --output bench.json
+#   git checkout other-branch
+#   poetry run python -m scripts.bench_services --channels 20 --messages-per-day 40 --compare bench.json
+
+from app.core import telemetry
+from app.core.config import get_settings
+from app.core.tenancy import reset_requested_team, set_requested_team
+from app.models.pydantic_types import SlackChannel, SlackSelectedChannels, SlackUser, SlackUserGroup, TimeRange
+from app.services import message_store, team_directory, user_store
+from app.services.anthropic_service import AnthropicService
+from app.services.dashboard_service import DashboardService
+from app.services.insights_service import InsightsService
+from app.services.message_batch import MessageBatch
+from app.services.metrics_service import MetricsService
+from app.services.slack_service import SlackService
+from app.services.state_backend import Installation, get_state_backend
+from app.services.tenant_limits import get_llm_quota
+from scripts.fake_slack import DEFAULT_TOKEN, TEAM
+from scripts.synthetic_workspace import Workspace, WorkspaceSpec, add_workspace_arguments, spec_from_args
+
+_Services = tuple[DashboardService, MetricsService, InsightsService]
+
+# (name, call) pairs; every call takes the services and a time range
+METHODS: list[tuple[str, Callable[[_Services, TimeRange], Awaitable[Any]]]] = [
+    ("dashboard.kpi", lambda s, r: s[0].compute_kpi(time_range=r)),
+    ("dashboard.channel_metrics", lambda s, r: s[0].compute_channel_metrics(time_range=r)),
+    ("dashboard.trend", lambda s, r: s[0].compute_trend(time_range=r)),
+    ("dashboard.current_trend_point", lambda s, r: s[0].compute_current_trend_point(time_range=r)),
+    ("dashboard.burnout_series", lambda s, r: s[0].compute_burnout_series(time_range=r, group="channels")),
+    ("dashboard.burnout_series_person", lambda s, r: s[0].compute_burnout_series(time_range=r, group="person")),
+    ("dashboard.heatmap_channels", lambda s, r: s[0].compute_heatmap(grouping="channels", metric="sentiment", time_range=r)),
+    ("dashboard.heatmap_teams", lambda s, r: s[0].compute_heatmap(grouping="teams", metric="messages", time_range=r)),
+    ("dashboard.heatmap_people", lambda s, r: s[0].compute_heatmap(grouping="people", metric="threads", time_range=r)),
+    ("metrics.entity_totals_channel", lambda s, r: s[1].compute_entity_totals(time_range=r, perspective="channel")),
+    ("metrics.entity_totals_team", lambda s, r: s[1].compute_entity_totals(time_range=r, perspective="team")),
+    ("metrics.entity_totals_employee", lambda s, r: s[1].compute_entity_totals(time_range=r, perspective="employee")),
+    ("metrics.top_emojis", lambda s, r: s[1].compute_top_emojis(time_range=r)),
+    ("insights.team_insights", lambda s, r: s[2].generate_team_insights(time_range=r)),
+]
+
+
+class FakeSlack:
+    """SlackService stand-in serving a synthetic workspace, paging and sleeping like the real API."""
+
+    def __init__(self, workspace: Workspace, *, latency: float, page_size: int = 200) -> None:
+        self.workspace = workspace
+        self.latency = latency
+        self.page_size = page_size
+        self.calls: Counter[str] = Counter()
+
+    async def _api(self, pages: int = 1) -> None:
+        self.calls["slack.api_requests"] += pages
+        if self.latency:
+            await asyncio.sleep(self.latency * pages)
+
+    def active_team_key(self) -> str:
+        return "T-bench"
+
+    async def list_channels(self) -> list[SlackChannel]:
+        self.calls["slack.list_channels"] += 1
+        channels = self.workspace.channels
+        await self._api(max(1, -(-len(channels) // self.page_size)))
+        return [SlackChannel(id=c["id"], name=c["name"], isPrivate=c["is_private"]) for c in channels]
+
+    async def get_selected_channels(self) -> SlackSelectedChannels:
+        # Nothing selected: services fall back to every channel
+        return SlackSelectedChannels(channels=[])
+
+    async def get_channel_batch(self, channel_id, oldest=None, latest=None, limit=200, *, with_text=True, max_pages=1) -> MessageBatch:
+        self.calls["slack.get_channel_batch"] += 1
+        raw = self.workspace.messages(
+            channel_id,
+            oldest=float(oldest) if oldest else None,
+            latest=float(latest) if latest else None,
+        )[: limit * max(1, max_pages)]
+        await self._api(max(1, -(-len(raw) // limit)))
+        return MessageBatch.from_slack_payload(channel_id, raw, with_text=with_text)
+
+    async def get_thread_replies(self, channel_id: str, thread_ts: str, *, with_text: bool = False) -> MessageBatch:
+        self.calls["slack.get_thread_replies"] += 1
+        thread = self.workspace.thread(channel_id, thread_ts)
+        await self._api(max(1, -(-len(thread) // 200)))
+        return MessageBatch.from_slack_payload(channel_id, [m for m in thread if m["ts"] != thread_ts], with_text=with_text)
+
+    async def list_users(self) -> list[SlackUser]:
+        self.calls["slack.list_users"] += 1
+        users = self.workspace.users
+        await self._api(max(1, -(-len(users) // self.page_size)))
+        return [
+            SlackUser(id=u["id"], username=u["name"], displayName=u["profile"]["real_name"], isBot=u["is_bot"])
+            for u in users
+        ]
+
+    async def list_user_groups(self) -> list[SlackUserGroup]:
+        self.calls["slack.list_user_groups"] += 1
+        await self._api()
+        return [SlackUserGroup(id=g["id"], name=g["name"], handle=g["handle"], userIds=g["users"]) for g in self.workspace.user_groups]
+
+
+class FakeAnthropic:
+    """Stands in for `anthropic.AsyncAnthropic`: `messages.create` sleeps and returns canned JSON."""
+
+    def __init__(self, *, latency: float) -> None:
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        self.messages = self
+
+    def __call__(self, **client_kwargs: Any) -> "FakeAnthropic":
+        # AnthropicService builds a client per call
+        return self
+
+    async def create(self, *, system: str, messages: list[dict[str, Any]], **kwargs: Any) -> Any:
+        prompt = messages[0]["content"]
+        input_tokens = (len(system) + len(prompt)) // 4
+        self.calls["anthropic.messages"] += 1
+        self.calls["anthropic.input_tokens"] += input_tokens
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if '"title": "LLMGeneratedInsights"' in prompt:
+            text = json.dumps(
+                {
+                    "insights": [
+                        {
+                            "scope": "team",
+                            "title": "Review load is rising",
+                            "summary": "Reviews wait longer than last period.",
+                            "recommendation": "Rotate a review buddy each week.",
+                            "severity": "Medium",
+                            "category": "workload",
+                            "confidence": 0.6,
+                        }
+                    ]
+                }
+            )
+        else:
+            text = '{"overallSentiment": 0.2, "burnoutRiskLevel": "Low", "items": []}'
+        self.calls["anthropic.output_tokens"] += len(text) // 4
+        usage = type("Usage", (), {"input_tokens": input_tokens, "output_tokens": len(text) // 4})()
+        return type("Response", (), {"content": [type("Block", (), {"text": text})()], "usage": usage})()
+
+
+def _reset_caches() -> None:
+    message_store.clear()
+    user_store.refresh()
+    team_directory.refresh()
+
+
+async def _timed(call: Callable[[], Awaitable[Any]]) -> float:
+    started = time.perf_counter()
+    await call()
+    return (time.perf_counter() - started) * 1000.0
+
+
+def _summary(samples: list[float]) -> dict[str, float]:
+    return {"min": round(min(samples), 2), "median": round(statistics.median(samples), 2), "max": round(max(samples), 2)}
+
+
+async def _bench_method(call: Callable[[], Awaitable[Any]], counts: Callable[[], dict[str, float]], repeat: int) -> dict[str, Any]:
+    # Call counts and peak memory of one cold run; tracemalloc slows everything down, so
+    # latencies come from separate runs
+    _reset_caches()
+    gc.collect()
+    before = counts()
+    tracemalloc.start()
+    await call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    calls = {k: v - before.get(k, 0) for k, v in counts().items() if v != before.get(k, 0)}
+
+    cold: list[float] = []
+    for _ in range(repeat):
+        _reset_caches()
+        cold.append(await _timed(call))
+    warm = [await _timed(call) for _ in range(repeat)]
+    return {"cold_ms": _summary(cold), "warm_ms": _summary(warm), "peak_mb": round(peak / 1e6, 2), "calls": dict(sorted(calls.items()))}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+async def run(
+    spec: WorkspaceSpec,
+    *,
+    ranges: list[TimeRange],
+    methods: Optional[list[str]] = None,
+    repeat: int = 3,
+    slack_latency_ms: float = 20.0,
+    llm_latency_ms: float = 50.0,
+    use_llm: bool = True,
+    slack_url: Optional[str] = None,
+    slack_token: str = DEFAULT_TOKEN,
+) -> dict[str, Any]:
+    import anthropic
+
+    settings = get_settings()
+    saved = {
+        name: getattr(settings, name)
+        for name in ("anthropic_api_key", "anthropic_api_base", "llm_calls_per_minute_per_tenant", "slack_api_base")
+    }
+    llm = FakeAnthropic(latency=llm_latency_ms / 1000.0)
+    slack: Any
+    team_token = None
+    if slack_url:
+        settings.slack_api_base = slack_url
+        get_state_backend().save_installation(Installation(team_id=TEAM["id"], team_name=TEAM["name"], access_token=slack_token))
+        team_token = set_requested_team(TEAM["id"])
+        slack = SlackService()
+        workspace_meta: dict[str, Any] = {**spec.as_dict(), "slack_url": slack_url}
+    else:
+        started = time.perf_counter()
+        workspace = Workspace(spec)
+        workspace_meta = {**spec.as_dict(), **workspace.stats(), "generated_s": round(time.perf_counter() - started, 2)}
+        slack = FakeSlack(workspace, latency=slack_latency_ms / 1000.0)
+
+    def counts() -> dict[str, float]:
+        if isinstance(slack, FakeSlack):
+            return {**slack.calls, **llm.calls}
+        http = {f"slack.{method} {status}": n for (method, status), n in telemetry.SLACK_CALLS.snapshot().items()}
+        return {**http, **llm.calls}
+
+    saved_client = anthropic.AsyncAnthropic
+    settings.anthropic_api_key = "bench" if use_llm else None
+    settings.anthropic_api_base = None
+    settings.llm_calls_per_minute_per_tenant = 0  # every analysis reaches the (fake) LLM
+    get_llm_quota.cache_clear()
+    anthropic.AsyncAnthropic = llm  # type: ignore[misc,assignment]
+    try:
+        services: _Services = (
+            DashboardService(slack=slack, anthropic=AnthropicService()),  # type: ignore[arg-type]
+            MetricsService(slack=slack, anthropic=AnthropicService()),  # type: ignore[arg-type]
+            InsightsService(slack=slack, anthropic=AnthropicService()),  # type: ignore[arg-type]
+        )
+        results = []
+        for name, method in METHODS:
+            if methods and name not in methods:
+                continue
+            for time_range in ranges:
+                result = await _bench_method(lambda: method(services, time_range), counts, repeat)
+                results.append({"method": name, "range": time_range, **result})
+                print(
+                    f"{name:<34} {time_range:<8} cold {result['cold_ms']['median']:9.1f} ms"
+                    f"   warm {result['warm_ms']['median']:8.1f} ms   peak {result['peak_mb']:7.2f} MB",
+                    file=sys.stderr,
+                )
+    finally:
+        if isinstance(slack, SlackService):
+            await slack.aclose()
+        anthropic.AsyncAnthropic = saved_client  # type: ignore[misc]
+        for name, value in saved.items():
+            setattr(settings, name, value)
+        get_llm_quota.cache_clear()
+        _reset_caches()
+        if team_token is not None:
+            reset_requested_team(team_token)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "workspace": workspace_meta,
+            "repeat": repeat,
+            "slack_latency_ms": None if slack_url else slack_latency_ms,
+            "llm_latency_ms": llm_latency_ms if use_llm else None,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], *, threshold: float) -> list[str]:
+    """Lines describing results whose median latency or peak memory grew by more than `threshold`x."""
+    before = {(r["method"], r["range"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in current["results"]:
+        old = before.get((r["method"], r["range"]))
+        if old is None:
+            continue
+        checks = [
+            ("cold", old["cold_ms"]["median"], r["cold_ms"]["median"]),
+            ("warm", old["warm_ms"]["median"], r["warm_ms"]["median"]),
+            ("peak", old["peak_mb"], r["peak_mb"]),
+        ]
+        for label, was, now in checks:
+            # Ignore sub-millisecond / sub-100 KB noise
+            floor = 0.1 if label == "peak" else 1.0
+            if now > max(was, floor) * threshold:
+                regressions.append(f"{r['method']} {r['range']} {label}: {was} -> {now} ({now / max(was, floor):.2f}x)")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Latency, call counts and peak memory of service methods on a synthetic workspace")
+    add_workspace_arguments(parser)
+    parser.add_argument("--ranges", default="week,month", help="LLM-backed series make one call per bucket, so long ranges are slow")
+    parser.add_argument("--methods", default="", help="comma-separated subset, e.g. dashboard.kpi,insights.team_insights")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--slack-latency-ms", type=float, default=20.0, help="per API page")
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--no-llm", action="store_true", help="no API key: heuristic analysis only")
+    parser.add_argument("--slack-url", help="use SlackService over HTTP against this base URL, e.g. a fake_slack at http://127.0.0.1:8765/api")
+    parser.add_argument("--slack-token", default=DEFAULT_TOKEN)
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="baseline results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.25, help="regression ratio for --compare")
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        run(
+            spec_from_args(args),
+            ranges=[r.strip() for r in args.ranges.split(",") if r.strip()],  # type: ignore[misc]
+            methods=[m.strip() for m in args.methods.split(",") if m.strip()] or None,
+            repeat=args.repeat,
+            slack_latency_ms=args.slack_latency_ms,
+            llm_latency_ms=args.llm_latency_ms,
+            use_llm=not args.no_llm,
+            slack_url=args.slack_url,
+            slack_token=args.slack_token,
+        )
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), threshold=args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
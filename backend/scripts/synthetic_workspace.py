@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+# Seeded synthetic Slack workspace: channels, members, user groups, channel history and
+# thread replies as raw Slack Web API objects (the dicts `conversations.*`, `users.list`
+# and `usergroups.list` return), so consumers run the same decode paths as production.
+# The same spec and seed always produce the same workspace, relative to `now`.
+
+_DAY = 24 * 60 * 60
+
+_EMOJIS = ["tada", "rocket", "+1", "eyes", "fire", "heart", "white_check_mark", "pray", "sweat_smile", "coffee"]
+_TEAMS = ["Platform", "Payments", "Growth", "Mobile", "Data", "Design", "Support", "Security", "Infra", "Sales"]
+_TOPICS = ["deploy", "review", "incident", "roadmap", "standup", "release", "migration", "onboarding", "retro"]
+_POSITIVE = ["thanks team, great work on the {t}", "shipped the {t}, nice job everyone", "love how the {t} turned out"]
+_NEUTRAL = ["status update on the {t}", "can someone take a look at the {t}?", "moving the {t} to tomorrow"]
+_NEGATIVE = [
+    "blocked on the {t} again, this is frustrating",
+    "exhausted after the {t}, working late all week",
+    "the {t} is overdue and we are overwhelmed",
+]
+
+
+@dataclass(frozen=True)
+class WorkspaceSpec:
+    channels: int = 20
+    users: int = 200
+    messages_per_day: float = 40.0  # per channel
+    days: int = 90
+    reaction_density: float = 0.3  # share of messages with reactions
+    thread_ratio: float = 0.1  # share of messages that start a thread
+    replies_per_thread: int = 4  # mean
+    user_groups: int = 8
+    seed: int = 7
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class Workspace:
+    """A generated workspace; history is kept oldest-first per channel for range lookups."""
+
+    def __init__(self, spec: WorkspaceSpec, *, now: Optional[float] = None) -> None:
+        self.spec = spec
+        self.now = time.time() if now is None else now
+        rng = random.Random(spec.seed)
+        self.users = [self._user(i, rng) for i in range(spec.users)]
+        user_ids = [u["id"] for u in self.users]
+        self.user_groups = [
+            {
+                "id": f"S{i:07d}",
+                "name": _TEAMS[i % len(_TEAMS)] + ("" if i < len(_TEAMS) else f" {i // len(_TEAMS) + 1}"),
+                "handle": f"team-{i}",
+                "users": user_ids[i :: max(1, spec.user_groups)],
+            }
+            for i in range(spec.user_groups)
+        ]
+        self.channels = [
+            {"id": f"C{i:07d}", "name": f"{_TOPICS[i % len(_TOPICS)]}-{i}", "is_private": i % 7 == 6, "is_archived": False}
+            for i in range(spec.channels)
+        ]
+        self.history: dict[str, list[dict[str, Any]]] = {}
+        self.replies: dict[tuple[str, str], list[dict[str, Any]]] = {}
+        self._ts: dict[str, list[float]] = {}
+        for channel in self.channels:
+            self._channel_history(channel["id"], user_ids, rng)
+
+    @staticmethod
+    def _user(i: int, rng: random.Random) -> dict[str, Any]:
+        name = f"user{i:05d}"
+        return {
+            "id": f"U{i:07d}",
+            "name": name,
+            "deleted": False,
+            "is_bot": rng.random() < 0.02,
+            "profile": {"real_name": f"User {i:05d}", "image_48": f"https://avatars.example/{name}.png"},
+        }
+
+    def _message(self, ts: float, user_ids: list[str], rng: random.Random) -> dict[str, Any]:
+        roll = rng.random()
+        templates = _NEGATIVE if roll < 0.15 else _POSITIVE if roll < 0.45 else _NEUTRAL
+        message: dict[str, Any] = {
+            "type": "message",
+            "ts": f"{ts:.6f}",
+            "user": rng.choice(user_ids),
+            "text": rng.choice(templates).format(t=rng.choice(_TOPICS)),
+        }
+        if rng.random() < self.spec.reaction_density:
+            reactions = []
+            for name in rng.sample(_EMOJIS, rng.randint(1, 3)):
+                users = rng.sample(user_ids, min(len(user_ids), rng.randint(1, 4)))
+                reactions.append({"name": name, "users": users, "count": len(users)})
+            message["reactions"] = reactions
+        return message
+
+    def _channel_history(self, channel_id: str, user_ids: list[str], rng: random.Random) -> None:
+        spec = self.spec
+        total = int(spec.messages_per_day * spec.days)
+        start = self.now - spec.days * _DAY
+        stamps = sorted(start + rng.random() * spec.days * _DAY for _ in range(total))
+        history: list[dict[str, Any]] = []
+        for ts in stamps:
+            message = self._message(ts, user_ids, rng)
+            if rng.random() < spec.thread_ratio:
+                count = max(1, int(rng.expovariate(1.0 / max(1, spec.replies_per_thread))))
+                root = message["ts"]
+                offsets = sorted(rng.uniform(30, 6 * 3600) for _ in range(count))
+                replies = [
+                    {**self._message(min(ts + o, self.now - 1), user_ids, rng), "thread_ts": root} for o in offsets
+                ]
+                message.update(thread_ts=root, reply_count=count, latest_reply=replies[-1]["ts"])
+                self.replies[(channel_id, root)] = replies
+            history.append(message)
+        self.history[channel_id] = history
+        self._ts[channel_id] = [float(m["ts"]) for m in history]
+
+    def messages(self, channel_id: str, *, oldest: Optional[float] = None, latest: Optional[float] = None) -> list[dict[str, Any]]:
+        """Channel messages with oldest < ts < latest, newest first (as `conversations.history` pages them)."""
+        stamps = self._ts.get(channel_id, [])
+        lo = bisect_right(stamps, oldest) if oldest is not None else 0
+        hi = bisect_left(stamps, latest) if latest is not None else len(stamps)
+        return self.history.get(channel_id, [])[lo:hi][::-1]
+
+    def thread(self, channel_id: str, thread_ts: str) -> list[dict[str, Any]]:
+        """Root followed by its replies, oldest first (as `conversations.replies` pages them)."""
+        stamps = self._ts.get(channel_id, [])
+        i = bisect_left(stamps, float(thread_ts))
+        root = self.history[channel_id][i : i + 1] if i < len(stamps) and stamps[i] == float(thread_ts) else []
+        return root + self.replies.get((channel_id, thread_ts), [])
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "channels": len(self.channels),
+            "users": len(self.users),
+            "messages": sum(len(h) for h in self.history.values()),
+            "threads": len(self.replies),
+            "replies": sum(len(r) for r in self.replies.values()),
+        }
+
+
+def add_workspace_arguments(parser: argparse.ArgumentParser) -> None:
+    """Workspace shape flags, shared by the benchmarks and the fake Slack server."""
+    parser.add_argument("--channels", type=int, default=20)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--messages-per-day", type=float, default=40.0, help="per channel")
+    parser.add_argument("--days", type=int, default=90, help="history length; 'year' needs 365")
+    parser.add_argument("--reaction-density", type=float, default=0.3)
+    parser.add_argument("--thread-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=7)
+
+
+def spec_from_args(args: argparse.Namespace) -> WorkspaceSpec:
+    return WorkspaceSpec(
+        channels=args.channels,
+        users=args.users,
+        messages_per_day=args.messages_per_day,
+        days=args.days,
+        reaction_density=args.reaction_density,
+        thread_ratio=args.thread_ratio,
+        seed=args.seed,
+    )
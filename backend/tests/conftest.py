@@ -1,7 +1,109 @@
+import asyncio
 import os
 import sys
+import time
+from collections import Counter
+from typing import Iterable, Mapping, Optional
+
+import pytest
 
 # Add project root to Python path for imports like `from app.main import app`
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if PROJECT_ROOT not in sys.path:
 	sys.path.insert(0, PROJECT_ROOT)
+
+from app.core import tracing  # noqa: E402
+from app.models.pydantic_types import SlackChannel, SlackConnection, SlackSelectedChannels  # noqa: E402
+from app.services.message_batch import MessageBatch  # noqa: E402
+
+
+class FakeSlack:
+	"""In-memory stand-in for SlackService with configurable history, latency and call counts.
+
+	Without `messages`, every channel has `count` recent messages ten minutes apart, written by
+	`users` distinct users. `latency` delays every history fetch and `channel_latency` overrides
+	it per channel. With `paged`, history is returned newest first and capped at
+	`limit * max_pages` messages, like the paginated client. `calls` counts calls per method,
+	`history` records (channel, oldest) per history fetch and `threads` the fetched thread ts.
+	"""
+
+	def __init__(
+		self,
+		channels: Iterable[str] = ("C1", "C2"),
+		*,
+		team: str = "T-fake",
+		selected: Iterable[str] = (),
+		messages: Optional[list[dict]] = None,
+		count: int = 5,
+		users: int = 3,
+		text: str = "ok",
+		reactions: Optional[list[dict]] = None,
+		replies: Optional[Mapping[float, MessageBatch]] = None,
+		latency: float = 0.0,
+		channel_latency: Optional[Mapping[str, float]] = None,
+		paged: bool = False,
+	) -> None:
+		self.channels = list(channels)
+		self.team = team
+		self.selected = list(selected)
+		self.messages = messages
+		self.count, self.users, self.text, self.reactions = count, users, text, reactions
+		self.replies = dict(replies or {})
+		self.latency = latency
+		self.channel_latency = dict(channel_latency or {})
+		self.paged = paged
+		self.calls: Counter[str] = Counter()
+		self.history: list[tuple[str, Optional[str]]] = []
+		self.threads: list[str] = []
+
+	def active_team_key(self) -> str:
+		return self.team
+
+	def is_connected(self) -> bool:
+		return True
+
+	async def get_connection(self) -> SlackConnection:
+		self.calls["get_connection"] += 1
+		return SlackConnection(teamId=self.team, teamName="Fake", isConnected=True)
+
+	async def list_channels(self) -> list[SlackChannel]:
+		self.calls["list_channels"] += 1
+		return [SlackChannel(id=cid, name=cid.lower()) for cid in self.channels]
+
+	async def get_selected_channels(self) -> SlackSelectedChannels:
+		self.calls["get_selected_channels"] += 1
+		return SlackSelectedChannels(channels=[SlackChannel(id=cid, name=cid.lower()) for cid in self.selected])
+
+	def _raw_history(self) -> list[dict]:
+		if self.messages is not None:
+			return self.messages
+		now = time.time()
+		extra = {"reactions": self.reactions} if self.reactions else {}
+		return [
+			{"ts": f"{now - i * 600:.6f}", "user": f"U{i % self.users}", "text": self.text, **extra}
+			for i in range(1, self.count + 1)
+		]
+
+	@tracing.traced("slack.get_channel_batch")
+	async def get_channel_batch(self, channel_id, oldest=None, latest=None, limit=200, *, with_text=True, max_pages=1):
+		self.calls["get_channel_batch"] += 1
+		self.history.append((channel_id, oldest))
+		delay = self.channel_latency.get(channel_id, self.latency)
+		if delay:
+			await asyncio.sleep(delay)
+		floor = float(oldest or 0)
+		raw = [m for m in self._raw_history() if float(m["ts"]) > floor]
+		if self.paged:
+			raw = sorted(raw, key=lambda m: -float(m["ts"]))[: limit * max_pages]
+		return MessageBatch.from_slack_payload(channel_id, raw, with_text=with_text)
+
+	async def get_thread_replies(self, channel_id, thread_ts, *, with_text=False):
+		self.calls["get_thread_replies"] += 1
+		self.threads.append(thread_ts)
+		return self.replies[float(thread_ts)]
+
+
+@pytest.fixture
+def fake_slack():
+	"""The FakeSlack class, for building a configured fake per test."""
+	return FakeSlack
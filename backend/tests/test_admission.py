@@ -0,0 +1,74 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.core import admission
+from app.core.admission import AdmissionController, get_admission
+from app.main import app
+from app.models.pydantic_types import SlackMessage
+from app.services.anthropic_service import AnthropicService
+
+client = TestClient(app)
+
+
+def _controller() -> AdmissionController:
+    return AdmissionController(degrade_in_flight=2, shed_in_flight=4, degrade_lag_ms=100, shed_lag_ms=500)
+
+
+def test_mode_follows_llm_in_flight_and_loop_lag():
+    async def run() -> list[str]:
+        ctrl = _controller()
+        modes = [ctrl.mode()]
+        async with ctrl.llm_call(), ctrl.llm_call():
+            modes.append(ctrl.mode())
+            async with ctrl.llm_call(), ctrl.llm_call():
+                modes.append(ctrl.mode())
+        modes.append(ctrl.mode())
+        ctrl.record_lag(600)
+        modes.append(ctrl.mode())
+        ctrl.record_lag(0)  # decays instead of dropping straight back
+        modes.append(ctrl.mode())
+        return modes
+
+    assert asyncio.run(run()) == ["normal", "degraded", "saturated", "normal", "saturated", "degraded"]
+
+
+def test_saturated_sheds_low_priority_routes_only():
+    ctrl = get_admission()
+    ctrl.llm_in_flight = ctrl.shed_in_flight
+    try:
+        shed = client.post("/api/v1/insights/analyze", json={"messages": []})
+        health = client.get("/api/v1/health")
+    finally:
+        ctrl.llm_in_flight = 0
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "5"
+    assert shed.headers["X-Degradation-Mode"] == "saturated"
+    assert health.status_code == 200
+    assert health.headers["X-Degradation-Mode"] == "saturated"
+
+    resp = client.get("/api/v1/health")
+    assert resp.headers["X-Degradation-Mode"] == "normal"
+    stats = client.get("/api/v1/health/admission").json()
+    assert stats["mode"] == "normal" and stats["shed"] >= 1
+
+
+def test_degraded_request_scores_heuristically(monkeypatch):
+    svc = AnthropicService()
+    monkeypatch.setattr(svc.settings, "anthropic_api_key", "test-key")
+
+    async def no_llm(*args, **kwargs):
+        raise AssertionError("LLM called while degraded")
+
+    monkeypatch.setattr(svc, "generate_structured", no_llm)
+    messages = [SlackMessage(id="1", userId="U1", text="great work, thanks!", ts="1700000000.0")]
+
+    async def run():
+        token = admission._REQUEST_MODE.set("degraded")
+        try:
+            return await svc.analyze_slack_messages(messages)
+        finally:
+            admission._REQUEST_MODE.reset(token)
+
+    summary = asyncio.run(run())
+    assert summary.overallSentiment > 0
@@ -0,0 +1,95 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_anthropic_service, get_slack_service
+from app.main import app
+from app.models.pydantic_types import LLMAnalysisSummary
+from app.services import message_store
+
+client = TestClient(app)
+
+TADA = [{"name": "tada", "users": ["U1"]}]
+
+
+class _CountingAnthropic:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def analyze_slack_messages(self, messages, **_):
+        self.calls += 1
+        return LLMAnalysisSummary(overallSentiment=0.25, burnoutRiskLevel="Low")
+
+
+def test_batch_fetches_each_channel_once(fake_slack):
+    message_store.clear()
+    slack, anthropic = fake_slack(reactions=TADA), _CountingAnthropic()
+    app.dependency_overrides[get_slack_service] = lambda: slack
+    app.dependency_overrides[get_anthropic_service] = lambda: anthropic
+    queries = [
+        {"id": "kpi", "kind": "dashboard.kpi", "channelIds": ["C1", "C2"]},
+        {"id": "channels", "kind": "dashboard.channels", "channelIds": ["C1", "C2"]},
+        {"id": "trend", "kind": "dashboard.trend", "channelIds": ["C1", "C2"]},
+        {"id": "totals", "kind": "metrics.entity-totals", "perspective": "channel", "channelIds": ["C1", "C2"]},
+        {"id": "emojis", "kind": "metrics.top-emojis", "channelIds": ["C1", "C2"], "limit": 3},
+    ]
+    try:
+        r = client.post("/api/v1/batch", json={"queries": queries})
+    finally:
+        app.dependency_overrides.pop(get_slack_service)
+        app.dependency_overrides.pop(get_anthropic_service)
+        message_store.clear()
+    assert r.status_code == 200
+    results = {item["id"]: item for item in r.json()["results"]}
+    assert list(results) == ["kpi", "channels", "trend", "totals", "emojis"]
+    assert all(item["ok"] for item in results.values())
+    assert results["kpi"]["result"] == {"avgSentiment": 0.25, "burnoutRiskCount": 0, "monitoredChannels": 2, "partial": False}
+    assert {m["name"] for m in results["channels"]["result"]} == {"c1", "c2"}
+    assert results["emojis"]["result"] == [{"emoji": "🎉", "count": 10, "partial": False}]
+    # One history fetch per channel and one channel listing for all five queries
+    assert slack.calls["get_channel_batch"] == 2
+    assert slack.calls["list_channels"] == 1
+    # KPI and channel metrics score the same two windows; the trend adds its non-empty bucket(s)
+    assert anthropic.calls <= 4
+
+
+def test_batch_validates_queries():
+    assert client.post("/api/v1/batch", json={"queries": []}).status_code == 422
+    assert client.post("/api/v1/batch", json={"queries": [{"kind": "dashboard.nope"}]}).status_code == 422
+
+
+def _run_batch(slack, queries, params=""):
+    message_store.clear()
+    app.dependency_overrides[get_slack_service] = lambda: slack
+    app.dependency_overrides[get_anthropic_service] = _CountingAnthropic
+    try:
+        return client.post(f"/api/v1/batch{params}", json={"queries": queries})
+    finally:
+        app.dependency_overrides.pop(get_slack_service)
+        app.dependency_overrides.pop(get_anthropic_service)
+        message_store.clear()
+
+
+def test_batch_prefetches_only_the_channels_each_query_reads(fake_slack):
+    slack = fake_slack(selected=["C1"], reactions=TADA)
+    # Heatmaps and burnout series only cover selected channels, so C2 is never fetched
+    queries = [
+        {"id": "heatmap", "kind": "dashboard.heatmap", "channelIds": ["C1", "C2"]},
+        {"id": "burnout", "kind": "dashboard.burnout-series", "channelIds": ["C1", "C2"]},
+    ]
+    r = _run_batch(slack, queries)
+    assert r.status_code == 200
+    assert all(item["ok"] for item in r.json()["results"])
+    assert [cid for cid, _ in slack.history] == ["C1"]
+
+
+def test_batch_prefetch_honours_the_deadline(fake_slack):
+    # C1 is selected out of C1/C2; history for C-slow takes a second
+    slack = fake_slack(selected=["C1"], reactions=TADA, channel_latency={"C-slow": 1.0})
+    started = time.perf_counter()
+    r = _run_batch(slack, [{"id": "channels", "kind": "dashboard.channels", "channelIds": ["C1", "C-slow"]}], "?timeout_ms=300")
+    elapsed = time.perf_counter() - started
+    assert r.status_code == 200
+    assert elapsed < 1.0
+    rows = {m["id"]: m["partial"] for m in r.json()["results"][0]["result"]}
+    assert rows == {"C1": False, "C-slow": True}
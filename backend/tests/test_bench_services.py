@@ -0,0 +1,65 @@
+import asyncio
+
+import httpx
+
+from app.core.config import get_settings
+from scripts.bench_services import compare, run
+from scripts.fake_slack import create_app
+from scripts.synthetic_workspace import Workspace, WorkspaceSpec
+
+SPEC = WorkspaceSpec(channels=3, users=20, messages_per_day=10, days=14, seed=3)
+
+
+def test_synthetic_workspace_is_seeded_and_range_queryable():
+    a, b = Workspace(SPEC, now=1_700_000_000.0), Workspace(SPEC, now=1_700_000_000.0)
+    assert a.history == b.history and a.replies == b.replies
+    assert a.stats()["messages"] == 3 * 10 * 14
+    week = a.messages("C0000000", oldest=1_700_000_000.0 - 7 * 86400)
+    assert week and all(float(m["ts"]) > 1_700_000_000.0 - 7 * 86400 for m in week)
+    assert [m["ts"] for m in week] == sorted((m["ts"] for m in week), reverse=True)
+    (channel, root), replies = next(iter(a.replies.items()))
+    thread = a.thread(channel, root)
+    assert thread[0]["ts"] == root and thread[0]["reply_count"] == len(replies) == len(thread) - 1
+
+
+def test_bench_reports_latency_calls_and_memory_per_method_and_range():
+    report = asyncio.run(
+        run(
+            SPEC,
+            ranges=["week", "month"],
+            methods=["dashboard.kpi", "metrics.entity_totals_channel"],
+            repeat=1,
+            slack_latency_ms=0,
+            llm_latency_ms=0,
+        )
+    )
+    assert report["meta"]["workspace"]["channels"] == 3
+    assert [(r["method"], r["range"]) for r in report["results"]] == [
+        ("dashboard.kpi", "week"),
+        ("dashboard.kpi", "month"),
+        ("metrics.entity_totals_channel", "week"),
+        ("metrics.entity_totals_channel", "month"),
+    ]
+    kpi, _, totals, _ = report["results"]
+    assert kpi["calls"]["slack.get_channel_batch"] == 3
+    assert kpi["calls"]["anthropic.messages"] >= 1
+    assert totals["calls"]["slack.get_thread_replies"] > 0
+    assert all(r["peak_mb"] > 0 and r["cold_ms"]["median"] > 0 for r in report["results"])
+
+    slower = {**report, "results": [{**r, "cold_ms": {**r["cold_ms"], "median": r["cold_ms"]["median"] * 3 + 5}} for r in report["results"]]}
+    assert len(compare(slower, report, threshold=1.25)) == 4
+    assert compare(report, report, threshold=1.25) == []
+
+
+def test_bench_can_drive_slack_service_over_http(monkeypatch):
+    fake_app = create_app(Workspace(SPEC), rate_limit_scale=0)
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kw: real_client(transport=httpx.ASGITransport(app=fake_app), **kw))
+    report = asyncio.run(
+        run(SPEC, ranges=["week"], methods=["metrics.top_emojis"], repeat=1, slack_url="http://fake-slack.test/api")
+    )
+    (result,) = report["results"]
+    assert report["meta"]["workspace"]["slack_url"] == "http://fake-slack.test/api"
+    assert result["calls"]["slack.conversations.history 200"] == 3
+    assert result["calls"]["slack.conversations.list 200"] == 1
+    assert get_settings().slack_api_base == "https://slack.com/api"
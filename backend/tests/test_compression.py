@@ -0,0 +1,68 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import compression
+from app.core.serialization import COMPACT_MEDIA_TYPE, unpack_array
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_negotiate_prefers_highest_q(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert compression.negotiate("gzip, deflate") == "gzip"
+    assert compression.negotiate("br;q=1.0, gzip;q=0.5") == "gzip"
+    assert compression.negotiate("gzip;q=0, identity") is None
+    assert compression.negotiate("") is None
+    monkeypatch.setattr(compression, "brotli", object())
+    assert compression.negotiate("gzip, br") == "br"
+    assert compression.negotiate("br;q=0.2, gzip;q=0.8") == "gzip"
+
+
+def test_large_responses_are_gzipped_small_and_sse_are_not():
+    r = client.get("/openapi.json")
+    assert r.headers["content-encoding"] == "gzip" and "Accept-Encoding" in r.headers["vary"]
+    raw = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in raw.headers and raw.json() == r.json()
+    assert int(r.headers["content-length"]) < len(raw.content)
+
+    assert "content-encoding" not in client.get("/api/v1/health").headers
+    sse = client.get("/api/v1/dashboard/stream/trend?range=week")
+    assert "content-encoding" not in sse.headers
+
+
+def test_streamed_bodies_compress_incrementally():
+    async def streaming_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        for chunk in (b"a" * 600, b"b" * 600):
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    r = TestClient(compression.CompressionMiddleware(streaming_app)).get("/", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip" and "content-length" not in r.headers
+    assert r.content == b"a" * 600 + b"b" * 600
+
+
+def test_compact_heatmap_and_trend_round_trip():
+    url = "/api/v1/dashboard/heatmap?grouping=channels&metric=sentiment&range=month"
+    full = client.get(url).json()
+    r = client.get(url, headers={"Accept": COMPACT_MEDIA_TYPE})
+    assert r.headers["content-type"].startswith(COMPACT_MEDIA_TYPE) and r.headers["vary"].startswith("Accept")
+    compact = r.json()
+    assert compact["rows"] == full["rows"] and compact["values"]["shape"] == [len(full["rows"]), len(full["cols"])]
+    flat = [v for row in full["values"] for v in row]
+    assert unpack_array(compact["values"]) == pytest.approx(flat, abs=1e-6)
+
+    points = client.get("/api/v1/dashboard/trend?range=week").json()
+    columns = client.get("/api/v1/dashboard/trend?range=week&encoding=compact").json()
+    assert columns["label"] == [p["label"] for p in points]
+    assert unpack_array(columns["messageCount"]) == [p["messageCount"] for p in points]
+    assert unpack_array(columns["avgSentiment"]) == pytest.approx([p["avgSentiment"] for p in points], abs=1e-6)
+
+
+def test_compact_burnout_series():
+    full = client.get("/api/v1/dashboard/burnout-series?range=week").json()
+    compact = client.get("/api/v1/dashboard/burnout-series?range=week&encoding=compact").json()
+    assert compact["label"] == full["label"] and compact["series"].keys() == full["series"].keys()
+    name, points = next(iter(full["series"].items()))
+    assert unpack_array(compact["series"][name]["value"]) == [p["value"] for p in points]
@@ -1,3 +1,5 @@
+import json
+
 from fastapi.testclient import TestClient
 
 from app.main import app
@@ -22,4 +24,35 @@ def test_channels_and_kpi():
     r2 = client.get("/api/v1/dashboard/kpi")
     assert r2.status_code == 200
     kpi = r2.json()
-    assert set(kpi.keys()) == {"avgSentiment", "burnoutRiskCount", "monitoredChannels"}
+    assert set(kpi.keys()) == {"avgSentiment", "burnoutRiskCount", "monitoredChannels", "partial"}
+
+
+def _sse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_heatmap_stream_matches_heatmap():
+    params = "grouping=channels&metric=messages&range=month"
+    full = client.get(f"/api/v1/dashboard/heatmap?{params}").json()
+    r = client.get(f"/api/v1/dashboard/stream/heatmap?{params}")
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/event-stream")
+    events = _sse_events(r.text)
+    assert events[0][0] == "meta" and events[0][1]["cols"] == full["cols"]
+    assert events[-1][0] == "done"
+    rows = sorted((d["index"], d["name"], d["values"]) for e, d in events if e == "row")
+    assert [name for _, name, _ in rows] == full["rows"]
+    assert [values for _, _, values in rows] == full["values"]
+    progress = [d for e, d in events if e == "progress"]
+    assert progress[-1] == {"done": len(full["rows"]), "total": len(full["rows"])}
+
+
+def test_burnout_and_trend_streams():
+    series = _sse_events(client.get("/api/v1/dashboard/stream/burnout-series?range=week").text)
+    assert [e for e, _ in series if e == "series"] and series[-1][0] == "done"
+    trend = _sse_events(client.get("/api/v1/dashboard/stream/trend?range=week").text)
+    points = [d["point"] for e, d in trend if e == "point"]
+    assert len(points) == 7 and {"date", "label", "avgSentiment", "messageCount"} <= points[0].keys()
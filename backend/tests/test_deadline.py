@@ -0,0 +1,125 @@
+import asyncio
+import json
+import time
+
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_anthropic_service, get_slack_service
+from app.core import deadline
+from app.main import app
+from app.models.pydantic_types import LLMAnalysisSummary
+from app.services import message_store
+
+client = TestClient(app)
+
+
+def test_bounded_falls_back_once_budget_is_spent():
+    async def run() -> list:
+        async def slow() -> str:
+            await asyncio.sleep(0.2)
+            return "done"
+
+        unbounded = await deadline.bounded(slow(), lambda: "fallback")
+        token = deadline.set_deadline(20)
+        try:
+            late = await deadline.bounded(slow(), lambda: "fallback")
+            work = asyncio.ensure_future(slow())
+            await asyncio.sleep(0.03)
+            spent = await deadline.bounded(work, lambda: "fallback", shield=True)
+            finished = await work  # shielded work keeps running
+        finally:
+            deadline.reset_deadline(token)
+        return [unbounded, late, spent, finished, deadline.remaining()]
+
+    assert asyncio.run(run()) == [("done", False), ("fallback", True), ("fallback", True), "done", None]
+
+
+def test_shielded_work_is_kept_and_its_failure_logged(caplog):
+    async def run() -> int:
+        async def failing() -> str:
+            await asyncio.sleep(0.05)
+            raise RuntimeError("slack down")
+
+        token = deadline.set_deadline(10)
+        try:
+            value = await deadline.bounded(failing(), lambda: "fallback", shield=True)
+        finally:
+            deadline.reset_deadline(token)
+        assert value == ("fallback", True)
+        held = len(deadline._BACKGROUND)
+        await asyncio.sleep(0.1)
+        return held
+
+    assert asyncio.run(run()) == 1
+    assert not deadline._BACKGROUND
+    assert "background work failed: RuntimeError('slack down')" in caplog.text
+
+
+def _slow_slack(fake_slack):
+    """C-fast answers at once; history for C-slow takes a second."""
+    return fake_slack(["C-fast", "C-slow"], count=3, channel_latency={"C-slow": 1.0})
+
+
+class _FastAnthropic:
+    async def analyze_slack_messages(self, messages, **_):
+        return LLMAnalysisSummary(overallSentiment=0.5, burnoutRiskLevel="Low")
+
+    def heuristic_analysis(self, messages):
+        return LLMAnalysisSummary(overallSentiment=0.0, burnoutRiskLevel="Low")
+
+
+def test_slow_channels_are_marked_partial(fake_slack):
+    message_store.clear()
+    slack = _slow_slack(fake_slack)
+    app.dependency_overrides[get_slack_service] = lambda: slack
+    app.dependency_overrides[get_anthropic_service] = _FastAnthropic
+    try:
+        started = time.perf_counter()
+        metrics = client.get("/api/v1/dashboard/channels?channel_ids=C-fast,C-slow&timeout_ms=300").json()
+        elapsed = time.perf_counter() - started
+        kpi = client.get("/api/v1/dashboard/kpi?channel_ids=C-fast,C-slow&timeout_ms=300").json()
+        totals = client.get("/api/v1/metrics/entity-totals?channel_ids=C-fast,C-slow&timeout_ms=300").json()
+    finally:
+        app.dependency_overrides.pop(get_slack_service)
+        app.dependency_overrides.pop(get_anthropic_service)
+        message_store.clear()
+    assert elapsed < 1.0
+    assert {m["id"]: m["partial"] for m in metrics} == {"C-fast": False, "C-slow": True}
+    assert {m["id"]: m["messages"] for m in metrics} == {"C-fast": 3, "C-slow": 0}
+    assert kpi["partial"] is True
+    assert {t["id"]: t["partial"] for t in totals} == {"C-fast": False, "C-slow": True}
+
+
+def test_compact_heatmap_keeps_partial_rows(fake_slack):
+    message_store.clear()
+    slack = _slow_slack(fake_slack)
+    app.dependency_overrides[get_slack_service] = lambda: slack
+    app.dependency_overrides[get_anthropic_service] = _FastAnthropic
+    try:
+        url = "/api/v1/dashboard/heatmap?grouping=channels&metric=messages&channel_ids=C-fast,C-slow&timeout_ms=300"
+        compact = client.get(url + "&encoding=compact").json()
+    finally:
+        app.dependency_overrides.pop(get_slack_service)
+        app.dependency_overrides.pop(get_anthropic_service)
+        message_store.clear()
+    assert compact["rows"] == ["c-fast", "c-slow"]
+    assert compact["partialRows"] == ["c-slow"]
+
+
+def test_stream_routes_honour_the_deadline(fake_slack):
+    message_store.clear()
+    slack = _slow_slack(fake_slack)
+    app.dependency_overrides[get_slack_service] = lambda: slack
+    app.dependency_overrides[get_anthropic_service] = _FastAnthropic
+    try:
+        started = time.perf_counter()
+        body = client.get("/api/v1/dashboard/stream/channels?channel_ids=C-fast,C-slow&timeout_ms=300").text
+        elapsed = time.perf_counter() - started
+    finally:
+        app.dependency_overrides.pop(get_slack_service)
+        app.dependency_overrides.pop(get_anthropic_service)
+        message_store.clear()
+    rows = [json.loads(frame.split("data: ", 1)[1]) for frame in body.split("\n\n") if frame.startswith("event: row")]
+    # The budget is enforced inside the stream body, after the dependencies have closed
+    assert elapsed < 1.0
+    assert {r["metric"]["id"]: r["metric"]["partial"] for r in rows} == {"C-fast": False, "C-slow": True}
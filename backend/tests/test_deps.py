@@ -0,0 +1,135 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_anthropic_service, get_slack_service
+from app.main import app
+from app.models.pydantic_types import LLMAnalysisSummary
+from app.services import dashboard_service, message_store
+from app.services.dashboard_service import DashboardService
+from app.services.live_updates import LiveHub, _Topic
+
+client = TestClient(app)
+
+
+class _FakeAnthropic:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def analyze_slack_messages(self, messages, **_):
+        self.calls += 1
+        return LLMAnalysisSummary(overallSentiment=0.5, burnoutRiskLevel="High")
+
+
+def test_services_are_singletons():
+    r1 = client.get("/api/v1/slack/connection")
+    services = app.state.services
+    r2 = client.get("/api/v1/slack/connection")
+    assert r1.status_code == r2.status_code == 200
+    assert app.state.services is services
+    assert services.dashboard.slack is services.slack is services.metrics.slack
+
+
+def test_overrides_flow_into_dependent_services(fake_slack):
+    message_store.clear()
+    anthropic = _FakeAnthropic()
+    slack = fake_slack()
+    app.dependency_overrides[get_slack_service] = lambda: slack
+    app.dependency_overrides[get_anthropic_service] = lambda: anthropic
+    try:
+        assert client.get("/api/v1/slack/connection").json()["teamName"] == "Fake"
+        kpi = client.get("/api/v1/dashboard/kpi?range=week&channel_ids=C1,C2").json()
+    finally:
+        app.dependency_overrides.pop(get_slack_service)
+        app.dependency_overrides.pop(get_anthropic_service)
+        message_store.clear()
+    assert kpi == {"avgSentiment": 0.5, "burnoutRiskCount": 2, "monitoredChannels": 2, "partial": False}
+    assert anthropic.calls == 2
+
+
+def test_live_websocket_starts_with_snapshot_and_shares_topic(fake_slack):
+    message_store.clear()
+    slack = fake_slack()
+    app.dependency_overrides[get_slack_service] = lambda: slack
+    app.dependency_overrides[get_anthropic_service] = _FakeAnthropic
+    try:
+        with client.websocket_connect("/api/v1/dashboard/live?range=week&channel_ids=C1") as first:
+            snapshot = first.receive_json()
+            with client.websocket_connect("/api/v1/dashboard/live?range=week&channel_ids=C1") as second:
+                assert second.receive_json() == snapshot
+                assert app.state.services.live.topic_count() == 1
+    finally:
+        app.dependency_overrides.pop(get_slack_service)
+        app.dependency_overrides.pop(get_anthropic_service)
+        message_store.clear()
+    assert snapshot["type"] == "snapshot"
+    assert snapshot["data"]["kpi"]["monitoredChannels"] == 1
+    assert [c["id"] for c in snapshot["data"]["channels"]] == ["C1"]
+    assert snapshot["data"]["trend"] is not None
+
+
+def test_live_recompute_rescores_only_changed_channels(fake_slack):
+    class _RecordingDashboard(DashboardService):
+        analyzed: list = []
+
+        async def _analyze(self, cid, messages):
+            self.analyzed.append(cid)
+            return await super()._analyze(cid, messages)
+
+    dashboard = _RecordingDashboard(fake_slack(), _FakeAnthropic())
+    hub = LiveHub(dashboard, interval=60)
+    topic = _Topic(key=("T-fake", "week", ("C1", "C2")), time_range="week", channel_ids=["C1", "C2"])
+
+    async def run(revision):
+        queue: asyncio.Queue = asyncio.Queue()
+        topic.subscribers = {queue}
+        await hub._recompute(topic, revision)
+        topic.revision = revision
+        return [queue.get_nowait() for _ in range(queue.qsize())]
+
+    message_store.clear()
+    try:
+        asyncio.run(run({"C1": 1, "C2": 1}))
+        first = [cid for cid in dashboard.analyzed if cid]
+        dashboard.analyzed.clear()
+        updates = asyncio.run(run({"C1": 2, "C2": 1}))
+    finally:
+        message_store.clear()
+    assert sorted(first) == ["C1", "C2"]
+    assert [cid for cid in dashboard.analyzed if cid] == ["C1"]
+    assert list(topic.channels) == ["C1", "C2"]
+    assert topic.kpi["monitoredChannels"] == 2 and topic.kpi["burnoutRiskCount"] == 2
+    changed = [m["id"] for kind, data in updates if kind == "channels" for m in data["changed"]]
+    assert set(changed) <= {"C1"}
+
+
+def test_live_topic_moves_with_time_when_no_messages_arrive(monkeypatch, fake_slack):
+    hub = LiveHub(DashboardService(fake_slack(["C1"]), _FakeAnthropic()), interval=60)
+    topic = _Topic(key=("T-fake", "week", ("C1",)), time_range="week", channel_ids=["C1"])
+
+    class _Later(datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime.utcnow() + timedelta(days=8)
+
+    async def run():
+        await hub._tick(topic)
+        before = (topic.revision, topic.kpi, topic.trend)
+        assert not hub._aged(topic)
+        # Eight days on and not one new message: the old ones fall out of the week
+        monkeypatch.setattr(dashboard_service, "datetime", _Later)
+        assert hub._aged(topic)
+        await hub._tick(topic)
+        return before
+
+    message_store.clear()
+    try:
+        revision, kpi, trend = asyncio.run(run())
+    finally:
+        message_store.clear()
+    assert topic.revision == revision
+    assert kpi["burnoutRiskCount"] == 1 and topic.kpi["burnoutRiskCount"] == 0
+    assert topic.channels["C1"]["messages"] == 0
+    assert topic.trend["label"] != trend["label"]
+    assert not hub._aged(topic)
@@ -0,0 +1,106 @@
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.core.tenancy import reset_requested_team, set_requested_team
+from app.services.slack_service import SlackService
+from app.services.state_backend import Installation, get_state_backend
+from scripts.fake_slack import DEFAULT_TOKEN, TEAM, RateLimiter, create_app
+from scripts.synthetic_workspace import Workspace, WorkspaceSpec
+
+WORKSPACE = Workspace(WorkspaceSpec(channels=230, users=450, messages_per_day=30, days=14, thread_ratio=0.2, seed=11))
+AUTH = {"Authorization": f"Bearer {DEFAULT_TOKEN}"}
+
+
+def _fake(**kwargs) -> TestClient:
+    return TestClient(create_app(WORKSPACE, **kwargs))
+
+
+def test_history_pages_with_cursors_newest_first():
+    fake = _fake(rate_limit_scale=0)
+    channel = WORKSPACE.channels[0]["id"]
+    oldest = WORKSPACE.now - 7 * 86400
+    seen, cursor, pages = [], "", 0
+    while True:
+        params = {"channel": channel, "oldest": str(oldest), "limit": 50, **({"cursor": cursor} if cursor else {})}
+        data = fake.get("/api/conversations.history", params=params, headers=AUTH).json()
+        assert data["ok"]
+        seen.extend(m["ts"] for m in data["messages"])
+        pages += 1
+        cursor = data["response_metadata"]["next_cursor"]
+        assert data["has_more"] == bool(cursor)
+        if not cursor:
+            break
+    assert seen == [m["ts"] for m in WORKSPACE.messages(channel, oldest=oldest)]
+    assert pages == -(-len(seen) // 50) > 1
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_auth_errors_and_tiered_rate_limits():
+    fake = _fake(rate_limit_scale=0.05)  # Tier 2 -> one users.list call per minute
+    assert fake.get("/api/users.list").json() == {"ok": False, "error": "not_authed"}
+    assert fake.get("/api/users.list", headers={"Authorization": "Bearer nope"}).json()["error"] == "invalid_auth"
+    assert fake.get("/api/users.list", headers=AUTH).json()["ok"]
+    limited = fake.get("/api/users.list", headers=AUTH)
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) >= 1
+    # Other methods have their own buckets
+    assert fake.get("/api/conversations.history", params={"channel": "C-missing"}, headers=AUTH).json() == {
+        "ok": False,
+        "error": "channel_not_found",
+    }
+    assert fake.get("/_stats").json()["requests"]["users.list"] == {"200": 3, "429": 1}
+
+
+def test_rate_limiter_refills_at_the_tier_rate():
+    limiter = RateLimiter(scale=1.0)
+    allowed = [limiter.retry_after("conversations.history", now=0.0) is None for _ in range(60)]
+    assert allowed.count(True) == 50  # Tier 3 burst
+    assert limiter.retry_after("conversations.history", now=0.5) == 1
+    assert limiter.retry_after("conversations.history", now=1.3) is None
+
+
+def test_slack_service_reads_the_fake_through_its_base_url(monkeypatch):
+    fake_app = create_app(WORKSPACE, rate_limit_scale=0)
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(get_settings(), "slack_api_base", "http://fake-slack.test/api/")
+    get_state_backend().save_installation(Installation(team_id=TEAM["id"], team_name=TEAM["name"], access_token=DEFAULT_TOKEN))
+    channel = WORKSPACE.channels[0]["id"]
+    root_ts, replies = next((root, r) for (cid, root), r in WORKSPACE.replies.items() if cid == channel)
+
+    clients: list[httpx.AsyncClient] = []
+
+    def make_client(**kw):
+        clients.append(real_client(transport=httpx.ASGITransport(app=fake_app), **kw))
+        return clients[-1]
+
+    monkeypatch.setattr(httpx, "AsyncClient", make_client)
+
+    async def ingest():
+        service = SlackService()
+        try:
+            return (
+                await service.list_channels(),
+                await service.list_users(),
+                await service.get_channel_batch(channel, limit=200, max_pages=20),
+                await service.get_thread_replies(channel, root_ts, with_text=True),
+            )
+        finally:
+            await service.aclose()
+
+    token = set_requested_team(TEAM["id"])
+    try:
+        channels, users, batch, thread = asyncio.run(ingest())
+    finally:
+        reset_requested_team(token)
+
+    stats = TestClient(fake_app).get("/_stats").json()["requests"]
+    assert len(channels) == 230 and stats["conversations.list"] == {"200": 2}
+    assert len(users) == 450 and stats["users.list"] == {"200": 3}
+    assert len(batch) == len(WORKSPACE.history[channel]) == 14 * 30
+    assert stats["conversations.history"] == {"200": 3}
+    assert list(thread.texts) == [r["text"] for r in replies]
+    # Every call went through one pooled client, closed with the service
+    assert len(clients) == 1 and clients[0].is_closed
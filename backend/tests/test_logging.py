@@ -0,0 +1,102 @@
+import io
+import json
+import logging
+import logging.handlers
+import time
+
+import app.core.logging as log_config
+from app.core import telemetry, tracing
+from app.core.logging import DebugSampler, DroppingQueueHandler, JsonFormatter, RequestContextFilter
+from app.core.tenancy import reset_requested_team, set_requested_team
+
+# Mean cost of a log call on the event loop must stay within this, even when stdout is slow
+# (the sink below takes 2 ms per write, so a synchronous handler would cost >= 2000 us)
+LOG_CALL_BUDGET_US = 100.0
+
+
+class _SlowStream(io.StringIO):
+    def write(self, s: str) -> int:
+        time.sleep(0.002)
+        return super().write(s)
+
+
+def _logger(name: str, handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(f"tests.logging.{name}")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    return logger
+
+
+def test_json_records_carry_request_context():
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    handler.addFilter(RequestContextFilter())
+    logger = _logger("json", handler)
+
+    request_token = tracing._REQUEST.set(("req-42", time.perf_counter() - 0.25))
+    team_token = set_requested_team("T123")
+    try:
+        logger.info("slack: loaded %d messages", 7)
+    finally:
+        reset_requested_team(team_token)
+        tracing._REQUEST.reset(request_token)
+    logger.warning("outside a request")
+
+    inside, outside = (json.loads(line) for line in stream.getvalue().splitlines())
+    assert inside["msg"] == "slack: loaded 7 messages"
+    assert (inside["level"], inside["request_id"], inside["team"]) == ("INFO", "req-42", "T123")
+    assert inside["latency_ms"] >= 250
+    assert "request_id" not in outside and outside["level"] == "WARNING"
+
+
+def test_debug_sampling_is_per_call_site():
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.addFilter(DebugSampler(0.1))
+    logger = _logger("sample", handler)
+    for i in range(50):
+        logger.debug("hot %d", i)
+        logger.info("kept %d", i)
+    lines = stream.getvalue().splitlines()
+    assert [line for line in lines if line.startswith("hot")] == [f"hot {i}" for i in range(0, 50, 10)]
+    assert len([line for line in lines if line.startswith("kept")]) == 50
+
+
+def test_queued_logging_does_not_block_on_slow_stdout():
+    handler = DroppingQueueHandler(maxsize=10_000)
+    handler.addFilter(RequestContextFilter())
+    sink = logging.StreamHandler(_SlowStream())
+    listener = logging.handlers.QueueListener(handler.queue, sink)
+    listener.start()
+    logger = _logger("queued", handler)
+    try:
+        started = time.perf_counter()
+        for i in range(500):
+            logger.info("anthropic: analyzing %d messages", i)
+        per_call_us = (time.perf_counter() - started) / 500 * 1e6
+    finally:
+        listener.stop()  # drains the queue
+    assert per_call_us < LOG_CALL_BUDGET_US
+    assert len(sink.stream.getvalue().splitlines()) == 500
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(maxsize=3)
+    logger = _logger("drop", handler)
+    for i in range(5):
+        logger.error("boom %d", i)
+    assert handler.queue.qsize() == 3
+    assert handler.dropped == 2
+    assert handler.queue.get_nowait().getMessage() == "boom 0"
+
+
+def test_dropped_records_are_exported(monkeypatch):
+    handler = DroppingQueueHandler(maxsize=1)
+    monkeypatch.setattr(log_config, "_queue_handler", handler)
+    monkeypatch.setattr(log_config, "_dropped_before", 4)
+    logger = _logger("drop-metric", handler)
+    for i in range(3):
+        logger.error("boom %d", i)
+    assert "pulse_log_records_dropped_total 6" in telemetry.REGISTRY.render()
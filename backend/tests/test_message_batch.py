@@ -0,0 +1,78 @@
+import gc
+
+import pytest
+
+from app.services import message_batch
+from app.services.message_batch import MessageBatch, vocabulary
+
+
+def _payload():
+    return [
+        {"ts": "1700000200.000300", "user": "U02", "text": "second", "reactions": [{"name": "tada", "users": ["U01", "U03"], "count": 2}]},
+        {"ts": "1700000100.000100", "user": "U01", "text": "first"},
+        {"ts": "1700000300.000001", "bot_id": "B01", "text": "third", "reactions": [{"name": "eyes", "users": ["U02"]}]},
+    ]
+
+
+def test_batch_is_sorted_and_columnar():
+    batch = MessageBatch.from_slack_payload("C1", _payload(), with_text=False)
+    assert len(batch) == 3
+    assert list(batch.ts) == sorted(batch.ts)
+    assert list(batch.user_ids()) == ["U01", "U02", "B01"]
+    assert batch.texts is None
+    assert batch.total_reactions() == 3
+    hist = {batch.vocab.emojis.lookup(c): n for c, n in batch.reaction_histogram().items()}
+    assert hist == {"tada": 2, "eyes": 1}
+    counts = batch.counts_by_user()
+    assert counts[batch.vocab.users.code_of("U02")] == [1, 2]
+
+
+def test_vocabularies_are_per_team_and_freed_with_their_batches():
+    one = MessageBatch.from_slack_payload("C1", _payload(), vocab=vocabulary("T-one"))
+    two = MessageBatch.from_slack_payload("C1", _payload()[:1], vocab=vocabulary("T-two"))
+    assert one.vocab is vocabulary("T-one") and one.window(1700000150.0).vocab is one.vocab
+    assert len(two.vocab.users) == 1 and "B01" not in two.vocab.users._codes
+    with pytest.raises(ValueError):
+        MessageBatch.concat("C1", [one, two])
+    del one, two
+    gc.collect()
+    # Nothing holds the teams' codes any more, so their vocabularies are gone
+    assert "T-one" not in message_batch._VOCABULARIES and "T-two" not in message_batch._VOCABULARIES
+
+
+def test_to_messages_round_trips_ids_newest_first():
+    batch = MessageBatch.from_slack_payload("C1", _payload(), with_text=True)
+    msgs = batch.to_messages()
+    assert [m.id for m in msgs] == ["1700000300.000001", "1700000200.000300", "1700000100.000100"]
+    assert msgs[1].text == "second"
+    assert msgs[1].reactions is not None and msgs[1].reactions[0].userIds == ["U01", "U03"]
+
+
+def test_concat_merges_pages_in_time_order():
+    pages = [MessageBatch.from_slack_payload("C1", [m], with_text=True) for m in _payload()]
+    merged = MessageBatch.concat("C1", pages)
+    assert [t for _, _, t, _ in merged.rows()] == ["first", "second", "third"]
+    assert merged.total_reactions() == 3
+    empty = MessageBatch.empty("C1", with_text=True)
+    assert MessageBatch.concat("C1", [merged, empty]) is merged
+
+
+def _hourly(n: int, start: float = 1_700_000_000.0):
+    return [{"ts": f"{start + i * 3600:.6f}", "user": f"U{i % 3}", "text": f"m{i}", "reactions": [{"name": "tada", "count": i % 2}]} for i in range(n)]
+
+
+def test_window_and_split_are_views():
+    batch = MessageBatch.from_slack_payload("C1", _hourly(48), with_text=True)
+    start = batch.ts[0]
+    day2 = batch.window(start + 24 * 3600, start + 48 * 3600)
+    assert len(day2) == 24
+    assert isinstance(day2.ts, memoryview) and day2.ts.obj is batch.ts
+    assert day2.texts[0] == "m24" and day2.texts[-1] == "m47"
+    assert day2.total_reactions() == 12
+
+    edges = [start + h * 3600 for h in range(0, 49, 6)]
+    buckets = batch.split(edges)
+    assert [len(b) for b in buckets] == [6] * 8
+    assert sum(b.total_reactions() for b in buckets) == batch.total_reactions()
+    assert buckets[3].to_messages()[0].text == "m23"
+    assert buckets[3].to_messages()[0].reactions[0].name == "tada"
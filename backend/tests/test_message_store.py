@@ -0,0 +1,147 @@
+import asyncio
+import time
+
+from app.core.config import get_settings
+from app.services import message_store
+
+
+def test_windows_are_fetched_once_and_sliced(fake_slack):
+    message_store.clear()
+    now = time.time()
+    slack = fake_slack(messages=[{"ts": f"{now - h * 3600 - 1800:.6f}", "user": "U1", "text": str(h)} for h in range(1, 100)])
+
+    async def run():
+        week = await message_store.get_channel_window(slack, "C1", oldest=now - 7 * 86400)
+        day = await message_store.get_channel_window(slack, "C1", oldest=now - 86400)
+        bucket = await message_store.get_channel_window(slack, "C1", oldest=now - 10 * 3600, latest=now - 5 * 3600)
+        return week, day, bucket
+
+    week, day, bucket = asyncio.run(run())
+    assert len(slack.history) == 1
+    assert len(week) == 99
+    assert len(day) == 23
+    assert len(bucket) == 5
+
+
+def test_stale_window_fetches_only_the_tail(monkeypatch, fake_slack):
+    message_store.clear()
+    now = time.time()
+    slack = fake_slack(messages=[{"ts": f"{now - 3600:.6f}", "user": "U1", "text": "old"}])
+
+    async def run():
+        await message_store.get_channel_window(slack, "C1", oldest=now - 86400)
+        key = ("T-fake", "C1")
+        message_store._WINDOWS[key].fetched_at -= 3600
+        slack.messages.append({"ts": f"{time.time():.6f}", "user": "U2", "text": "new"})
+        return await message_store.get_channel_window(slack, "C1", oldest=now - 86400)
+
+    batch = asyncio.run(run())
+    assert len(slack.history) == 2
+    assert float(slack.history[1][1]) > now - 60  # tail fetch starts at the previous fetch time
+    assert [t for _, _, t, _ in batch.rows()] == ["old", "new"]
+
+
+def test_empty_tail_keeps_the_cached_batch(fake_slack):
+    message_store.clear()
+    now = time.time()
+    slack = fake_slack(messages=[{"ts": f"{now - 3600:.6f}", "user": "U1", "text": "old"}])
+
+    async def run():
+        key = ("T-fake", "C1")
+        await message_store.get_channel_window(slack, "C1", oldest=now - 86400)
+        cached = message_store._WINDOWS[key]
+        cached.fetched_at -= 3600
+        await message_store.get_channel_window(slack, "C1", oldest=now - 86400)
+        return cached.batch, message_store._WINDOWS[key]
+
+    cached, refreshed = asyncio.run(run())
+    assert len(slack.history) == 2
+    # No new messages: the refreshed window keeps the cached batch instead of copying it
+    assert refreshed.batch is cached and refreshed.fetched_at > 0
+
+
+def test_reaction_histograms_are_built_at_ingest(fake_slack):
+    message_store.clear()
+    now = time.time()
+    day = 86400
+    slack = fake_slack(messages=[
+        {"ts": f"{now - 3 * day:.6f}", "user": "U1", "reactions": [{"name": "+1", "count": 2}, {"name": "tada", "count": 1}]},
+        {"ts": f"{now - 40 * day:.6f}", "user": "U1", "reactions": [{"name": "thumbsup::skin-tone-2", "count": 5}]},
+        {"ts": f"{now - 60:.6f}", "user": "U2", "reactions": [{"name": "custom_party", "count": 4}]},
+    ])
+
+    async def run():
+        year = await message_store.get_reaction_counts(slack, "C1", oldest=now - 365 * day)
+        week = await message_store.get_reaction_counts(slack, "C1", oldest=now - 7 * day)
+        return year, week
+
+    year, week = asyncio.run(run())
+    assert len(slack.history) == 1
+    assert year == {"👍": 7, "🎉": 1, "custom_party": 4}
+    assert week == {"👍": 2, "🎉": 1, "custom_party": 4}
+
+
+def test_capped_history_starts_the_window_at_the_oldest_fetched_message(monkeypatch, fake_slack):
+    message_store.clear()
+    monkeypatch.setattr(get_settings(), "slack_history_max_pages", 1)
+    now = time.time()
+    slack = fake_slack(messages=[{"ts": f"{now - i * 60:.6f}", "user": "U1", "text": str(i)} for i in range(1, 301)], paged=True)
+
+    async def run():
+        first = await message_store.get_channel_window(slack, "C1", oldest=now - 86400)
+        again = await message_store.get_channel_window(slack, "C1", oldest=now - 86400)
+        return first, again
+
+    first, again = asyncio.run(run())
+    window = message_store._WINDOWS[("T-fake", "C1")]
+    assert len(first) == len(again) == 200
+    assert window.oldest == first.ts[0] > now - 86400
+    # The capped range is not refetched on every request
+    assert len(slack.history) == 1
+
+
+def test_capped_tail_replaces_the_window_instead_of_leaving_a_gap(monkeypatch, fake_slack):
+    message_store.clear()
+    monkeypatch.setattr(get_settings(), "slack_history_max_pages", 1)
+    now = time.time()
+    slack = fake_slack(messages=[{"ts": f"{now - 3600 - i:.6f}", "user": "U1", "text": "old"} for i in range(10)], paged=True)
+
+    async def run():
+        await message_store.get_channel_window(slack, "C1", oldest=now - 86400)
+        message_store._WINDOWS[("T-fake", "C1")].fetched_at -= 3600
+        # 250 new messages since the last fetch; only the newest 200 fit in one page
+        fresh = time.time()
+        slack.messages += [{"ts": f"{fresh + i * 0.001:.6f}", "user": "U2", "text": "new"} for i in range(250)]
+        return await message_store.get_channel_window(slack, "C1", oldest=now - 86400)
+
+    batch = asyncio.run(run())
+    window = message_store._WINDOWS[("T-fake", "C1")]
+    assert len(slack.history) == 2
+    assert len(batch) == 200
+    assert {t for _, _, t, _ in batch.rows()} == {"new"}
+    assert window.oldest == batch.ts[0]
+
+
+def test_thread_metadata_is_refreshed_by_the_next_full_fetch(fake_slack):
+    message_store.clear()
+    now = time.time()
+    root = {"ts": f"{now - 3600:.6f}", "user": "U1", "text": "root", "thread_ts": f"{now - 3600:.6f}", "reply_count": 1, "latest_reply": f"{now - 3000:.6f}"}
+    slack = fake_slack(messages=[root])
+    key = ("T-fake", "C1")
+
+    async def run():
+        await message_store.get_channel_window(slack, "C1", oldest=now - 86400)
+        # A new reply moves the root's metadata; a tail refresh does not see the root again
+        root.update(reply_count=2, latest_reply=f"{now - 60:.6f}")
+        message_store._WINDOWS[key].fetched_at -= 3600
+        tail = await message_store.get_channel_window(slack, "C1", oldest=now - 86400)
+        # Past the max age the window is fully refetched and picks the new metadata up
+        message_store._WINDOWS[key].fetched_at -= 3600
+        message_store._WINDOWS[key].full_fetched_at -= get_settings().message_cache_max_age_seconds + 1
+        full = await message_store.get_channel_window(slack, "C1", oldest=now - 86400)
+        return tail, full
+
+    tail, full = asyncio.run(run())
+    assert list(tail.reply_counts) == [1]
+    assert list(full.reply_counts) == [2]
+    assert list(full.latest_reply) == [float(root["latest_reply"])]
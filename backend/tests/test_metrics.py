@@ -0,0 +1,18 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_entity_totals_all_perspectives():
+    for perspective in ("channel", "employee", "team"):
+        r = client.get(f"/api/v1/metrics/entity-totals?perspective={perspective}&range=month")
+        assert r.status_code == 200
+        assert isinstance(r.json(), list)
+
+
+def test_top_emojis():
+    r = client.get("/api/v1/metrics/top-emojis?range=year&limit=5")
+    assert r.status_code == 200
+    assert isinstance(r.json(), list) and len(r.json()) <= 5
@@ -0,0 +1,238 @@
+import asyncio
+import json
+import os
+import re
+
+import pytest
+
+from app.core import db
+from app.core.config import get_settings
+from app.models.pydantic_types import LLMAnalysisSummary, SlackChannel, SlackDevRehydrateRequest, SlackMessage
+from app.services import dashboard_service, persistence, slack_service
+from app.services.anthropic_service import AnthropicService
+from app.services.dashboard_service import DashboardService
+from app.services.message_batch import MessageBatch
+from app.services.slack_service import SlackService
+from app.services.state_backend import Installation, get_state_backend
+
+
+DAY = 24 * 60 * 60
+
+
+def test_pooled_url_adds_pool_params_once():
+    url = db._pooled_url("postgresql://u:p@localhost:5432/pulse?schema=public", 5, 7)
+    assert "connection_limit=5" in url and "pool_timeout=7" in url and "schema=public" in url
+    assert "connection_limit=20" in db._pooled_url("postgresql://h/db?connection_limit=20", 5, 7)
+
+
+def test_persistence_is_a_no_op_without_database(monkeypatch):
+    monkeypatch.setattr(db, "_client", None)
+    monkeypatch.setattr(get_settings(), "database_url", None)
+    batch = MessageBatch.from_slack_payload("C1", [{"ts": "100.0", "user": "U1", "text": "hi"}])
+
+    async def run():
+        assert await db.connect_db() is None
+        persistence.schedule(persistence.persist_batch, "T1", batch)
+        assert not persistence._PENDING
+        await persistence.persist_batch("T1", batch)
+        assert await persistence.load_installations() == []
+
+    asyncio.run(run())
+
+
+def test_daily_rollups():
+    base = 10 * DAY
+    batch = MessageBatch.from_slack_payload(
+        "C1",
+        [
+            {"ts": str(base + 60), "user": "U1", "reply_count": 3, "thread_ts": str(base + 60),
+             "reactions": [{"name": "tada", "count": 2}]},
+            {"ts": str(base + 120), "user": "U2", "thread_ts": str(base + 60)},  # broadcast reply
+            {"ts": str(base + DAY + 5), "user": "U1", "reactions": [{"name": "+1", "count": 1}]},
+        ],
+        with_text=False,
+    )
+    assert persistence.daily_rollups(batch) == {10: (2, 1, 3, 2), 11: (1, 0, 0, 1)}
+
+
+class _RecordingModel:
+    def __init__(self, calls: list, name: str) -> None:
+        self._calls, self._name = calls, name
+
+    def __getattr__(self, op: str):
+        async def call(**kwargs):
+            self._calls.append((f"{self._name}.{op}", kwargs))
+
+        return call
+
+
+class _RecordingDb:
+    """Stands in for the Prisma client: records raw SQL and model calls."""
+
+    def __init__(self) -> None:
+        self.raw: list[tuple[str, tuple]] = []
+        self.calls: list[tuple[str, dict]] = []
+        self.installation = _RecordingModel(self.calls, "installation")
+        self.messagescore = _RecordingModel(self.calls, "messagescore")
+
+    async def execute_raw(self, sql: str, *params) -> int:
+        self.raw.append((sql, params))
+        return 0
+
+
+def _wide_batch(n: int, base: float) -> MessageBatch:
+    raw = [
+        {"ts": f"{base + i * 60:.6f}", "user": f"U{i % 7}", "text": f"m{i}" if i % 2 else "",
+         "reactions": [{"name": "tada", "count": 2}] if i % 3 == 0 else []}
+        for i in range(n)
+    ]
+    return MessageBatch.from_slack_payload("C1", raw)
+
+
+def test_persist_batch_writes_chunked_upserts_and_rollups(monkeypatch):
+    fake = _RecordingDb()
+    monkeypatch.setattr(db, "_client", fake)
+    base = 20 * DAY
+    batch = _wide_batch(2500, base)
+    asyncio.run(persistence.persist_batch("T1", batch))
+
+    *upserts, (rollup_sql, rollup_params) = fake.raw
+    assert [len(params) // 11 for _, params in upserts] == [1000, 1000, 500]
+    for sql, params in upserts:
+        assert sql.startswith('INSERT INTO "Message"') and 'ON CONFLICT ("teamId", "channelId", "ts")' in sql
+        placeholders = [int(n) for n in re.findall(r"\$(\d+)", sql)]
+        # Numbered 1..N exactly once, one per bound parameter; reactions cast to jsonb per row
+        assert sorted(placeholders) == list(range(1, len(params) + 1))
+        assert sql.count("::jsonb") == len(params) // 11
+        assert all(json.loads(params[r * 11 + 10]) in ([], [{"name": "tada", "count": 2}]) for r in range(len(params) // 11))
+    first = upserts[0][1]
+    assert first[:6] == ("T1", "C1", f"{base:.6f}", base, "U0", "")
+    assert rollup_sql.startswith('INSERT INTO "ChannelRollup"')
+    assert rollup_params == ("T1", "C1", float(20 * DAY), float((20 + int(2499 * 60 // DAY) + 1) * DAY))
+
+
+def test_dev_rehydrate_persists_the_installation(monkeypatch):
+    fake = _RecordingDb()
+    monkeypatch.setattr(db, "_client", fake)
+    service = SlackService()
+    monkeypatch.setattr(service.settings, "environment", "development")
+    backend = get_state_backend()
+    previous = backend.get_active_team()
+    try:
+        payload = SlackDevRehydrateRequest(accessToken="xoxb-dev", teamId="T-dev", teamName="Dev")
+        asyncio.run(service.dev_rehydrate_installation(payload))
+    finally:
+        backend.set_active_team(previous)
+    # Stored in the database too, so channel rows written later satisfy their foreign key
+    assert fake.calls == [(
+        "installation.upsert",
+        {
+            "where": {"teamId": "T-dev"},
+            "data": {
+                "create": {"teamId": "T-dev", "teamName": "Dev", "accessToken": "xoxb-dev", "botUserId": None},
+                "update": {"teamName": "Dev", "accessToken": "xoxb-dev", "botUserId": None},
+            },
+        },
+    )]
+
+
+def test_scores_are_stored_under_the_scorer_that_produced_them(monkeypatch):
+    service = AnthropicService()
+    monkeypatch.setattr(service.settings, "anthropic_api_key", "sk-test")
+    monkeypatch.setattr(service.settings, "anthropic_disable_fallback", False)
+    messages = [SlackMessage(id="1.0", userId="U1", text="great work, thanks!", ts="1.0")]
+
+    async def llm(**kwargs):
+        return LLMAnalysisSummary(overallSentiment=0.4, burnoutRiskLevel="Low", items=[
+            {"messageId": "1.0", "sentiment": 0.4, "burnoutRisk": "Low"}
+        ])
+
+    async def failing(**kwargs):
+        raise RuntimeError("overloaded")
+
+    monkeypatch.setattr(service, "generate_structured", llm)
+    scored = asyncio.run(service.analyze_slack_messages(messages))
+    monkeypatch.setattr(service, "generate_structured", failing)
+    fallback = asyncio.run(service.analyze_slack_messages(messages))
+    assert scored.model == service.settings.anthropic_default_model
+    assert fallback.model == "heuristic" and fallback.items
+
+    scheduled = []
+    monkeypatch.setattr(dashboard_service.persistence, "schedule", lambda fn, *args: scheduled.append(args))
+    dashboard = DashboardService(type("Slack", (), {"active_team_key": lambda self: "T1"})(), service)
+    dashboard._persist_scores("C1", scored)
+    dashboard._persist_scores("C1", fallback)
+    assert [args[-1] for args in scheduled] == [service.settings.anthropic_default_model, "heuristic"]
+
+    # Heuristic scores only fill gaps, never overwriting an LLM score
+    fake = _RecordingDb()
+    monkeypatch.setattr(db, "_client", fake)
+    asyncio.run(persistence.save_scores("T1", "C1", fallback.items, "heuristic"))
+    assert [(op, kwargs["skip_duplicates"]) for op, kwargs in fake.calls] == [("messagescore.create_many", True)]
+
+
+class _SelectionDb:
+    """Stands in for the Prisma client: `Channel.selected` as another replica wrote it."""
+
+    def __init__(self, selected: list[str]) -> None:
+        self.selected = selected
+        self.channel = self
+
+    async def find_many(self, *, where: dict):
+        assert where == {"teamId": "T-db", "selected": True}
+        return [type("Row", (), {"id": cid})() for cid in self.selected]
+
+
+def test_selected_channels_come_from_the_database_when_connected(monkeypatch):
+    service = SlackService()
+    channels = [SlackChannel(id="C1", name="one"), SlackChannel(id="C2", name="two")]
+
+    async def list_channels():
+        return channels
+
+    monkeypatch.setattr(service, "_get_active_installation", lambda: Installation("T-db", "Db", "xoxb"))
+    monkeypatch.setattr(service, "list_channels", list_channels)
+    # This replica's state file still holds an older selection
+    monkeypatch.setattr(slack_service, "load_selected_channels", lambda team_id: {"C1"})
+    monkeypatch.setattr(db, "_client", _SelectionDb(["C2"]))
+    assert [c.id for c in asyncio.run(service.get_selected_channels()).channels] == ["C2"]
+    monkeypatch.setattr(db, "_client", None)
+    assert [c.id for c in asyncio.run(service.get_selected_channels()).channels] == ["C1"]
+
+
+# Against a real database: TEST_DATABASE_URL=postgresql://... with the schema applied
+# (`prisma db push --schema db/prisma/schema.prisma`). Skipped otherwise.
+@pytest.mark.skipif(not os.environ.get("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL not set")
+def test_write_paths_against_postgres(monkeypatch):
+    pytest.importorskip("prisma")
+    monkeypatch.setattr(get_settings(), "database_url", os.environ["TEST_DATABASE_URL"])
+    monkeypatch.setattr(db, "_client", None)
+    base = 30 * DAY
+    batch = _wide_batch(1200, base)
+    # A count-only re-fetch must not blank the text stored by the first one
+    recount = MessageBatch.from_slack_payload("C1", [{"ts": f"{base + 60:.6f}", "user": "U1", "reply_count": 2}], with_text=False)
+
+    async def run():
+        client = await db.connect_db()
+        try:
+            await client.execute_raw('DELETE FROM "Message" WHERE "teamId" = $1', "T-pg")
+            await client.execute_raw('DELETE FROM "ChannelRollup" WHERE "teamId" = $1', "T-pg")
+            await persistence.save_installation("T-pg", "Postgres", "xoxb-pg", None)
+            await persistence.persist_batch("T-pg", batch)
+            await persistence.persist_batch("T-pg", recount)
+            message = await client.query_raw(
+                'SELECT "text", "replyCount" FROM "Message" WHERE "teamId" = $1 AND "ts" = $2', "T-pg", f"{base + 60:.6f}"
+            )
+            rollups = await client.query_raw(
+                'SELECT EXTRACT(EPOCH FROM "day")::int / 86400 AS d, "messages", "threads", "replies", "reactions" '
+                'FROM "ChannelRollup" WHERE "teamId" = $1 ORDER BY 1',
+                "T-pg",
+            )
+            return message, rollups
+        finally:
+            await db.disconnect_db()
+
+    message, rollups = asyncio.run(run())
+    assert message == [{"text": "m1", "replyCount": 2}]
+    expected = persistence.daily_rollups(MessageBatch.concat("C1", [batch.window(None, base + 60), recount, batch.window(base + 61)]))
+    assert {r["d"]: (r["messages"], r["threads"], r["replies"], r["reactions"]) for r in rollups} == expected
@@ -0,0 +1,87 @@
+import json
+from pathlib import Path
+from typing import Optional
+
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_slack_service
+from app.core.config import get_settings
+from app.core.profiling import PROFILE_FILE_HEADER, missing_internals
+from app.main import app
+from app.services import message_store
+
+client = TestClient(app)
+
+HEATMAP = "/api/v1/dashboard/heatmap?grouping=channels&metric=sentiment"
+
+
+def _names(node: dict) -> list[str]:
+    return [node["name"], *(n for c in node.get("children", []) for n in _names(c))]
+
+
+def _get(url: str, monkeypatch, slack, headers: Optional[dict] = None):
+    monkeypatch.setattr(get_settings(), "profiling_token", "s3cret")
+    message_store.clear()
+    app.dependency_overrides[get_slack_service] = lambda: slack
+    try:
+        return client.get(url, headers={"X-Profile-Token": "s3cret", **(headers or {})})
+    finally:
+        app.dependency_overrides.pop(get_slack_service)
+        message_store.clear()
+
+
+def test_profile_flag_returns_call_tree_including_await_time(monkeypatch, fake_slack):
+    monkeypatch.setattr(get_settings(), "anthropic_api_key", None)
+    resp = _get(HEATMAP + "&profile=1", monkeypatch, fake_slack(latency=0.05))
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["profile"]["path"] == "/api/v1/dashboard/heatmap"
+    assert body["profile"]["status"] == 200
+    assert body["profile"]["samples"] > 0
+    assert body["profile"]["unsupported"] == []
+    names = _names(body["tree"])
+    # The tree starts at the app, below the server and middleware frames
+    assert body["tree"]["children"][0]["name"].startswith("__call__ (middleware/cors.py")
+    assert not any("app/core/profiling.py" in n for n in names)
+    assert any(n.startswith("compute_heatmap (app/services/dashboard_service.py") for n in names)
+    # Time parked in the Slack fetch is followed through the channel fan-out tasks
+    assert any(n.startswith("_windows_as_completed (") for n in names)
+    assert any(n.startswith("get_channel_batch (tests/conftest.py") for n in names)
+    assert "[await Future]" in names
+
+
+def test_profile_to_disk_keeps_normal_payload(monkeypatch, tmp_path, fake_slack):
+    monkeypatch.setattr(get_settings(), "profile_dir", str(tmp_path))
+    monkeypatch.setattr(get_settings(), "anthropic_api_key", None)
+    resp = _get(HEATMAP, monkeypatch, fake_slack(latency=0.05), headers={"X-Profile": "disk"})
+    assert resp.status_code == 200
+    assert resp.json()["rows"] == ["c1", "c2"]
+    path = Path(resp.headers[PROFILE_FILE_HEADER])
+    assert path.parent == tmp_path
+    assert json.loads(path.read_text())["profile"]["path"] == "/api/v1/dashboard/heatmap"
+
+
+def test_profile_flag_needs_token_outside_development(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "environment", "production")
+    monkeypatch.setattr(settings, "profiling_token", "s3cret")
+    assert "profile" not in client.get("/api/v1/health?profile=1").json()
+    assert "profile" not in client.get("/api/v1/health?profile=1", headers={"X-Profile-Token": "nope"}).json()
+    resp = client.get("/api/v1/health?profile=1", headers={"X-Profile-Token": "s3cret"})
+    assert resp.json()["profile"]["path"] == "/api/v1/health"
+
+
+def test_profile_flag_needs_token_when_environment_is_only_defaulted(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "environment", "development")
+    monkeypatch.setattr(settings, "profiling_token", None)
+    assert client.get("/api/v1/health?profile=1").json()["profile"]["path"] == "/api/v1/health"
+    # As if ENVIRONMENT were unset: the "development" default alone does not enable profiling
+    monkeypatch.setattr(settings, "__pydantic_fields_set__", settings.model_fields_set - {"environment"})
+    assert "profile" not in client.get("/api/v1/health?profile=1").json()
+
+
+def test_asyncio_internals_the_sampler_follows_are_present():
+    # Fails when a Python upgrade moves Task._fut_waiter, _GatheringFuture._children or the
+    # asend -> async generator link; update app/core/profiling.py before bumping
+    assert missing_internals.__wrapped__() == ()
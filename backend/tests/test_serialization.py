@@ -0,0 +1,29 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.core import serialization
+from app.main import app
+from app.models.pydantic_types import HeatmapMatrix, SlackReaction
+
+client = TestClient(app)
+
+
+def test_dumps_models_and_lists(monkeypatch):
+    heatmap = HeatmapMatrix(rows=["a"], cols=["Mon"], values=[[0.5]])
+    reactions = [SlackReaction(name="tada", userIds=["U1"]), {"plain": "dict", "n": None}]
+    expected = [{"name": "tada", "userIds": ["U1"], "emoji": None}, {"plain": "dict", "n": None}]
+    assert json.loads(serialization.dumps(heatmap)) == heatmap.model_dump()
+    assert json.loads(serialization.dumps(reactions)) == expected
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert json.loads(serialization.dumps(reactions)) == expected
+    assert serialization.loads(b'{"ok": true}') == {"ok": True}
+
+
+def test_fast_responses_keep_schema_and_shape():
+    r = client.get("/api/v1/dashboard/heatmap?grouping=channels&metric=messages&range=week")
+    assert r.status_code == 200
+    assert set(r.json()) == {"rows", "cols", "values", "partialRows"}
+    schema = client.get("/openapi.json").json()
+    ok = schema["paths"]["/api/v1/dashboard/heatmap"]["get"]["responses"]["200"]["content"]["application/json"]
+    assert ok["schema"]["$ref"].endswith("/HeatmapMatrix")
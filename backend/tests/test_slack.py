@@ -1,6 +1,13 @@
+import time
+
 from fastapi.testclient import TestClient
 
+from app.api.deps import get_slack_service
+from app.api.pagination import encode_cursor
 from app.main import app
+from app.models.pydantic_types import SlackUser
+from app.services import message_store, user_store
+from app.services.message_batch import MessageBatch
 
 client = TestClient(app)
 
@@ -22,3 +29,81 @@ def test_slack_channels_and_users():
     assert ru.status_code == 200
     users = ru.json()
     assert isinstance(users, list) and len(users) > 0
+
+
+class _PagingSlack:
+    def __init__(self) -> None:
+        self.users_calls = 0
+
+    def active_team_key(self) -> str:
+        return "T-paging"
+
+    async def list_users(self):
+        self.users_calls += 1
+        return [
+            SlackUser(id=f"U{i:03d}", username=f"user{i}", displayName=f"User {i}", isBot=i % 5 == 0)
+            for i in range(25, 0, -1)
+        ]
+
+    async def get_channel_batch(self, channel_id, oldest=None, latest=None, limit=200, *, with_text=True, max_pages=1):
+        now = time.time()
+        raw = [
+            {
+                "ts": f"{now - i * 60:.6f}",
+                "user": f"U{i % 3:03d}",
+                "text": f"message {i}",
+                "reactions": [{"name": "tada", "users": ["U001"]}] if i % 4 == 0 else [],
+            }
+            for i in range(1, 31)
+        ]
+        return MessageBatch.from_slack_payload(channel_id, raw, with_text=with_text)
+
+
+def _paged(url: str, next_cursor) -> list:
+    items, cursor = [], None
+    while True:
+        r = client.get(url + (f"&cursor={cursor}" if cursor else ""))
+        assert r.status_code == 200
+        page, cursor = next_cursor(r)
+        items.extend(page)
+        if not cursor:
+            return items
+
+
+def test_messages_pages_filters_and_fields():
+    message_store.clear()
+    app.dependency_overrides[get_slack_service] = _PagingSlack
+    try:
+        base = "/api/v1/slack/channels/C1/messages?limit=7"
+        everything = _paged(base, lambda r: (r.json()["messages"], r.headers.get("x-next-cursor")))
+        mine = _paged(base + "&user=U001&fields=id,text", lambda r: (r.json()["messages"], r.headers.get("x-next-cursor")))
+        reacted = client.get("/api/v1/slack/channels/C1/messages?has_reactions=true").json()["messages"]
+        bad = client.get(base + "&fields=id,nope")
+        bad_cursor = client.get(base + "&cursor=%%%")
+        # Well-formed cursors holding the wrong position type (a user ID, not a timestamp)
+        wrong_type = client.get(base + f"&cursor={encode_cursor('abc')}")
+    finally:
+        app.dependency_overrides.pop(get_slack_service)
+        message_store.clear()
+    assert [m["text"] for m in everything] == [f"message {i}" for i in range(1, 31)]
+    assert mine == [{"id": m["id"], "text": m["text"]} for m in everything if m["userId"] == "U001"]
+    assert len(reacted) == 7 and all(m["reactions"] for m in reacted)
+    assert bad.status_code == 400 and bad_cursor.status_code == 400
+    assert wrong_type.status_code == 400 and wrong_type.json()["detail"] == "invalid_cursor"
+
+
+def test_users_pages_from_cache():
+    slack = _PagingSlack()
+    user_store.refresh()
+    app.dependency_overrides[get_slack_service] = lambda: slack
+    try:
+        ids = _paged("/api/v1/slack/users?limit=10&fields=id", lambda r: (r.json(), r.headers.get("x-next-cursor")))
+        humans = client.get("/api/v1/slack/users?is_bot=false&q=USER 1").json()
+        wrong_type = client.get(f"/api/v1/slack/users?cursor={encode_cursor(1.5)}")
+    finally:
+        app.dependency_overrides.pop(get_slack_service)
+        user_store.refresh()
+    assert ids == [{"id": f"U{i:03d}"} for i in range(1, 26)]
+    assert [u["id"] for u in humans] == ["U001", "U011", "U012", "U013", "U014", "U016", "U017", "U018", "U019"]
+    assert slack.users_calls == 1
+    assert wrong_type.status_code == 400
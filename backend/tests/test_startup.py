@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+# Importing app.main takes ~0.6 s here, most of it FastAPI/pydantic; the budget leaves
+# headroom for slower CI machines but catches an eager import of the Anthropic SDK or
+# httpx creeping back in (that alone added ~0.3 s)
+IMPORT_BUDGET_SECONDS = 1.5
+LAZY_MODULES = ("anthropic", "httpx")
+
+
+def _run(code: str, **env: str) -> str:
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND,
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=60,
+    )
+    return out.stdout
+
+
+def test_app_import_stays_within_budget_and_lazy():
+    code = (
+        "import json, sys, time\n"
+        "started = time.perf_counter()\n"
+        "import app.main\n"
+        "elapsed = time.perf_counter() - started\n"
+        f"print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    # Best of three, so one slow run on a busy machine does not fail the suite
+    runs = [json.loads(_run(code).strip().splitlines()[-1]) for _ in range(3)]
+    assert runs[0]["loaded"] == []
+    assert min(r["elapsed"] for r in runs) < IMPORT_BUDGET_SECONDS
+
+
+def test_startup_profiler_reports_imports_and_phases():
+    code = (
+        "import asyncio\n"
+        "from app.main import app, lifespan\n"
+        "async def main():\n"
+        "    async with lifespan(app):\n"
+        "        pass\n"
+        "asyncio.run(main())\n"
+    )
+    out = _run(code, PROFILE_STARTUP="1")
+    assert "startup:" in out
+    # Section headers and names only: which imports are slowest varies between runs
+    phases = out[out.index("  phases:") : out.index("  slowest imports")]
+    assert "build_services" in phases and "connect_db" in phases
+    app_imports = out[out.index("  app.* imports:") :]
+    assert "app.api.deps" in app_imports and "app.services.slack_service" in app_imports
@@ -0,0 +1,41 @@
+import pytest
+
+from app.services.state_backend import Installation, MemoryStateBackend, SqliteStateBackend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryStateBackend()
+    return SqliteStateBackend(str(tmp_path / "state.sqlite3"))
+
+
+def test_oauth_state_is_consumed_once(backend):
+    backend.put_oauth_state("s1", 1000.0, "http://localhost:3000/app")
+    backend.put_oauth_state("s2", 10.0)
+    backend.cleanup_oauth_states(older_than=500.0)
+    assert backend.pop_oauth_state("s2") is None
+    assert backend.pop_oauth_state("s1") == (1000.0, "http://localhost:3000/app")
+    assert backend.pop_oauth_state("s1") is None
+
+
+def test_installations_and_active_team(backend):
+    assert backend.get_active_installation() is None
+    backend.save_installation(Installation("T1", "One", "xoxb-1"))
+    backend.save_installation(Installation("T2", "Two", "xoxb-2", "B2"))
+    backend.save_installation(Installation("T1", "One renamed", "xoxb-1b"))
+    backend.set_active_team("T2")
+    assert backend.get_active_installation() == Installation("T2", "Two", "xoxb-2", "B2")
+    assert backend.get_installation("T1") == Installation("T1", "One renamed", "xoxb-1b")
+    assert {i.team_id for i in backend.list_installations()} == {"T1", "T2"}
+
+
+def test_sqlite_state_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    worker_a, worker_b = SqliteStateBackend(path), SqliteStateBackend(path)
+    worker_a.put_oauth_state("state-x", 1000.0)
+    worker_a.save_installation(Installation("T1", "One", "xoxb-1"))
+    worker_a.set_active_team("T1")
+    assert worker_b.pop_oauth_state("state-x") == (1000.0, None)
+    assert worker_a.pop_oauth_state("state-x") is None
+    assert worker_b.get_active_installation() == Installation("T1", "One", "xoxb-1")
@@ -0,0 +1,44 @@
+import json
+import os
+
+import pytest
+
+from app.services import state_store
+
+
+@pytest.fixture()
+def state_file(tmp_path, monkeypatch):
+    path = tmp_path / "state.json"
+    monkeypatch.setattr(state_store, "_STATE_PATH", str(path))
+    monkeypatch.setattr(state_store, "_cache_key", None)
+    return path
+
+
+def test_round_trip_and_atomic_file(state_file):
+    state_store.save_selected_channels("T1", ["C1", "C2", "C1"])
+    state_store.save_selected_channels("T2", ["C9"])
+    assert state_store.load_selected_channels("T1") == {"C1", "C2"}
+    assert json.loads(state_file.read_text())["T2"] == {"selected_channel_ids": ["C9"]}
+    assert [p.name for p in state_file.parent.iterdir() if p.name.endswith(".tmp")] == []
+
+
+def test_reads_are_cached_until_file_changes(state_file, monkeypatch):
+    state_store.save_selected_channels("T1", ["C1"])
+    calls = []
+    real_load = json.load
+    monkeypatch.setattr(state_store.json, "load", lambda f: calls.append(1) or real_load(f))
+    for _ in range(100):
+        assert state_store.load_selected_channels("T1") == {"C1"}
+    assert calls == []
+
+    # Another worker rewrites the file: the next read notices via mtime/size
+    state_file.write_text(json.dumps({"T1": {"selected_channel_ids": ["C7", "C8"]}}))
+    os.utime(state_file, ns=(1, 1))
+    assert state_store.load_selected_channels("T1") == {"C7", "C8"}
+    assert calls == [1]
+
+
+def test_write_failure_is_reported(tmp_path, monkeypatch):
+    monkeypatch.setattr(state_store, "_STATE_PATH", str(tmp_path / "missing-dir" / "state.json"))
+    with pytest.raises(state_store.StateStoreError):
+        state_store.save_selected_channels("T1", ["C1"])
@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+from app.core.config import get_settings
+from app.services import team_directory
+from app.services.message_batch import MessageBatch
+
+
+def _batch():
+    return MessageBatch.from_slack_payload(
+        "C1",
+        [
+            {"ts": "1.0", "user": "UT1", "reactions": [{"name": "tada", "count": 2}]},
+            {"ts": "2.0", "user": "UT2"},
+            {"ts": "3.0", "user": "UT3", "reactions": [{"name": "eyes", "count": 1}]},
+            {"ts": "4.0", "user": "UT-nobody"},
+        ],
+        with_text=False,
+    )
+
+
+def test_team_totals_group_by_dense_ids(monkeypatch):
+    batch = _batch()
+    directory = team_directory.build_directory(
+        [("S1", "Eng", ["UT1", "UT2"]), ("S2", "Design", ["UT3", "UT1"])], source="test"
+    )
+    expected = ([2, 1, 1], [2, 1, 0])
+    assert directory.team_totals(batch) == expected
+    # Same result through the pure-Python fallback
+    monkeypatch.setattr(team_directory, "_numpy", lambda: None)
+    assert directory.team_totals(batch) == expected
+
+
+class _NoSlack:
+    def active_team_key(self) -> str:
+        return "T-dir"
+
+    async def list_user_groups(self):
+        raise AssertionError("file directory should take precedence")
+
+
+def test_directory_file_is_loaded_and_cached(tmp_path, monkeypatch):
+    path = tmp_path / "teams.json"
+    path.write_text(json.dumps({"UT1": "Eng", "UT3": "Design"}))
+    monkeypatch.setattr(get_settings(), "team_directory_file", str(path))
+    team_directory.refresh()
+    directory = asyncio.run(team_directory.get_directory(_NoSlack()))
+    assert directory.source == "file"
+    assert directory.team_names == ["Eng", "Design"]
+    path.write_text("user_id,team\nUT1,Ops\n")
+    assert asyncio.run(team_directory.get_directory(_NoSlack())) is directory
+    team_directory.refresh()
+    csv_path = tmp_path / "teams.csv"
+    csv_path.write_text("user_id,team\nUT1,Ops\n")
+    monkeypatch.setattr(get_settings(), "team_directory_file", str(csv_path))
+    assert asyncio.run(team_directory.get_directory(_NoSlack())).team_names == ["Ops"]
+    team_directory.refresh()
@@ -0,0 +1,61 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.core import telemetry
+from app.main import app
+from app.services.slack_service import SlackService
+
+client = TestClient(app)
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = telemetry.Registry()
+    hist = registry.histogram("demo_seconds", "Demo latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        hist.observe(value, "/x")
+    text = registry.render()
+    assert 'demo_seconds_bucket{route="/x",le="0.1"} 2' in text
+    assert 'demo_seconds_bucket{route="/x",le="1"} 3' in text
+    assert 'demo_seconds_bucket{route="/x",le="+Inf"} 4' in text
+    assert 'demo_seconds_count{route="/x"} 4' in text
+    assert 'demo_seconds_sum{route="/x"} 3.65' in text
+    assert "# TYPE demo_seconds histogram" in text
+
+
+def test_metrics_endpoint_reports_routes_by_template_and_admission_mode():
+    client.get("/api/v1/health")
+    client.get("/api/v1/does-not-exist")
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = resp.text
+    assert 'pulse_http_request_duration_seconds_count{method="GET",route="/api/v1/health",status="200"}' in text
+    assert 'route="unmatched",status="404"' in text
+    assert 'pulse_admission_mode{mode="normal"} 1' in text
+    assert "pulse_event_loop_lag_seconds " in text
+
+
+class _Response:
+    def __init__(self, status_code: int) -> None:
+        self.status_code = status_code
+        self.headers = {"Retry-After": "0"}
+        self.content = b'{"ok": true}'
+
+
+class _RateLimitedOnceHttp:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def get(self, path, params=None, headers=None):
+        self.calls += 1
+        return _Response(429 if self.calls == 1 else 200)
+
+
+def test_slack_calls_and_rate_limits_are_counted_per_method():
+    before_429 = telemetry.SLACK_RATE_LIMITED.value("conversations.info")
+    before_ok = telemetry.SLACK_CALLS.value("conversations.info", "200")
+    data = asyncio.run(SlackService()._get_json(_RateLimitedOnceHttp(), "/conversations.info", {}, "xoxb-test"))
+    assert data == {"ok": True}
+    assert telemetry.SLACK_RATE_LIMITED.value("conversations.info") == before_429 + 1
+    assert telemetry.SLACK_CALLS.value("conversations.info", "200") == before_ok + 1
@@ -0,0 +1,149 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.tenancy import TenantMiddleware, reset_requested_team, set_requested_team
+from app.main import app
+from app.models.pydantic_types import LLMAnalysisSummary
+from app.services import anthropic_service, state_backend
+from app.services.anthropic_service import AnthropicService
+from app.services.state_backend import Installation, MemoryStateBackend, get_state_backend
+from app.services.tenant_limits import FairScheduler, LlmQuota, LlmQuotaExceeded
+
+client = TestClient(app)
+
+
+def test_connection_is_resolved_per_request():
+    backend = get_state_backend()
+    backend.save_installation(Installation("T-one", "One", "xoxb-1"))
+    backend.save_installation(Installation("T-two", "Two", "xoxb-2"))
+    previous = backend.get_active_team()
+    backend.set_active_team("T-one")
+    try:
+        assert client.get("/api/v1/slack/connection").json()["teamId"] == "T-one"
+        r = client.get("/api/v1/slack/connection", headers={"X-Slack-Team": "T-two"})
+        assert r.json()["teamId"] == "T-two"
+        assert client.get("/api/v1/slack/connection?team_id=T-two").json()["teamId"] == "T-two"
+        # Teams without an installation are refused rather than served as "not connected"
+        unknown = client.get("/api/v1/slack/connection", headers={"X-Slack-Team": "T-none"})
+        assert unknown.status_code == 403 and unknown.json() == {"detail": "unknown_team"}
+        assert client.get("/api/v1/slack/connection?team_id=T-none").status_code == 403
+    finally:
+        backend.set_active_team(previous)
+
+
+def test_fair_scheduler_interleaves_tenants():
+    async def run() -> list[str]:
+        scheduler = FairScheduler(capacity=2, per_tenant=2)
+        order: list[str] = []
+
+        async def job(tenant: str) -> None:
+            async with scheduler.slot(tenant):
+                order.append(tenant)
+                await asyncio.sleep(0.001)
+
+        backfill = [asyncio.create_task(job("big")) for _ in range(8)]
+        await asyncio.sleep(0)
+        small = [asyncio.create_task(job("small")) for _ in range(2)]
+        await asyncio.gather(*backfill, *small)
+        assert scheduler.in_use == 0
+        return order
+
+    order = asyncio.run(run())
+    # The small tenant's jobs start well before the large backfill drains
+    assert max(i for i, t in enumerate(order) if t == "small") <= 5
+
+
+def test_fair_scheduler_respects_per_tenant_cap():
+    async def run() -> int:
+        scheduler = FairScheduler(capacity=8, per_tenant=2)
+        peak = 0
+
+        async def job() -> None:
+            nonlocal peak
+            async with scheduler.slot("t"):
+                peak = max(peak, scheduler.in_use)
+                await asyncio.sleep(0.001)
+
+        await asyncio.gather(*(job() for _ in range(6)))
+        return peak
+
+    assert asyncio.run(run()) == 2
+
+
+def test_llm_quota_is_per_tenant():
+    quota = LlmQuota(per_minute=2)
+    assert quota.try_acquire("a") and quota.try_acquire("a")
+    assert not quota.try_acquire("a")
+    assert quota.try_acquire("b")
+    assert LlmQuota(per_minute=0).try_acquire("a")
+
+
+def test_llm_quota_is_charged_to_the_active_workspace(monkeypatch):
+    backend = get_state_backend()
+    backend.save_installation(Installation("T-one", "One", "xoxb-1"))
+    backend.save_installation(Installation("T-two", "Two", "xoxb-2"))
+    previous = backend.get_active_team()
+    backend.set_active_team("T-one")
+    quota = LlmQuota(per_minute=1)
+    monkeypatch.setattr(anthropic_service, "get_llm_quota", lambda: quota)
+    service = AnthropicService()
+    monkeypatch.setattr(service.settings, "anthropic_api_key", "sk-test")
+    monkeypatch.setattr(service.settings, "anthropic_disable_fallback", False)
+    # T-one (the default installation) has used its call; T-two has not
+    assert quota.try_acquire("T-one")
+
+    async def run():
+        with pytest.raises(LlmQuotaExceeded):
+            await service.generate_structured(prompt="p", schema_model=LLMAnalysisSummary)
+        fallback = await service.analyze_slack_messages([])
+        token = set_requested_team("T-two")
+        try:
+            assert quota.try_acquire("T-two")
+            with pytest.raises(LlmQuotaExceeded):
+                await service.generate_structured(prompt="p", schema_model=LLMAnalysisSummary)
+        finally:
+            reset_requested_team(token)
+        return fallback
+
+    try:
+        fallback = asyncio.run(run())
+    finally:
+        backend.set_active_team(previous)
+    assert fallback.burnoutRiskLevel == "Low"
+
+
+def test_active_installation_is_looked_up_once_per_request(monkeypatch):
+    class CountingBackend(MemoryStateBackend):
+        lookups = 0
+
+        def get_installation(self, team_id):
+            CountingBackend.lookups += 1
+            return super().get_installation(team_id)
+
+    backend = CountingBackend()
+    backend.save_installation(Installation("T-one", "One", "xoxb-1"))
+    backend.set_active_team("T-one")
+    monkeypatch.setattr(state_backend, "get_state_backend", lambda: backend)
+    seen: list[str] = []
+
+    async def inner(scope, receive, send):
+        # Several Slack calls, some from tasks the request spawns
+        seen.append(state_backend.active_team_key())
+        seen.extend(await asyncio.gather(*(asyncio.create_task(_key()) for _ in range(3))))
+
+    async def _key():
+        return state_backend.active_team_key()
+
+    async def run():
+        middleware = TenantMiddleware(inner)
+        for _ in range(2):
+            await middleware({"type": "http", "headers": [], "query_string": b""}, None, None)
+
+    asyncio.run(run())
+    assert seen == ["T-one"] * 8
+    assert CountingBackend.lookups == 2
+    # Outside a request nothing is memoized
+    state_backend.active_team_key()
+    assert CountingBackend.lookups == 3
@@ -0,0 +1,57 @@
+import asyncio
+
+from app.services import message_store
+from app.services.message_batch import MessageBatch
+from app.services.thread_metrics import thread_stats, thread_stats_by_user
+
+
+def _history():
+    return [
+        {"ts": "1000.000000", "user": "U1", "text": "root a", "thread_ts": "1000.000000", "reply_count": 3, "latest_reply": "1300.000000"},
+        {"ts": "2000.000000", "user": "U2", "text": "root b", "thread_ts": "2000.000000", "reply_count": 1, "latest_reply": "2060.000000"},
+        {"ts": "3000.000000", "user": "U3", "text": "no replies"},
+    ]
+
+
+def _replies():
+    return {
+        1000.0: MessageBatch.from_slack_payload("C1", [
+            {"ts": "1100.000000", "user": "U1", "thread_ts": "1000.000000"},  # author follow-up, not a response
+            {"ts": "1200.000000", "user": "U2", "thread_ts": "1000.000000"},
+            {"ts": "1300.000000", "user": "U3", "thread_ts": "1000.000000"},
+        ]),
+        2000.0: MessageBatch.from_slack_payload("C1", [{"ts": "2060.000000", "user": "U1", "thread_ts": "2000.000000"}]),
+    }
+
+
+def test_channel_thread_stats():
+    batch = MessageBatch.from_slack_payload("C1", _history())
+    stats = thread_stats(batch, _replies())
+    assert stats.threads == 2
+    assert stats.replies == 4
+    assert stats.unique_repliers == 3
+    # (1200 - 1000) and (2060 - 2000) seconds
+    assert stats.avg_first_response_minutes == round((200 + 60) / 2 / 60, 1)
+
+
+def test_user_thread_stats_and_reply_count_fallback():
+    batch = MessageBatch.from_slack_payload("C1", _history())
+    per_user = thread_stats_by_user(batch, {1000.0: _replies()[1000.0]})
+    u1, u2 = batch.vocab.users.code_of("U1"), batch.vocab.users.code_of("U2")
+    assert per_user[u1].threads == 1 and per_user[u1].replies == 1
+    # Thread b was not fetched: its reply_count is attributed to the author
+    assert per_user[u2].threads == 1 and per_user[u2].replies == 2
+
+
+def test_only_threads_with_new_activity_are_refetched(fake_slack):
+    message_store.clear()
+    slack = fake_slack(replies=_replies())
+    history = _history()
+    asyncio.run(message_store.get_thread_replies(slack, MessageBatch.from_slack_payload("C1", history)))
+    assert sorted(slack.threads) == ["1000.000000", "2000.000000"]
+
+    history[1]["latest_reply"] = "2500.000000"
+    slack.threads.clear()
+    out = asyncio.run(message_store.get_thread_replies(slack, MessageBatch.from_slack_payload("C1", history)))
+    assert slack.threads == ["2000.000000"]
+    assert set(out) == {1000.0, 2000.0}
@@ -0,0 +1,93 @@
+import time
+
+import anthropic
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_anthropic_service, get_slack_service
+from app.core import tracing
+from app.core.config import get_settings
+from app.main import app
+from app.services import message_store
+from app.services.anthropic_service import AnthropicService
+
+client = TestClient(app)
+
+
+class _Messages:
+    async def create(self, **kwargs):
+        text = '{"overallSentiment": 0.4, "burnoutRiskLevel": "Low", "items": []}'
+        usage = type("Usage", (), {"input_tokens": 120, "output_tokens": 30})()
+        return type("Resp", (), {"content": [type("Block", (), {"text": text})()], "usage": usage})()
+
+
+class _FakeAsyncAnthropic:
+    def __init__(self, **kwargs) -> None:
+        self.messages = _Messages()
+
+
+def _names(node: dict) -> list[str]:
+    return [node["name"], *(n for c in node.get("children", []) for n in _names(c))]
+
+
+def _find(node: dict, name: str) -> dict:
+    if node["name"] == name:
+        return node
+    for c in node.get("children", []):
+        found = _find(c, name)
+        if found:
+            return found
+    return {}
+
+
+def test_request_span_tree_covers_slack_llm_and_dashboard_phases(monkeypatch, fake_slack):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "tracing_enabled", True)
+    monkeypatch.setattr(settings, "anthropic_api_key", "test-key")
+    monkeypatch.setattr(anthropic, "AsyncAnthropic", _FakeAsyncAnthropic)
+    message_store.clear()
+    slack = fake_slack(count=3, users=1, text="thanks, great work", latency=0.01)
+    app.dependency_overrides[get_slack_service] = lambda: slack
+    app.dependency_overrides[get_anthropic_service] = AnthropicService
+    try:
+        resp = client.get("/api/v1/dashboard/kpi?channel_ids=C1,C2", headers={"X-Request-ID": "req-kpi-1"})
+        tree = client.get("/api/v1/debug/traces/req-kpi-1").json()
+        listing = client.get("/api/v1/debug/traces").json()
+    finally:
+        app.dependency_overrides.pop(get_slack_service)
+        app.dependency_overrides.pop(get_anthropic_service)
+        message_store.clear()
+
+    assert resp.status_code == 200
+    assert resp.headers["X-Request-ID"] == "req-kpi-1"
+    assert "dashboard-kpi;dur=" in resp.headers["Server-Timing"]
+    root = tree["root"]
+    assert root["name"] == "GET /api/v1/dashboard/kpi"
+    kpi = _find(root, "dashboard.kpi")
+    # Both channel fetches ran in gathered tasks and still nest under the KPI span
+    windows = [c for c in kpi["children"] if c["name"] == "dashboard.window"]
+    assert sorted(w["attrs"]["channel"] for w in windows) == ["C1", "C2"]
+    assert all(_find(w, "slack.get_channel_batch") for w in windows)
+    llm = _find(root, "anthropic.messages")
+    assert llm["attrs"] == {"model": settings.anthropic_default_model, "input_tokens": 120, "output_tokens": 30}
+    assert "anthropic.generate_structured" in _names(root)
+    assert kpi["selfMs"] <= kpi["durationMs"]
+    assert "req-kpi-1" in [t["requestId"] for t in listing]
+
+
+def test_tracing_is_off_by_default():
+    resp = client.get("/api/v1/health")
+    assert "X-Request-ID" not in resp.headers
+    assert client.get("/api/v1/debug/traces").status_code == 404
+
+
+def test_otlp_payload_links_spans_to_the_trace():
+    trace = tracing.Trace("r1")
+    root = tracing.Span(trace, "GET /x", None, {})
+    trace.spans.append(root)
+    child = tracing.Span(trace, "slack.api", root.span_id, {"method": "conversations.history", "status": 200})
+    trace.spans.append(child)
+    child.end_ns = root.end_ns = time.time_ns()
+    spans = tracing.otlp_payload(trace)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [s["traceId"] for s in spans] == [trace.trace_id] * 2
+    assert spans[1]["parentSpanId"] == root.span_id
+    assert {"key": "status", "value": {"intValue": "200"}} in spans[1]["attributes"]
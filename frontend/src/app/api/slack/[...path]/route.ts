@@ -24,12 +24,13 @@ async function proxy(req: NextRequest, path: string[]) {
 
   const res = await fetch(upstreamUrl, init);
   const text = await res.text();
-  return new Response(text, {
-    status: res.status,
-    headers: {
-      "content-type": res.headers.get("content-type") || "application/json",
-    },
-  });
+  const headers: Record<string, string> = {
+    "content-type": res.headers.get("content-type") || "application/json",
+  };
+  // Pagination cursor of list endpoints
+  const nextCursor = res.headers.get("x-next-cursor");
+  if (nextCursor) headers["x-next-cursor"] = nextCursor;
+  return new Response(text, { status: res.status, headers });
 }
 
 export async function GET(req: NextRequest, ctx: { params: Promise<{ path: string[] }> }) {
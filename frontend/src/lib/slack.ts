@@ -18,6 +18,18 @@ async function getJson<T>(path: string, init?: RequestInit): Promise<T> {
   return (await res.json()) as T;
 }
 
+// List endpoints return the next page's cursor in the X-Next-Cursor header
+async function getPage<T>(path: string): Promise<{ data: T; nextCursor: string | null }> {
+  const res = await fetch(`${API_BASE}${path}`, {
+    headers: { "Content-Type": "application/json" },
+    cache: "no-store",
+  });
+  if (!res.ok) {
+    throw new Error(`Request failed: ${res.status}`);
+  }
+  return { data: (await res.json()) as T, nextCursor: res.headers.get("X-Next-Cursor") };
+}
+
 export async function fetchConnection(): Promise<SlackConnection> {
   return getJson<SlackConnection>(`${SLACK_PREFIX}/connection`);
 }
@@ -46,18 +58,38 @@ export async function fetchSelectedChannels(): Promise<{ channels: SlackChannel[
   return getJson<{ channels: SlackChannel[] }>(`${SLACK_PREFIX}/channels/selected`);
 }
 
+// Every member: follows X-Next-Cursor until the last page (the endpoint pages by 200 by default)
 export async function fetchUsers(): Promise<SlackUser[]>{
-  return getJson<SlackUser[]>(`${SLACK_PREFIX}/users`);
+  const users: SlackUser[] = [];
+  let cursor: string | null = null;
+  do {
+    const p = new URLSearchParams({ limit: "1000" });
+    if (cursor) p.set("cursor", cursor);
+    const page: { data: SlackUser[]; nextCursor: string | null } = await getPage<SlackUser[]>(`${SLACK_PREFIX}/users?${p.toString()}`);
+    users.push(...page.data);
+    cursor = page.nextCursor;
+  } while (cursor);
+  return users;
 }
 
-export async function fetchChannelMessages(channelId: string, opts?: { oldest?: string; latest?: string; limit?: number }): Promise<SlackMessagesResponse>{
+export async function fetchChannelMessages(
+  channelId: string,
+  opts?: { oldest?: string; latest?: string; limit?: number; cursor?: string; user?: string; hasReactions?: boolean; fields?: string[] },
+): Promise<SlackMessagesResponse>{
   const p = new URLSearchParams();
   if (opts?.oldest) p.set("oldest", opts.oldest);
   if (opts?.latest) p.set("latest", opts.latest);
   if (opts?.limit) p.set("limit", String(opts.limit));
+  if (opts?.cursor) p.set("cursor", opts.cursor);
+  if (opts?.user) p.set("user", opts.user);
+  if (opts?.hasReactions !== undefined) p.set("has_reactions", String(opts.hasReactions));
+  if (opts?.fields?.length) p.set("fields", opts.fields.join(","));
   const qs = p.toString();
   const suffix = qs ? `?${qs}` : "";
-  return getJson<SlackMessagesResponse>(`${SLACK_PREFIX}/channels/${encodeURIComponent(channelId)}/messages${suffix}`);
+  const { data, nextCursor } = await getPage<SlackMessagesResponse>(
+    `${SLACK_PREFIX}/channels/${encodeURIComponent(channelId)}/messages${suffix}`,
+  );
+  return { ...data, nextCursor };
 }
 
 export async function devRehydrateInstallation(payload: { accessToken: string; teamId: string; teamName?: string; botUserId?: string }): Promise<SlackConnection> {
@@ -15,6 +15,8 @@ export interface ChannelMetric {
   threads: number;
   lastActivity: string; // ISO date
   risk: RiskLevel;
+  responses?: number | null; // thread replies
+  avgFirstResponseMinutes?: number | null;
 }
 
 export interface KPI {
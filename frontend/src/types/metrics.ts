@@ -7,8 +7,10 @@ export interface EntityTotalMetric {
   name: string;
   messages: number;
   threads: number;
-  responses: number; // total replies (approx)
+  responses: number; // thread replies
   emojis: number; // total reactions
+  uniqueRepliers?: number;
+  avgFirstResponseMinutes?: number | null;
 }
 
 export interface MetricsState {
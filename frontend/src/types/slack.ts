@@ -47,6 +47,8 @@ export interface SlackConnection {
 export interface SlackMessagesResponse {
   channelId: string;
   messages: SlackMessage[];
+  // From the X-Next-Cursor response header; null on the last page
+  nextCursor?: string | null;
 }
 
 